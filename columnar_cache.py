@@ -0,0 +1,276 @@
+import os
+import json
+import mmap
+import array
+import hashlib
+import datetime
+import tempfile
+from itertools import islice
+
+import openpyxl
+
+# Columnar cache of one sheet: the workbook is parsed once and every column is
+# stored as int64 offsets + one type tag byte per cell + a UTF-8 blob in a single
+# file next to the workbook. Later runs mmap the file, so only the columns a run
+# touches are paged in. The cache is rebuilt when the workbook's mtime/size change
+# and its content hash differs.
+
+MAGIC = b'XLCOLC02'
+HASH_CHUNK = 1 << 20
+# Rows packed per batch while building a cache
+SPILL_ROWS = 10000
+
+TAG_NONE, TAG_STR, TAG_INT, TAG_FLOAT, TAG_BOOL, TAG_DATETIME, TAG_DATE, TAG_TIME, TAG_TIMEDELTA = range(9)
+
+
+def encode_cell(val):
+    # Explicit tags only (no pickle), so reading a tampered cache file cannot run code
+    if val is None:
+        return TAG_NONE, b''
+    if isinstance(val, str):
+        return TAG_STR, val.encode('utf-8', 'surrogatepass')
+    if type(val) is bool:
+        return TAG_BOOL, b'1' if val else b'0'
+    if type(val) is int:
+        return TAG_INT, str(val).encode('ascii')
+    if type(val) is float:
+        return TAG_FLOAT, repr(val).encode('ascii')
+    if isinstance(val, datetime.datetime):
+        return TAG_DATETIME, val.isoformat().encode('ascii')
+    if isinstance(val, datetime.date):
+        return TAG_DATE, val.isoformat().encode('ascii')
+    if isinstance(val, datetime.time):
+        return TAG_TIME, val.isoformat().encode('ascii')
+    if isinstance(val, datetime.timedelta):
+        return TAG_TIMEDELTA, str(val // datetime.timedelta(microseconds=1)).encode('ascii')
+    raise TypeError(f'Cannot cache a cell value of type {type(val).__name__}')
+
+
+def decode_cell(tag, raw):
+    if tag == TAG_NONE:
+        return None
+    if tag == TAG_STR:
+        return str(raw, 'utf-8', 'surrogatepass')
+    text = str(raw, 'ascii')
+    if tag == TAG_INT:
+        return int(text)
+    if tag == TAG_FLOAT:
+        return float(text)
+    if tag == TAG_BOOL:
+        return text == '1'
+    if tag == TAG_DATETIME:
+        return datetime.datetime.fromisoformat(text)
+    if tag == TAG_DATE:
+        return datetime.date.fromisoformat(text)
+    if tag == TAG_TIME:
+        return datetime.time.fromisoformat(text)
+    if tag == TAG_TIMEDELTA:
+        return datetime.timedelta(microseconds=int(text))
+    raise ValueError(f'Unknown cell tag {tag} in columnar cache')
+
+
+def pack_cells(cells):
+    """Encode a column as (offsets int64[n + 1], tags bytes[n], blob bytes)."""
+    tags = bytearray(len(cells))
+    parts = []
+    offsets = array.array('q', [0])
+    end = 0
+    for i, val in enumerate(cells):
+        tags[i], raw = encode_cell(val)
+        parts.append(raw)
+        end += len(raw)
+        offsets.append(end)
+    return offsets, tags, b''.join(parts)
+
+
+def cache_path(file_path, sheet_name='Data', cache_dir=None):
+    directory, name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(cache_dir or directory, f'.{name}.{sheet_name}.colcache')
+
+
+def file_hash(file_path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _pad8(n):
+    return (n + 7) & ~7
+
+
+def _spill_batch(spill, chunks, batch, first_row):
+    """Pack every known column of a batch of rows into the spill file."""
+    width = max(len(row) for row in batch)
+    chunks.extend([] for _ in range(len(chunks), width))
+    for col, col_chunks in enumerate(chunks):
+        offsets, tags, blob = pack_cells([row[col] if col < len(row) else None for row in batch])
+        col_chunks.append((first_row, len(batch), spill.tell(), len(blob)))
+        spill.write(offsets.tobytes())
+        spill.write(tags)
+        spill.write(blob)
+
+
+def _write_column(f, spill, col_chunks):
+    """Copy one column's chunks into place as offsets, tags and blob; cells before its first chunk are None."""
+    gap = col_chunks[0][0]
+    f.write(bytes(8 * (gap + 1)))
+    base = 0
+    for _, n, position, blob_size in col_chunks:
+        spill.seek(position + 8)
+        chunk_offsets = array.array('q')
+        chunk_offsets.frombytes(spill.read(8 * n))
+        f.write(array.array('q', (base + offset for offset in chunk_offsets)).tobytes())
+        base += blob_size
+    f.write(bytes(gap))
+    for _, n, position, _ in col_chunks:
+        spill.seek(position + 8 * (n + 1))
+        f.write(spill.read(n))
+    for _, n, position, blob_size in col_chunks:
+        spill.seek(position + 8 * (n + 1) + n)
+        f.write(spill.read(blob_size))
+
+
+def build_cache(file_path, sheet_name='Data', path=None):
+    """Parse `sheet_name` once and write its columnar cache file; returns the cache path.
+
+    Rows are packed SPILL_ROWS at a time into a temporary spill file and each column's
+    chunks are copied into place afterwards, so only one batch is held in memory.
+    """
+    path = path or cache_path(file_path, sheet_name)
+    st = os.stat(file_path)
+    chunks = []
+    n_rows = 0
+    tmp_path = path + '.tmp'
+    with tempfile.TemporaryFile(dir=os.path.dirname(path)) as spill:
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            rows = wb[sheet_name].iter_rows(values_only=True)
+            while True:
+                batch = list(islice(rows, SPILL_ROWS))
+                if not batch:
+                    break
+                _spill_batch(spill, chunks, batch, n_rows)
+                n_rows += len(batch)
+        finally:
+            wb.close()
+
+        sizes = [8 * (n_rows + 1) + n_rows + sum(blob_size for *_, blob_size in col_chunks)
+                 for col_chunks in chunks]
+        layout = []
+        position = 0
+        for size in sizes:
+            layout.append(position)
+            position += _pad8(size)
+        header = json.dumps({'path': os.path.abspath(file_path), 'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                             'hash': file_hash(file_path), 'sheet': sheet_name, 'rows': n_rows,
+                             'columns': layout}).encode('utf-8')
+        data_start = _pad8(len(MAGIC) + 8 + len(header))
+
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            f.write(bytes(data_start - f.tell()))
+            for col_chunks, start, size in zip(chunks, layout, sizes):
+                _write_column(f, spill, col_chunks)
+                f.write(bytes(data_start + start + _pad8(size) - f.tell()))
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        size = int.from_bytes(f.read(8), 'little')
+        return json.loads(f.read(size))
+
+
+def _rewrite_header(path, header):
+    """Write `header` over the stored one, space-padded to its length; skipped if it no longer fits."""
+    raw = json.dumps(header).encode('utf-8')
+    with open(path, 'r+b') as f:
+        f.seek(len(MAGIC))
+        size = int.from_bytes(f.read(8), 'little')
+        if len(raw) <= size:
+            f.write(raw.ljust(size))
+
+
+def is_fresh(header, file_path, sheet_name, path=None):
+    if header is None or header['sheet'] != sheet_name:
+        return False
+    st = os.stat(file_path)
+    if (header['mtime_ns'], header['size']) == (st.st_mtime_ns, st.st_size):
+        return True
+    # Touched or copied but unchanged content still reuses the cache
+    if header['size'] != st.st_size or header['hash'] != file_hash(file_path):
+        return False
+    # Record the new mtime so later runs skip hashing the workbook again
+    if path is not None:
+        _rewrite_header(path, dict(header, mtime_ns=st.st_mtime_ns))
+    return True
+
+
+def open_cache(file_path, sheet_name='Data', cache_dir=None):
+    """Open (building or rebuilding if stale) the columnar cache of one sheet."""
+    path = cache_path(file_path, sheet_name, cache_dir)
+    header = _read_header(path) if os.path.exists(path) else None
+    if not is_fresh(header, file_path, sheet_name, path):
+        build_cache(file_path, sheet_name, path)
+        header = _read_header(path)
+    f = open(path, 'rb')
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    size = int.from_bytes(mm[len(MAGIC):len(MAGIC) + 8], 'little')
+    data_start = _pad8(len(MAGIC) + 8 + size)
+    return {'file': f, 'mm': mm, 'view': memoryview(mm), 'rows': header['rows'],
+            'starts': [data_start + start for start in header['columns']], 'path': path, 'views': []}
+
+
+def close_cache(cache):
+    for view in reversed(cache['views']):
+        view.release()
+    cache['view'].release()
+    cache['mm'].close()
+    cache['file'].close()
+
+
+def _column_reader(cache, col):
+    n = cache['rows']
+    start = cache['starts'][col]
+    view = cache['view']
+    raw_offsets = view[start:start + 8 * (n + 1)]
+    offsets = raw_offsets.cast('q')
+    tags = view[start + 8 * (n + 1):start + 8 * (n + 1) + n]
+    cache['views'].extend((raw_offsets, offsets, tags))
+    blob_start = start + 8 * (n + 1) + n
+    return lambda i: decode_cell(tags[i], view[blob_start + offsets[i]:blob_start + offsets[i + 1]])
+
+
+def iter_cached_rows(cache, columns=None):
+    """Rows as tuples like ws.iter_rows(values_only=True), header row first.
+
+    With `columns` (0-based indices) only those columns are decoded; the others are None.
+    """
+    width = len(cache['starts'])
+    wanted = range(width) if columns is None else sorted(c for c in columns if c < width)
+    readers = [(col, _column_reader(cache, col)) for col in wanted]
+    if columns is None:
+        for i in range(cache['rows']):
+            yield tuple(read(i) for _, read in readers)
+        return
+    for i in range(cache['rows']):
+        row = [None] * width
+        for col, read in readers:
+            row[col] = read(i)
+        yield tuple(row)
+
+
+def iter_sheet_cache(file_path, sheet_name='Data', cache_dir=None, columns=None):
+    """Open the sheet's cache, yield its rows (see iter_cached_rows) and close it."""
+    cache = open_cache(file_path, sheet_name, cache_dir)
+    try:
+        yield from iter_cached_rows(cache, columns)
+    finally:
+        close_cache(cache)
@@ -1,6 +1,8 @@
 import openpyxl
 import re
 from collections import defaultdict
+from summary import new_summary, record_row, write_summary_sheet
+from header_styles import find_highlighted_columns, DEFAULT_HIGHLIGHT_COLORS
 
 def get_actual_data_limits(ws):
     max_row = ws.max_row
@@ -73,7 +75,7 @@ def parse_number_and_extension(val):
         return float(number), extension.lower()
     return None, None
 
-def run_validation_all(file_path, output_path):
+def run_validation_all(file_path, output_path, highlight_colors=DEFAULT_HIGHLIGHT_COLORS):
     wb = openpyxl.load_workbook(file_path)
     sheet1 = wb['Sheet1']
     sheet2 = wb['Data']
@@ -84,16 +86,8 @@ def run_validation_all(file_path, output_path):
     headers_sheet1 = [cell.value for cell in sheet1[1][:max_col1]]
     headers_sheet2 = [cell.value for cell in sheet2[1][:max_col2]]
 
-    green_hex = '00B050'
-    green_col_indices = []
-    for idx, cell in enumerate(sheet2[1][:max_col2], start=1):
-        fill_color = cell.fill.start_color
-        if fill_color.type == 'rgb' and fill_color.rgb and fill_color.rgb[-6:].upper() == green_hex:
-            green_col_indices.append(idx)
-        elif fill_color.type == 'indexed':
-            if fill_color.indexed == 10:
-                green_col_indices.append(idx)
-    green_headers = [sheet2.cell(row=1, column=i).value for i in green_col_indices]
+    green_col_indices = find_highlighted_columns(file_path, 'Data', highlight_colors, max_col=max_col2)
+    green_headers = [headers_sheet2[i - 1] for i in green_col_indices]
 
     common_columns = list(set(green_headers).intersection(headers_sheet1))
 
@@ -126,11 +120,11 @@ def run_validation_all(file_path, output_path):
     else:
         comments_col_idx = headers_sheet2.index('Comments') + 1
 
-    error_counters = defaultdict(int)
-    total_cells_checked = 0
+    summary = new_summary(common_columns)
 
     for row_num, row in enumerate(sheet2.iter_rows(min_row=2, max_row=max_row2, max_col=max_col2), start=2):
         row_errors = []
+        row_issues = []
         for col in common_columns:
             col_idx_data = headers_sheet2.index(col)
             cell = row[col_idx_data]
@@ -150,8 +144,6 @@ def run_validation_all(file_path, output_path):
                         row_errors.append(f'{col}: Fixed commas and delimiters')
                     cell.value = val
 
-            total_cells_checked += 1
-
             # Case correction with comment
             # if isinstance(val, str) and col in allowed_values:
             #     mapped_val, changed = standardize_case(val, allowed_values[col])
@@ -185,15 +177,19 @@ def run_validation_all(file_path, output_path):
                         cell.value = val_new
                         val = val_new
                         row_errors.append(f'{col}: Added missing extension "{ext_val}"')
+                        row_issues.append((col, 'unit_extension', val))
                     elif ext_val != '' and ext_val not in exts_allowed:
                         row_errors.append(f'{col}: Extension "{ext_val}" not standard but accepted')
+                        row_issues.append((col, 'unit_nonstandard', val))
                     if ext_val in exts_allowed:
                         min_n, max_n = exts_allowed[ext_val]
                         if num_val < min_n or num_val > max_n:
                             row_errors.append(f'{col}: Numeric value {num_val} exceeds allowed range [{min_n}, {max_n}]')
+                            row_issues.append((col, 'unit_range', val))
                 else:
                     if val not in allowed_values[col]:
                         row_errors.append(f'{col}: Value "{val}" not allowed')
+                        row_issues.append((col, 'invalid_value', val))
             else:
                 # Check allowed values with duplicates and empty values handled
                 if val is not None:
@@ -203,26 +199,26 @@ def run_validation_all(file_path, output_path):
                             row_errors.append(f'{col}: Empty value not allowed')
                         if len(values) != len(set(values)):
                             row_errors.append(f'{col}: Duplicated values in cell')
-                            error_counters['duplicates'] += 1
+                            row_issues.append((col, 'duplicates', val))
                         for v in values:
                             if v not in allowed_values[col]:
                                 row_errors.append(f'{col}: Value "{v}" not allowed')
-                                error_counters['invalid_value'] += 1
+                                row_issues.append((col, 'invalid_value', v))
                     else:
                         if str(val) not in allowed_values[col]:
                             row_errors.append(f'{col}: Value "{val}" not allowed')
-                            error_counters['invalid_value'] += 1
+                            row_issues.append((col, 'invalid_value', val))
 
             # Numeric formatting checks
             if isinstance(val, str) and re.fullmatch(r'\d+(\.\d+)?', val):
                 if val.endswith('.0'):
                     row_errors.append(f'{col}: Numeric value ends with .0')
-                    error_counters['numeric_format'] += 1
+                    row_issues.append((col, 'numeric_format', val))
                 if '.' in val:
                     dec = val.split('.')[1]
                     if len(dec) > 2:
                         row_errors.append(f'{col}: Numeric value has more than two decimals')
-                        error_counters['numeric_format'] += 1
+                        row_issues.append((col, 'numeric_format', val))
 
             # Trim special chars
             if isinstance(val, str):
@@ -236,20 +232,13 @@ def run_validation_all(file_path, output_path):
             # Formula detection
             if isinstance(val, str) and val.startswith('='):
                 row_errors.append(f'{col}: Contains formula')
-                error_counters['formula'] += 1
+                row_issues.append((col, 'formula', val))
 
         if row_errors:
             sheet2.cell(row=row_num, column=comments_col_idx).value = ', '.join(row_errors)
-            for err in set(row_errors):
-                error_counters[err.split(':')[0].lower()] += 1
+        record_row(summary, row_issues)
 
-    # Summary Sheet
-    summary_sheet = wb.create_sheet('Validation_Summary')
-    summary_sheet.append(['Error Type', 'Count', 'Percentage'])
-    total = total_cells_checked if total_cells_checked > 0 else 1
-    for error, count in error_counters.items():
-        pct = round((count / total) * 100, 2)
-        summary_sheet.append([error, count, pct])
+    write_summary_sheet(wb.create_sheet('Validation_Summary'), summary)
 
     wb.save(output_path)
 
@@ -0,0 +1,66 @@
+from tokenizer import tokenize_cell
+
+# Dependent-column rules: with `depends_on: {Voltage: [Motor Type]}` every Sheet1 row
+# adds its Voltage value(s) under the key ("ac",) of its Motor Type, so the valid
+# combinations are one hash map per rule, built in the same pass as the allowed
+# values. A Data row is then checked with one lookup per rule: 230V passes only if
+# some Sheet1 row pairs it with that Motor Type. Keys and values are compared
+# case-insensitively; Data keys that Sheet1 never lists are left to the column's own
+# allowed-value check.
+
+
+def _key_part(val):
+    return '' if val is None else str(val).strip().lower()
+
+
+def new_combinations(depends_on, headers):
+    """Empty combination indexes for the rules whose columns are all in the reference `headers`."""
+    combinations = {}
+    for col, keys in depends_on.items():
+        if col in headers and all(key in headers for key in keys):
+            combinations[col] = {'keys': list(keys), 'positions': [headers.index(key) for key in keys],
+                                 'position': headers.index(col), 'allowed': {}}
+    return combinations
+
+
+def add_combinations(combinations, row):
+    """Index one reference row."""
+    for combo in combinations.values():
+        i = combo['position']
+        val = row[i] if i < len(row) else None
+        if val is None or str(val).strip() == '':
+            continue
+        key = tuple(_key_part(row[p] if p < len(row) else None) for p in combo['positions'])
+        allowed = combo['allowed'].setdefault(key, set())
+        text = str(val).strip()
+        allowed.add(text.lower())
+        allowed.update(token.lower() for token in tokenize_cell(text))
+
+
+def build_dependencies(headers, reference):
+    """[(column, position, key columns, key positions, index), ...] for the Data `headers`."""
+    checks = []
+    for col, combo in reference.get('combinations', {}).items():
+        if col in headers and all(key in headers for key in combo['keys']):
+            checks.append((col, headers.index(col), combo['keys'], [headers.index(key) for key in combo['keys']],
+                           combo['allowed']))
+    return checks
+
+
+def check_dependencies(checks, values, errors):
+    """Append an error per dependent value that Sheet1 never pairs with the row's key values."""
+    for col, position, keys, key_positions, index in checks:
+        val = values[position]
+        if val is None or str(val).strip() == '':
+            continue
+        key = tuple(_key_part(values[p]) for p in key_positions)
+        allowed = index.get(key)
+        if allowed is None:
+            continue
+        text = str(val).strip()
+        if text.lower() in allowed:
+            continue
+        where = ', '.join(f'{k} "{values[p]}"' for k, p in zip(keys, key_positions))
+        for token in tokenize_cell(text) or (text,):
+            if token.lower() not in allowed:
+                errors.append((col, 'dependency', f'Value "{token}" not valid for {where}', token))
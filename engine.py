@@ -0,0 +1,702 @@
+import os
+import re
+import csv
+import json
+import time
+import shutil
+import tempfile
+from collections import OrderedDict
+from itertools import islice
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+
+from header_styles import probe_header, DEFAULT_HIGHLIGHT_COLORS
+from rules import DEFAULT_RULES, load_rules, validate_rules, compile_rules, rules_signature, fix_quotes, clean_commas
+from reference_store import (open_reference_store, close_reference_store, new_store_column, prefetch,
+                             prefetch_cells, store_whole_values)
+from unit_index import build_unit_index
+from prices import parse_price
+from quantiles import new_sketch, sketch_add
+from dependencies import new_combinations, add_combinations, build_dependencies, check_dependencies
+from uniqueness import build_uniqueness, check_uniqueness, close_uniqueness
+from highlights import new_highlights, highlight_row, write_highlights
+from shared_strings import share_columns, save_workbook
+from sheet_copy import copy_sheet
+from summary import (new_summary, record_row, merge_summary, total_cells, total_errors, summary_dict,
+                     write_summary_sheet, write_sheet_summaries)
+
+# Streaming validation engine: Sheet1 and Data are read with read_only workbooks,
+# the output is written with a write_only workbook, and every validated column
+# runs only the checks compiled for it from the rule config (see rules.py).
+
+HEADER_FILL = PatternFill('solid', start_color='FF00B050')
+BATCH_ROWS = 1000
+DATA_SHEET_PATTERN = r'Data(_\d+)?'
+# Distinct Comments / Updates texts kept, least recently used dropped first;
+# high-error files repeat a few hundred
+MAX_INTERNED_TEXTS = 65536
+# Distinct validated-cell tuples remembered per sheet (see validate_row_cached)
+MAX_ROW_CACHE = 100000
+# Prepared validations kept for repeated runs (input file, rules, sheets), least recently used dropped first
+MAX_PREPARED = 8
+
+_prepared_cache = OrderedDict()
+_issue_texts = OrderedDict()
+
+
+def read_header_row(ws):
+    for row in ws.iter_rows(max_row=1, values_only=True):
+        return list(row)
+    return []
+
+
+def build_reference(ws, columns, depends_on=None):
+    """Single streaming pass over the reference sheet collecting allowed values per column.
+
+    The same pass feeds a quantile sketch per column with the values that parse as numbers,
+    and indexes the valid value combinations of the `depends_on` rules.
+    """
+    rows = ws.iter_rows(values_only=True)
+    headers = list(next(rows, ()))
+    idx_map = {col: headers.index(col) for col in columns if col in headers}
+    values = {col: [] for col in idx_map}
+    sketches = {col: new_sketch() for col in idx_map}
+    combinations = new_combinations(depends_on or {}, headers)
+    for row in rows:
+        if combinations:
+            add_combinations(combinations, row)
+        for col, i in idx_map.items():
+            if i < len(row) and row[i] is not None:
+                values[col].append(str(row[i]).strip())
+                number = parse_price(row[i])
+                if number is not None:
+                    sketch_add(sketches[col], number)
+
+    allowed = {}
+    units = {}
+    for col, vals in values.items():
+        col_allowed = set()
+        single_values = []
+        for v in vals:
+            col_allowed.add(v)
+            if ',' in v:
+                col_allowed.update(p.strip() for p in v.split(','))
+            else:
+                single_values.append(v)
+        allowed[col] = col_allowed
+        unit_idx = build_unit_index(single_values)
+        if unit_idx:
+            units[col] = unit_idx
+    sketches = {col: sketch for col, sketch in sketches.items() if sketch['n']}
+    return {'headers': headers, 'values': values, 'allowed': allowed, 'units': units, 'sketches': sketches,
+            'combinations': combinations}
+
+
+def add_store_reference(reference, store, columns):
+    """Point `columns` of the reference at the external store; lookups are filled lazily."""
+    reference.setdefault('case_maps', {})
+    reference.setdefault('resolvers', {})
+    reference.setdefault('store_columns', {})
+    for col in columns:
+        store_col = new_store_column(col)
+        whole_values = store_whole_values(store, col)
+        reference['values'][col] = whole_values
+        reference['allowed'][col] = store_col['allowed']
+        reference['case_maps'][col] = store_col['case_map']
+        reference['resolvers'][col] = lambda tokens, sc=store_col: prefetch(store, sc, tokens)
+        reference['store_columns'][col] = store_col
+        # Comma lists are not sizes, as in build_reference
+        unit_idx = build_unit_index([val for val in whole_values if ',' not in val])
+        if unit_idx:
+            reference['units'][col] = unit_idx
+        else:
+            reference['units'].pop(col, None)
+        sketch = new_sketch()
+        for val in whole_values:
+            number = parse_price(val)
+            if number is not None:
+                sketch_add(sketch, number)
+        reference['sketches'][col] = sketch
+
+
+def load_config(rules):
+    if isinstance(rules, str):
+        return load_rules(rules)
+    return validate_rules(rules or {'defaults': DEFAULT_RULES})
+
+
+def resolve_columns(wb, file_path, config, highlight_colors, data_sheet, reference_sheet, store=None):
+    """(headers, green, columns, local_columns) of one Data sheet; local columns use the reference sheet."""
+    header_cells = probe_header(file_path, data_sheet, highlight_colors)
+    width = max((col_idx for col_idx, _, _ in header_cells), default=0)
+    headers = [None] * width
+    green = set()
+    for col_idx, header, is_green in header_cells:
+        headers[col_idx - 1] = header
+        if is_green:
+            green.add(col_idx - 1)
+
+    if reference_sheet not in wb.sheetnames and store is None:
+        raise KeyError(f'Worksheet {reference_sheet} does not exist.')
+    reference_headers = set(read_header_row(wb[reference_sheet])) if reference_sheet in wb.sheetnames else set()
+    store_headers = store['columns'] if store is not None else set()
+    columns = [h for i, h in enumerate(headers)
+               if h is not None and ((i in green and (h in reference_headers or h in store_headers))
+                                     or h in config['columns'])]
+    local_columns = [col for col in columns if col not in store_headers]
+    return headers, green, columns, local_columns
+
+
+def prepare_validation(wb, file_path, rules=None, highlight_colors=DEFAULT_HIGHLIGHT_COLORS,
+                       data_sheet='Data', reference_sheet='Sheet1', store=None, reference=None):
+    """Resolve the validated columns, index the reference and compile the per-column pipelines.
+
+    The result is cached per (workbook, rule file) so repeated runs skip Sheet1 indexing
+    and rule compilation. `rules` is a path to a JSON/YAML rule file, an already loaded
+    config dict, or None for the defaults. With an external reference `store`, columns
+    it knows are validated against it instead of the local reference sheet. A `reference`
+    already built from the reference sheet (see prepare_sheets) is reused as is.
+    """
+    st = os.stat(file_path)
+    rules_key = rules_signature(rules) if isinstance(rules, str) else json.dumps(rules, sort_keys=True, default=str)
+    key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size, rules_key,
+           tuple(highlight_colors), data_sheet, reference_sheet)
+    if store is None and key in _prepared_cache:
+        _prepared_cache.move_to_end(key)
+        return _prepared_cache[key]
+
+    config = load_config(rules)
+    headers, green, columns, local_columns = resolve_columns(wb, file_path, config, highlight_colors,
+                                                             data_sheet, reference_sheet, store)
+    if reference is None and reference_sheet in wb.sheetnames:
+        reference = build_reference(wb[reference_sheet], local_columns, config['depends_on'])
+    elif reference is None:
+        reference = {'headers': [], 'values': {}, 'allowed': {}, 'units': {}, 'sketches': {}}
+    if store is not None:
+        add_store_reference(reference, store, [col for col in columns if col not in local_columns])
+    pipelines = compile_rules(config, reference, columns)
+    plan = [(col, headers.index(col), pipelines[col]) for col in columns if col in pipelines]
+
+    prepared = {'headers': headers, 'green': green, 'plan': plan, 'reference': reference, 'config': config}
+    if store is None:
+        _prepared_cache[key] = prepared
+        if len(_prepared_cache) > MAX_PREPARED:
+            _prepared_cache.popitem(last=False)
+    return prepared
+
+
+def data_sheet_names(sheetnames, pattern=DATA_SHEET_PATTERN):
+    """Names of the sheets to validate: every sheet whose name fully matches `pattern`."""
+    regex = re.compile(pattern)
+    return [name for name in sheetnames if regex.fullmatch(name)]
+
+
+def shared_reference(wb, file_path, rules, highlight_colors, data_sheets, reference_sheet, store=None):
+    """One reference for several Data sheets, from a single pass over the reference sheet."""
+    config = load_config(rules)
+    local_columns = []
+    for sheet in data_sheets:
+        for col in resolve_columns(wb, file_path, config, highlight_colors, sheet, reference_sheet, store)[3]:
+            if col not in local_columns:
+                local_columns.append(col)
+    if reference_sheet not in wb.sheetnames:
+        return None
+    return build_reference(wb[reference_sheet], local_columns, config['depends_on'])
+
+
+def prepare_sheets(wb, file_path, rules, highlight_colors, data_sheets, reference_sheet, store=None):
+    """{sheet: prepared} for several Data sheets compiled against one shared reference."""
+    if len(data_sheets) == 1:
+        return {data_sheets[0]: prepare_validation(wb, file_path, rules, highlight_colors, data_sheets[0],
+                                                   reference_sheet, store)}
+    reference = shared_reference(wb, file_path, rules, highlight_colors, data_sheets, reference_sheet, store)
+    return {sheet: prepare_validation(wb, file_path, rules, highlight_colors, sheet, reference_sheet, store,
+                                      reference)
+            for sheet in data_sheets}
+
+
+def iter_batches(rows, size):
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def prefetch_batch(store, prepared, batch):
+    """Batched reference-store lookups for every store-backed column of a batch of rows."""
+    headers = prepared['headers']
+    for col, store_col in prepared['reference'].get('store_columns', {}).items():
+        idx = headers.index(col)
+        prefetch_cells(store, store_col, [row[idx] for row in batch if idx < len(row)],
+                       clean=lambda v: clean_commas(fix_quotes(v)))
+
+
+def validate_row(values, plan):
+    """Run the compiled checks over one Data row.
+
+    Fixes are written back into `values` (a list); returns (errors, updates) as lists of
+    (column, rule, message, value), `value` being what the rule checked (the failing token
+    for multi-value cells).
+    """
+    errors = []
+    updates = []
+    for col, idx, checks in plan:
+        val = values[idx] if idx < len(values) else None
+        col_errors = []
+        col_updates = []
+        for check in checks:
+            val = check(val, col_errors, col_updates)
+        if idx < len(values):
+            values[idx] = val
+        for rule, message, value in col_errors:
+            errors.append((col, rule, message, value))
+        for rule, message, value in col_updates:
+            updates.append((col, rule, message, value))
+    return errors, updates
+
+
+def new_row_cache(max_rows=MAX_ROW_CACHE):
+    return {'results': {}, 'max_rows': max_rows, 'rows': 0, 'validated': 0}
+
+
+def validate_row_cached(values, plan, cache):
+    """validate_row that runs the checks once per distinct tuple of validated cells.
+
+    Rows repeating the same validated values (variants differing only in other columns)
+    get the remembered fixes and issues copied in. Types are part of the key so 1,
+    1.0 and True stay apart.
+    """
+    cache['rows'] += 1
+    key = tuple((type(values[idx]), values[idx]) for _, idx, _ in plan)
+    hit = cache['results'].get(key)
+    if hit is not None:
+        fixed, errors, updates = hit
+        for (_, idx, _), val in zip(plan, fixed):
+            values[idx] = val
+        return list(errors), list(updates)
+    cache['validated'] += 1
+    errors, updates = validate_row(values, plan)
+    if len(cache['results']) < cache['max_rows']:
+        cache['results'][key] = (tuple(values[idx] for _, idx, _ in plan), tuple(errors), tuple(updates))
+    return errors, updates
+
+
+def dedup_stats(caches):
+    """{'rows', 'validated', 'ratio'} over one or more row caches; ratio = rows per validation."""
+    rows = sum(cache['rows'] for cache in caches)
+    validated = sum(cache['validated'] for cache in caches)
+    return {'rows': rows, 'validated': validated, 'ratio': round(rows / validated, 2) if validated else 1.0}
+
+
+def format_issues(issues):
+    """Comment text of an issue list, built once per distinct list and shared afterwards."""
+    # Keyed without the checked values, so rows failing a rule on different values share the text
+    key = tuple((col, message) for col, _, message, _ in issues)
+    text = _issue_texts.get(key)
+    if text is not None:
+        _issue_texts.move_to_end(key)
+        return text
+    text = _issue_texts[key] = ', '.join(f'{col}: {message}' for col, message in key)
+    if len(_issue_texts) > MAX_INTERNED_TEXTS:
+        _issue_texts.popitem(last=False)
+    return text
+
+
+def output_columns(headers):
+    """Return (comments_idx, updates_idx, width) for the output Data sheet, 0-based."""
+    width = len(headers)
+    if 'Comments' in headers:
+        comments_idx = headers.index('Comments')
+    else:
+        comments_idx = width
+        width += 1
+    if 'Updates Here' in headers:
+        updates_idx = headers.index('Updates Here')
+    else:
+        updates_idx = width
+        width += 1
+    return comments_idx, updates_idx, width
+
+
+def write_header(ws_out, headers, green, comments_idx, updates_idx, width):
+    names = list(headers) + [None] * (width - len(headers))
+    names[comments_idx] = 'Comments'
+    names[updates_idx] = 'Updates Here'
+    cells = []
+    for i in range(width):
+        cell = WriteOnlyCell(ws_out, value=names[i])
+        if i in green:
+            cell.fill = HEADER_FILL
+        cells.append(cell)
+    return cells
+
+
+def append_text(existing, text):
+    return (existing + ', ' if existing else '') + text
+
+
+def issue_values(issues):
+    """(column, rule, value) triples for the summary counters, with the value each rule failed on."""
+    return [(col, rule, value) for col, rule, _, value in issues]
+
+
+def iter_row_results(rows, prepared, store=None, row_cache=None):
+    """Validate the Data rows after the header; yields (row_num, values, errors, updates).
+
+    `values` carries the fixes and is padded to the output width. With a `row_cache`
+    (new_row_cache) identical rows are validated once.
+    """
+    headers = prepared['headers']
+    plan = prepared['plan']
+    width = output_columns(headers)[2]
+    config = prepared['config']
+    uniqueness = build_uniqueness(headers, config['unique'], config['near_duplicates'],
+                                  ('Comments', 'Updates Here'), config['spill_threshold'])
+    dependencies = build_dependencies(headers, prepared['reference'])
+    row_num = 1
+    try:
+        for batch in iter_batches(rows, BATCH_ROWS):
+            if store is not None:
+                prefetch_batch(store, prepared, batch)
+            for row in batch:
+                row_num += 1
+                values = list(row)
+                if len(values) < width:
+                    values.extend([None] * (width - len(values)))
+                if row_cache is not None:
+                    errors, updates = validate_row_cached(values, plan, row_cache)
+                else:
+                    errors, updates = validate_row(values, plan)
+                check_dependencies(dependencies, values, errors)
+                check_uniqueness(uniqueness, values, row_num, errors)
+                yield row_num, values, errors, updates
+    finally:
+        close_uniqueness(uniqueness)
+
+
+def render_rows(results, summary, col_index, comments_idx, updates_idx, highlights=None):
+    """Output rows with the Comments / Updates Here text, counting every issue in `summary`.
+
+    With `highlights` (see highlights.py) the cells with errors are collected for highlighting.
+    """
+    for row_num, values, errors, updates in results:
+        record_row(summary, issue_values(errors))
+        if highlights is not None and errors:
+            highlight_row(highlights, row_num, {col_index[col] for col, _, _, _ in errors if col in col_index})
+        if updates:
+            values[updates_idx] = append_text(values[updates_idx], format_issues(updates))
+        if errors:
+            values[comments_idx] = append_text(values[comments_idx], format_issues(errors))
+        yield values
+
+
+def touched_columns(prepared):
+    """0-based Data columns a run reads (validated, unique keys, depends_on columns), or None when it needs all."""
+    config = prepared['config']
+    if config['near_duplicates']:
+        return None
+    headers = prepared['headers']
+    columns = {idx for _, idx, _ in prepared['plan']}
+    for spec in config['unique']:
+        columns.update(headers.index(col) for col in spec if col in headers)
+    for col, keys in config['depends_on'].items():
+        columns.update(headers.index(c) for c in [col] + list(keys) if c in headers)
+    return columns
+
+
+def data_rows(src, file_path, data_sheet, cache=None, columns=None):
+    """Data sheet rows (header first), from the workbook or from its columnar cache.
+
+    `cache` is True (cache next to the workbook) or a cache directory; see columnar_cache.py.
+    """
+    if not cache:
+        return src[data_sheet].iter_rows(values_only=True)
+    from columnar_cache import iter_sheet_cache
+    return iter_sheet_cache(file_path, data_sheet, None if cache is True else cache, columns)
+
+
+def run_validation_all(file_path, output_path, rules=None, highlight_colors=DEFAULT_HIGHLIGHT_COLORS,
+                       data_sheet='Data', reference_sheet='Sheet1', reference_store=None, out_of_core=False,
+                       sample_size=None, seed=None, workers=None, cache=None, data_sheets=None, pipeline=False,
+                       highlight_errors=True, dedup=True):
+    """Validate the Data sheet of `file_path` and write the result to `output_path`.
+
+    `reference_store` optionally points at a shared master list: a directory of master
+    workbooks (indexed once into SQLite) or a SQLite file, or a store from open_reference_store.
+    `out_of_core=True` runs the set-based rules in a temporary SQLite database instead
+    (see out_of_core.py) for Data sheets larger than RAM. `sample_size` validates only a
+    stratified random sample of rows and writes estimated rates to Validation_Summary
+    (see sampling.py). `workers` > 1 validates chunks of rows in worker processes that
+    read the cells from shared-memory column buffers (see shared_columns.py). `cache` reads
+    Data from a memory-mapped columnar cache built on the first run (see columnar_cache.py).
+
+    `data_sheets` is a sheet name pattern (e.g. DATA_SHEET_PATTERN for Data, Data_1, Data_2...)
+    validating every matching sheet against one shared reference; with several matches
+    `workers` processes validate whole sheets in parallel (see multi_sheet.py) and
+    Validation_Summary gets a section per sheet.
+
+    `pipeline=True` overlaps reading, validating and writing on separate threads joined
+    by bounded queues (see pipeline.py); the returned stats then include per-stage
+    utilization under 'stages'. `highlight_errors` fills the cells with errors through
+    conditional formatting (see highlights.py). With `dedup` rows repeating the same
+    validated values are validated once (see validate_row_cached); stats['dedup'] reports
+    rows per validation.
+    """
+    sheets = [data_sheet]
+    if data_sheets:
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        sheets = data_sheet_names(wb.sheetnames, data_sheets)
+        wb.close()
+        if not sheets:
+            raise KeyError(f'No worksheet matches {data_sheets!r}.')
+    multi = len(sheets) > 1
+    if (sample_size or out_of_core) and multi:
+        raise ValueError('sampling and out_of_core modes validate a single data sheet')
+    if sample_size:
+        from sampling import run_sampled
+        return run_sampled(file_path, output_path, sample_size, rules, highlight_colors, sheets[0],
+                           reference_sheet, reference_store, seed=seed)
+    if out_of_core:
+        if reference_store is not None:
+            raise ValueError('out_of_core mode validates against the local reference sheet only')
+        from out_of_core import run_out_of_core
+        return run_out_of_core(file_path, output_path, rules, highlight_colors, sheets[0], reference_sheet,
+                               highlight_errors=highlight_errors)
+    if workers and workers > 1 and reference_store is not None:
+        raise ValueError('worker processes validate against the local reference sheet only')
+    start_time = time.time()
+    store = open_reference_store(reference_store) if isinstance(reference_store, str) else reference_store
+    src = None
+    pool = None
+    spool_dir = None
+    try:
+        src = openpyxl.load_workbook(file_path, read_only=True)
+        prepared_sheets = prepare_sheets(src, file_path, rules, highlight_colors, sheets, reference_sheet, store)
+        sheet_results = None
+        if multi and store is None and workers != 1:
+            from multi_sheet import open_sheet_pool, iter_sheet_results
+            reference = prepared_sheets[sheets[0]]['reference']
+            spool_dir = tempfile.mkdtemp(prefix='spool_', dir=os.path.dirname(os.path.abspath(output_path)))
+            pool = open_sheet_pool(min(workers or os.cpu_count() or 1, len(sheets)), file_path, rules,
+                                   highlight_colors, reference_sheet, reference, spool_dir, dedup, cache)
+            sheet_results = iter_sheet_results(pool, sheets)
+        elif workers and workers > 1:
+            from shared_columns import open_pool
+            pool = open_pool(workers, file_path, rules, highlight_colors, sheets[0], reference_sheet)
+
+        out = openpyxl.Workbook(write_only=True)
+        sheet_summaries = {}
+        stage_timings = {}
+        row_caches = []
+
+        for name in src.sheetnames:
+            ws_out = out.create_sheet(name)
+            if name not in prepared_sheets:
+                copy_sheet(file_path, src[name], ws_out)
+                continue
+
+            prepared = prepared_sheets[name]
+            headers = prepared['headers']
+            comments_idx, updates_idx, width = output_columns(headers)
+            share_columns(ws_out, (comments_idx, updates_idx))
+            ws_out.append(write_header(ws_out, headers, prepared['green'], comments_idx, updates_idx, width))
+            if sheet_results is not None:
+                from multi_sheet import iter_spooled
+                _, spool_path, sheet_summaries[name], highlights, row_cache = next(sheet_results)
+                if row_cache is not None:
+                    row_caches.append(row_cache)
+                for values in iter_spooled(spool_path):
+                    ws_out.append(values)
+                if highlight_errors:
+                    write_highlights(ws_out, highlights)
+                continue
+
+            summary = sheet_summaries[name] = new_summary([col for col, _, _ in prepared['plan']])
+            col_index = {h: i for i, h in enumerate(headers) if h is not None}
+            highlights = new_highlights() if highlight_errors else None
+            row_cache = new_row_cache() if dedup and pool is None else None
+            if row_cache is not None:
+                row_caches.append(row_cache)
+            rows = data_rows(src, file_path, name, cache)
+            next(rows, None)
+
+            def validate(rows):
+                if pool is not None:
+                    from shared_columns import iter_shared_results
+                    results = iter_shared_results(rows, prepared, pool, workers)
+                else:
+                    results = iter_row_results(rows, prepared, store, row_cache)
+                return render_rows(results, summary, col_index, comments_idx, updates_idx, highlights)
+
+            if pipeline:
+                from pipeline import run_pipeline
+                stage_timings[name] = run_pipeline(rows, validate, ws_out.append)
+            else:
+                for values in validate(rows):
+                    ws_out.append(values)
+            if highlights:
+                write_highlights(ws_out, highlights)
+
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if multi:
+            summary = new_summary([])
+            for sheet_summary in sheet_summaries.values():
+                merge_summary(summary, sheet_summary)
+            write_sheet_summaries(out.create_sheet('Validation_Summary'), summary, sheet_summaries)
+        else:
+            summary = sheet_summaries[sheets[0]]
+            write_summary_sheet(out.create_sheet('Validation_Summary'), summary)
+        save_workbook(out, output_path)
+    finally:
+        if pool is not None:
+            # Stops the workers early when validation failed; already joined otherwise
+            pool.terminate()
+        if spool_dir is not None:
+            # Spools of sheets that were never copied over when validation failed
+            shutil.rmtree(spool_dir, ignore_errors=True)
+        if src is not None:
+            src.close()
+        if isinstance(reference_store, str) and store is not None:
+            close_reference_store(store)
+    stats = {'rows': summary['rows'], 'cells': total_cells(summary), 'errors': total_errors(summary),
+             'seconds': round(time.time() - start_time, 3)}
+    if multi:
+        stats['sheets'] = {name: {'rows': s['rows'], 'errors': total_errors(s)} for name, s in sheet_summaries.items()}
+    if row_caches:
+        stats['dedup'] = dedup_stats(row_caches)
+    if stage_timings:
+        stats['stages'] = stage_timings if multi else stage_timings[sheets[0]]
+    return stats
+
+
+def run_report(file_path, report_path=None, rules=None, highlight_colors=DEFAULT_HIGHLIGHT_COLORS,
+               data_sheet='Data', reference_sheet='Sheet1', reference_store=None, max_errors=None,
+               include_updates=False, cache=None, dedup=True):
+    """Dry run: validate the Data sheet read-only and report issues without writing a workbook.
+
+    The report goes to `report_path` as JSON (summary + issue list) or, for a .csv path,
+    as a CSV issue list plus a `<name>.summary.csv` next to it. With `max_errors` the run
+    stops as soon as the error budget is exceeded. With `cache` only the columns the rules
+    touch are read from the columnar cache. Returns the summary dict.
+    """
+    start_time = time.time()
+    store = open_reference_store(reference_store) if isinstance(reference_store, str) else reference_store
+    src = openpyxl.load_workbook(file_path, read_only=True)
+    csv_file = None
+    try:
+        if data_sheet not in src.sheetnames:
+            raise KeyError(f'Worksheet {data_sheet} does not exist.')
+        prepared = prepare_validation(src, file_path, rules, highlight_colors, data_sheet, reference_sheet, store)
+        summary = new_summary([col for col, _, _ in prepared['plan']])
+        issues = []
+        if report_path and report_path.lower().endswith('.csv'):
+            csv_file = open(report_path, 'w', newline='', encoding='utf-8')
+            writer = csv.writer(csv_file)
+            writer.writerow(['row', 'column', 'kind', 'rule', 'message'])
+            emit = lambda issue: writer.writerow([issue['row'], issue['column'], issue['kind'],
+                                                  issue['rule'], issue['message']])
+        else:
+            emit = issues.append
+
+        stopped_early = False
+        rows = data_rows(src, file_path, data_sheet, cache, touched_columns(prepared))
+        next(rows, None)
+        row_cache = new_row_cache() if dedup else None
+        results = iter_row_results(rows, prepared, store, row_cache)
+        for row_num, values, errors, updates in results:
+            record_row(summary, issue_values(errors))
+            for col, rule, message, _ in errors:
+                emit({'row': row_num, 'column': col, 'kind': 'error', 'rule': rule, 'message': message})
+            if include_updates:
+                for col, rule, message, _ in updates:
+                    emit({'row': row_num, 'column': col, 'kind': 'update', 'rule': rule, 'message': message})
+            if max_errors is not None and total_errors(summary) > max_errors:
+                stopped_early = True
+                results.close()
+                break
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        src.close()
+        if isinstance(reference_store, str) and store is not None:
+            close_reference_store(store)
+
+    error_total = total_errors(summary)
+    report = {'file': os.path.abspath(file_path), 'sheet': data_sheet, 'rows': summary['rows'],
+              'cells': total_cells(summary), 'errors': error_total, 'max_errors': max_errors,
+              'stopped_early': stopped_early, 'passed': error_total == 0,
+              'summary': summary_dict(summary),
+              'dedup': dedup_stats([row_cache]) if dedup else None,
+              'seconds': round(time.time() - start_time, 3)}
+    if report_path:
+        if csv_file is not None:
+            with open(os.path.splitext(report_path)[0] + '.summary.csv', 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, ['rule', 'count', 'percentage'])
+                writer.writeheader()
+                writer.writerows(report['summary']['rules'])
+        else:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(report, issues=issues), f, indent=2, default=str)
+    return report
+
+
+
+def iter_validated_rows(source, reference=None, rules=None, highlight_colors=DEFAULT_HIGHLIGHT_COLORS,
+                        data_sheet='Data', reference_sheet='Sheet1', cache=None, dedup=True):
+    """Stream the Data sheet of `source` and yield one record per row; nothing is written.
+
+    Records are {'row': n, 'values': {header: cleaned value}, 'issues': [issue, ...]} with
+    issues shaped like run_report's ({'row', 'column', 'kind', 'rule', 'message'}, errors
+    first). `reference` is None for the workbook's own reference sheet, or a shared master
+    list as accepted by run_validation_all's `reference_store`. Rows are read in batches
+    and dropped once yielded; the workbook is closed when the generator finishes or is
+    closed. Without lxml, openpyxl's read-only parser keeps ~70 bytes per parsed row until
+    the sheet ends; with `cache` (columnar cache) memory stays flat.
+    """
+    store = open_reference_store(reference) if isinstance(reference, str) else reference
+    src = openpyxl.load_workbook(source, read_only=True)
+    try:
+        if data_sheet not in src.sheetnames:
+            raise KeyError(f'Worksheet {data_sheet} does not exist.')
+        prepared = prepare_validation(src, source, rules, highlight_colors, data_sheet, reference_sheet, store)
+        named = [(i, h) for i, h in enumerate(prepared['headers']) if h is not None]
+        rows = data_rows(src, source, data_sheet, cache)
+        next(rows, None)
+        results = iter_row_results(rows, prepared, store, new_row_cache() if dedup else None)
+        try:
+            for row_num, values, errors, updates in results:
+                issues = [{'row': row_num, 'column': col, 'kind': 'error', 'rule': rule, 'message': message}
+                          for col, rule, message, _ in errors]
+                issues.extend({'row': row_num, 'column': col, 'kind': 'update', 'rule': rule, 'message': message}
+                              for col, rule, message, _ in updates)
+                yield {'row': row_num, 'values': {h: values[i] for i, h in named}, 'issues': issues}
+        finally:
+            results.close()
+    finally:
+        src.close()
+        if isinstance(reference, str) and store is not None:
+            close_reference_store(store)
+
+
+def iter_issues(source, reference=None, rules=None, include_updates=False, **kwargs):
+    """Yield the issues of `source`'s Data sheet as they are found (see iter_validated_rows).
+
+    For ETL jobs: e.g. `for issue in iter_issues('in.xlsx', rules='rules.yaml'): sink.write(issue)`.
+    """
+    for record in iter_validated_rows(source, reference, rules, **kwargs):
+        for issue in record['issues']:
+            if include_updates or issue['kind'] == 'error':
+                yield issue
+
+
+if __name__ == '__main__':
+    input_file = 'IAC_AC-Drives_reverse_PDW_(by_Steffy-Senson)_1763094814_14fc87e6_Allocation_file_Nov-14.xlsx'  # change file path
+    output_file = 'validated_report_engine.xlsx'
+    rules_file = None  # e.g. 'rules.yaml'
+    stats = run_validation_all(input_file, output_file, rules_file)
+    print(f'Validation completed in {stats["seconds"]:.2f} seconds and saved to {output_file}')
@@ -0,0 +1,248 @@
+import os
+import sys
+import time
+
+# Command-line entry point: `python excel_validate.py validate|report|batch|inspect|bench ...`.
+# Only the standard library is imported at startup; the engine (and openpyxl with it)
+# is imported by the subcommand that needs it, so --help and argument errors stay fast
+# and `python -X importtime excel_validate.py ...` shows the engine as one lazy block.
+
+_START = time.perf_counter()
+STARTUP_BUDGET_MS = 150.0
+BENCH_REPEAT = 5
+
+
+def _engine():
+    import engine
+    return engine
+
+
+def _common_kwargs(args):
+    kwargs = {'rules': args.rules, 'data_sheet': args.data_sheet, 'reference_sheet': args.reference_sheet}
+    if args.highlight_color:
+        from header_styles import DEFAULT_HIGHLIGHT_COLORS
+        kwargs['highlight_colors'] = DEFAULT_HIGHLIGHT_COLORS + tuple(args.highlight_color)
+    if args.reference_store:
+        kwargs['reference_store'] = args.reference_store
+    if args.cache:
+        kwargs['cache'] = True
+    return kwargs
+
+
+def _default_output(input_path, suffix):
+    stem, _ = os.path.splitext(input_path)
+    return f'{stem}{suffix}'
+
+
+def cmd_validate(args):
+    kwargs = _common_kwargs(args)
+    if args.out_of_core:
+        kwargs['out_of_core'] = True
+        kwargs.pop('cache', None)
+    if args.sample:
+        kwargs['sample_size'] = args.sample
+        kwargs['seed'] = args.seed
+        kwargs.pop('cache', None)
+    if args.workers:
+        kwargs['workers'] = args.workers
+    if args.data_sheets:
+        kwargs['data_sheets'] = args.data_sheets
+    if args.pipeline:
+        kwargs['pipeline'] = True
+    output = args.output or _default_output(args.input, '_validated.xlsx')
+    stats = _engine().run_validation_all(args.input, output, **kwargs)
+    print(f'{args.input}: {stats["rows"]} rows, {stats["errors"]} errors in {stats["seconds"]:.2f}s -> {output}')
+    if 'stages' in stats:
+        from pipeline import format_stages
+        timings = stats['stages']
+        for sheet, sheet_timings in (timings.items() if 'stages' not in timings else [(None, timings)]):
+            if sheet is not None:
+                print(f'{sheet}:')
+            for line in format_stages(sheet_timings):
+                print(f'  {line}')
+    return 0
+
+
+def cmd_report(args):
+    kwargs = _common_kwargs(args)
+    report = _engine().run_report(args.input, args.output, max_errors=args.max_errors,
+                                  include_updates=args.include_updates, **kwargs)
+    status = 'PASS' if report['passed'] else ('FAIL (stopped early)' if report['stopped_early'] else 'FAIL')
+    print(f'{args.input}: {status}, {report["rows"]} rows, {report["errors"]} errors in {report["seconds"]:.2f}s')
+    return 0 if report['passed'] else 1
+
+
+def _expand_inputs(paths):
+    import glob
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.xlsx'))))
+        else:
+            files.extend(sorted(glob.glob(path)) or [path])
+    return [f for f in files if not os.path.basename(f).startswith(('~$', '.'))]
+
+
+def cmd_batch(args):
+    """Validate many files in one process so the import cost is paid once."""
+    engine = _engine()
+    kwargs = _common_kwargs(args)
+    files = _expand_inputs(args.inputs)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    failed = 0
+    started = time.perf_counter()
+    for path in files:
+        out_dir = args.output_dir or os.path.dirname(path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            if args.report:
+                report = engine.run_report(path, os.path.join(out_dir, f'{name}_report.json'),
+                                           max_errors=args.max_errors, **kwargs)
+                failed += not report['passed']
+                print(f'{path}: {"PASS" if report["passed"] else "FAIL"}, {report["errors"]} errors')
+            else:
+                stats = engine.run_validation_all(path, os.path.join(out_dir, f'{name}_validated.xlsx'), **kwargs)
+                print(f'{path}: {stats["rows"]} rows, {stats["errors"]} errors in {stats["seconds"]:.2f}s')
+        except Exception as e:
+            failed += 1
+            print(f'{path}: error: {e}', file=sys.stderr)
+    print(f'{len(files)} files in {time.perf_counter() - started:.2f}s, {failed} failed')
+    return 1 if failed else 0
+
+
+def cmd_inspect(args):
+    """Sheet sizes, headers and green columns from the xlsx metadata, without loading cells."""
+    from workbook_info import inspect_workbook
+    kwargs = {'exact': args.exact}
+    if args.highlight_color:
+        from header_styles import DEFAULT_HIGHLIGHT_COLORS
+        kwargs['colors'] = DEFAULT_HIGHLIGHT_COLORS + tuple(args.highlight_color)
+    infos = [inspect_workbook(path, **kwargs) for path in _expand_inputs(args.inputs)]
+    if args.json:
+        import json
+        print(json.dumps(infos, indent=2, default=str))
+        return 0
+    for info in infos:
+        print(f'{info["file"]} ({info["bytes"]} bytes, {info["seconds"] * 1000:.1f} ms)')
+        for sheet in info['sheets']:
+            size = f'{sheet["data_rows"]} rows x {sheet["columns"]} columns'
+            print(f'  {sheet["name"]}: {size}{"" if sheet["exact"] else " (stored dimension)"}')
+            if sheet['green']:
+                print(f'    green: {", ".join(str(h) for h in sheet["green"])}')
+    return 0
+
+
+def _subprocess_ms(cmd, repeat):
+    import subprocess
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def cmd_bench(args):
+    """Cold-start timings (fresh interpreters) and optional warm per-file timings."""
+    here = os.path.abspath(__file__)
+    cli_ms = _subprocess_ms([sys.executable, here, '--version'], args.repeat)
+    engine_ms = _subprocess_ms([sys.executable, '-c', 'import engine'], args.repeat)
+    python_ms = _subprocess_ms([sys.executable, '-c', 'pass'], args.repeat)
+    print(f'interpreter:       {python_ms:8.1f} ms')
+    print(f'cli startup:       {cli_ms:8.1f} ms (budget {args.budget:.0f} ms)')
+    print(f'engine import:     {engine_ms - python_ms:8.1f} ms (loaded only by commands that validate)')
+    if args.input:
+        engine = _engine()
+        kwargs = _common_kwargs(args)
+        for path in _expand_inputs([args.input]):
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                engine.run_report(path, None, **kwargs)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f'{path}: best {min(timings):.1f} ms, mean {sum(timings) / len(timings):.1f} ms (report, warm)')
+    return 0 if cli_ms <= args.budget else 1
+
+
+def build_parser():
+    import argparse
+    parser = argparse.ArgumentParser(prog='excel-validate', description='Validate Excel Data sheets against Sheet1.')
+    parser.add_argument('--version', action='store_true', help='print the startup time and exit')
+    parser.add_argument('--timing', action='store_true', help='print startup and total time to stderr')
+    sub = parser.add_subparsers(dest='command')
+
+    def add_common(p):
+        p.add_argument('--rules', help='JSON/YAML rule file')
+        p.add_argument('--data-sheet', default='Data')
+        p.add_argument('--reference-sheet', default='Sheet1')
+        p.add_argument('--reference-store', help='master workbook directory or SQLite reference file')
+        p.add_argument('--highlight-color', action='append', help='extra header fill RGB, e.g. 92D050')
+        p.add_argument('--cache', action='store_true', help='read Data from the columnar cache')
+
+    p = sub.add_parser('validate', help='write a validated copy of one workbook')
+    p.add_argument('input')
+    p.add_argument('-o', '--output')
+    p.add_argument('--out-of-core', action='store_true')
+    p.add_argument('--sample', type=int, help='validate a random sample of N rows and estimate rates')
+    p.add_argument('--seed', type=int)
+    p.add_argument('--workers', type=int)
+    p.add_argument('--pipeline', action='store_true',
+                   help='overlap reading, validating and writing; prints per-stage utilization')
+    p.add_argument('--data-sheets', metavar='PATTERN',
+                   help=r'validate every sheet matching PATTERN in parallel, e.g. "Data(_\d+)?"')
+    add_common(p)
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser('report', help='dry run: issue list and summary only (exit 1 on errors)')
+    p.add_argument('input')
+    p.add_argument('-o', '--output', help='report path (.json or .csv)')
+    p.add_argument('--max-errors', type=int, help='stop once more errors than this are found')
+    p.add_argument('--include-updates', action='store_true')
+    add_common(p)
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser('batch', help='validate many workbooks in one process')
+    p.add_argument('inputs', nargs='+', help='files, globs or directories')
+    p.add_argument('--output-dir')
+    p.add_argument('--report', action='store_true', help='write JSON reports instead of workbooks')
+    p.add_argument('--max-errors', type=int)
+    add_common(p)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser('inspect', help='sheet names, sizes and green headers without loading the data')
+    p.add_argument('inputs', nargs='+', help='files, globs or directories')
+    p.add_argument('--exact', action='store_true', help='scan the sheets for the used range instead of '
+                                                       'trusting the stored dimension')
+    p.add_argument('--highlight-color', action='append', help='extra header fill RGB, e.g. 92D050')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_inspect)
+
+    p = sub.add_parser('bench', help='measure cold-start and per-file time')
+    p.add_argument('input', nargs='?')
+    p.add_argument('--repeat', type=int, default=BENCH_REPEAT)
+    p.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS, help='cold-start budget in ms')
+    add_common(p)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    startup_ms = (time.perf_counter() - _START) * 1000
+    if args.version:
+        print(f'excel-validate (startup {startup_ms:.1f} ms)')
+        return 0
+    if args.command is None:
+        build_parser().print_help()
+        return 2
+    code = args.func(args)
+    if args.timing:
+        total_ms = (time.perf_counter() - _START) * 1000
+        print(f'startup {startup_ms:.1f} ms, total {total_ms:.1f} ms', file=sys.stderr)
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
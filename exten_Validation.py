@@ -1,6 +1,9 @@
 import openpyxl
 import re
-from collections import defaultdict
+from patterns import learn_signatures, matches_signatures
+from summary import new_summary, record_row, write_summary_sheet
+from prices import parse_price, price_range
+from header_styles import find_highlighted_columns, DEFAULT_HIGHLIGHT_COLORS
 
 def rgb_to_hex(rgb):
     return ''.join(f'{v:02X}' for v in rgb)
@@ -11,43 +14,6 @@ def get_fill_color(cell):
         return fill.start_color.rgb[-6:]  # Take last 6 chars as RGB hex without alpha
     return None
 
-def infer_pattern(values):
-    """Infer pattern type from a list of non-null string values."""
-    numeric = True
-    number_with_unit = True
-    alphabetic = True
-    multi_value = False
-
-    for v in values:
-        if not isinstance(v, str):
-            v = str(v)
-        v_strip = v.strip()
-        # Numeric check
-        if numeric:
-            if not re.fullmatch(r'\d+(\.\d+)?', v_strip):
-                numeric = False
-        # Number with unit check (e.g. "5 hp")
-        if number_with_unit:
-            if not re.fullmatch(r'\d+(\.\d+)?\s*\w+', v_strip):
-                number_with_unit = False
-        # Alphabetic check (letters, spaces)
-        if alphabetic:
-            if not re.fullmatch(r'[A-Za-z\s]+', v_strip):
-                alphabetic = False
-        # Multi-value check (comma separated)
-        if ',' in v_strip:
-            multi_value = True
-
-    if multi_value:
-        return 'multi_value_text'
-    if numeric:
-        return 'numeric'
-    if number_with_unit:
-        return 'number_with_unit'
-    if alphabetic:
-        return 'text'
-    return 'mixed'
-
 def fix_quotes(val):
     if not isinstance(val, str):
         return val
@@ -87,54 +53,11 @@ def standardize_case(val, allowed_values):
     # else return first matched (case-insensitive)
     return matches[0]
 
-def cell_value_matches_pattern(val, pattern):
-    if val is None:
-        return True
-    if pattern == 'numeric':
-        # Accept integer or float string
-        if isinstance(val, (int, float)):
-            return True
-        if isinstance(val, str) and re.fullmatch(r'\d+(\.\d+)?', val.strip()):
-            return True
-        return False
-    if pattern == 'number_with_unit':
-        if isinstance(val, str) and re.fullmatch(r'\d+(\.\d+)?\s*\w+', val.strip()):
-            return True
-        return False
-    if pattern == 'text':
-        if isinstance(val, str) and re.fullmatch(r'[A-Za-z\s]+', val.strip()):
-            return True
-        return False
-    if pattern == 'multi_value_text':
-        # Check all sub-values satisfy text pattern
-        if not isinstance(val, str):
-            return False
-        parts = [p.strip() for p in val.split(',')]
-        for p in parts:
-            if not re.fullmatch(r'[A-Za-z\s]+', p):
-                return False
-        return True
-    # For mixed or unknown pattern, accept all
-    return True
-
 def extract_price_range(sheet1, price_col_idx):
-    # Scan Sheet1 for min and max price numeric values ignoring empty and non-numeric
-    prices = []
-    for row in sheet1.iter_rows(min_row=2, values_only=True):
-        val = row[price_col_idx]
-        if val is None:
-            continue
-        s = str(val).strip().replace('$','').replace(',','')
-        try:
-            f = float(s)
-            prices.append(f)
-        except:
-            pass
-    if not prices:
-        return None, None
-    return min(prices), max(prices)
+    # Parse the whole column in one pass (no exceptions for non-numeric cells)
+    return price_range(row[price_col_idx] for row in sheet1.iter_rows(min_row=2, values_only=True))
 
-def run_validation_all(file_path, output_path):
+def run_validation_all(file_path, output_path, highlight_colors=DEFAULT_HIGHLIGHT_COLORS):
     wb = openpyxl.load_workbook(file_path)
     sheet1 = wb['Sheet1']
     sheet2 = wb['Data']
@@ -142,24 +65,10 @@ def run_validation_all(file_path, output_path):
     headers_sheet1 = [cell.value for cell in sheet1[1]]
     headers_sheet2 = [cell.value for cell in sheet2[1]]
 
-    # Identify green color hex to filter columns in data sheet (header row only)
-    green_hex = '00B050'
-
-    # Find green highlighted columns in data sheet header
-    green_col_indices = []
-    for idx, cell in enumerate(sheet2[1], start=1):
-        fill_color = cell.fill.start_color
-        # Checking RGB against our green.
-        # Depending on Excel version, fill_color.rgb or fill_color.indexed may be set
-        if fill_color.type == 'rgb' and fill_color.rgb[-6:] == green_hex:
-            green_col_indices.append(idx)
-        elif fill_color.type == 'indexed':
-            # Fallback, approximate check for green (Excel indexed green is 10)
-            if fill_color.indexed == 10:
-                green_col_indices.append(idx)
-
-    # Map green column indices to their headers
-    green_headers = [sheet2.cell(row=1, column=i).value for i in green_col_indices]
+    # Find green highlighted columns in data sheet header (read from the styles table)
+    green_col_indices = find_highlighted_columns(file_path, 'Data', highlight_colors,
+                                                 max_col=len(headers_sheet2))
+    green_headers = [headers_sheet2[i - 1] for i in green_col_indices]
 
     # Intersection with Sheet1 columns
     common_columns = list(set(green_headers).intersection(headers_sheet1))
@@ -180,12 +89,11 @@ def run_validation_all(file_path, output_path):
                         vals.add(subval.strip())
         allowed_values[col] = vals
 
-    # Infer column patterns from Sheet1 values only for common columns
-    column_patterns = {}
+    # Learn the character-class signatures (e.g. "9.9 A") allowed per column from Sheet1
+    column_signatures = {}
     for col in common_columns:
         idx1 = headers_sheet1.index(col)
-        vals = [str(r[idx1]).strip() for r in sheet1.iter_rows(min_row=2, values_only=True) if r[idx1] is not None]
-        column_patterns[col] = infer_pattern(vals) if vals else 'unknown'
+        column_signatures[col] = learn_signatures(r[idx1] for r in sheet1.iter_rows(min_row=2, values_only=True))
 
     # Find price column index and range if present
     price_col_idx_sheet1 = None
@@ -194,7 +102,7 @@ def run_validation_all(file_path, output_path):
     for col in common_columns:
         if col.lower() == 'price':
             price_col_idx_sheet1 = headers_sheet1.index(col)
-            price_col_idx_data = sheet2[1].index(col)+1
+            price_col_idx_data = headers_sheet2.index(col) + 1
             min_price, max_price = extract_price_range(sheet1, price_col_idx_sheet1)
             break
 
@@ -205,12 +113,12 @@ def run_validation_all(file_path, output_path):
     else:
         comments_col_idx = headers_sheet2.index('Comments') + 1
 
-    error_counters = defaultdict(int)
-    total_cells_checked = 0
+    summary = new_summary(common_columns)
 
     # For each row and valid column do validation
     for row_num, row in enumerate(sheet2.iter_rows(min_row=2), 2):
         row_errors = []
+        row_issues = []
         for col in common_columns:
             col_idx_data = headers_sheet2.index(col)
             cell = row[col_idx_data]
@@ -228,8 +136,6 @@ def run_validation_all(file_path, output_path):
                 if val != old_val:
                     cell.value = val
 
-            total_cells_checked += 1
-
             # Case correction: map to allowed value with case preference like uppercase if both
             if isinstance(val, str) and col in allowed_values:
                 mapped_val = standardize_case(val, allowed_values[col])
@@ -238,17 +144,17 @@ def run_validation_all(file_path, output_path):
                     val = mapped_val
                     row_errors.append(f'{col}: Case corrected')
 
-            # Check pattern match
-            if not cell_value_matches_pattern(val, column_patterns[col]):
+            # Check pattern match (signature-set lookup per value)
+            if not matches_signatures(val, column_signatures[col]):
                 row_errors.append(f'{col}: Pattern mismatch')
-                error_counters['pattern_mismatch'] +=1
+                row_issues.append((col, 'pattern_mismatch', val))
 
             # Check duplicates in multi-value cells
             if isinstance(val, str) and ',' in val:
                 parts = [p.strip() for p in val.split(',') if p.strip()]
                 if len(parts) != len(set(parts)):
                     row_errors.append(f'{col}: Duplicates values in cell')
-                    error_counters['duplicates'] += 1
+                    row_issues.append((col, 'duplicates', val))
 
             # Check allowed values
             if isinstance(val, str) and col in allowed_values:
@@ -256,36 +162,36 @@ def run_validation_all(file_path, output_path):
                 for p in parts:
                     if p not in allowed_values[col]:
                         row_errors.append(f'{col}: Value "{p}" not allowed')
-                        error_counters['invalid_value'] += 1
+                        row_issues.append((col, 'invalid_value', p))
             elif val is not None and col in allowed_values and val not in allowed_values[col]:
                 row_errors.append(f'{col}: Value "{val}" not allowed')
-                error_counters['invalid_value'] += 1
+                row_issues.append((col, 'invalid_value', val))
 
             # Numeric range check on price column
             if price_col_idx_data and col == 'Price':
                 # convert val to float if possible
-                try:
-                    num_val = float(str(val).replace('$','').replace(',','').strip())
+                num_val = parse_price(val)
+                if num_val is None:
+                    row_errors.append(f'{col}: Price not a number')
+                    row_issues.append((col, 'price_range', val))
+                else:
                     if min_price is not None and num_val < min_price:
                         row_errors.append(f'{col}: Below min price {min_price}')
-                        error_counters['price_range'] += 1
+                        row_issues.append((col, 'price_range', val))
                     if max_price is not None and num_val > max_price:
                         row_errors.append(f'{col}: Above max price {max_price}')
-                        error_counters['price_range'] += 1
-                except:
-                    row_errors.append(f'{col}: Price not a number')
-                    error_counters['price_range'] += 1
+                        row_issues.append((col, 'price_range', val))
 
             # Numeric text validations - no trailing .0, max two decimals
             if isinstance(val, str) and re.fullmatch(r'\d+(\.\d+)?', val):
                 if val.endswith('.0'):
                     row_errors.append(f'{col}: Numeric value ends with .0')
-                    error_counters['numeric_format'] += 1
+                    row_issues.append((col, 'numeric_format', val))
                 if '.' in val:
                     dec = val.split('.')[1]
                     if len(dec) > 2:
                         row_errors.append(f'{col}: Numeric value has more than two decimals')
-                        error_counters['numeric_format'] += 1
+                        row_issues.append((col, 'numeric_format', val))
 
             # Remove special chars at start/end - apply again if needed
             if isinstance(val, str):
@@ -299,21 +205,15 @@ def run_validation_all(file_path, output_path):
             # Detect Excel formulas
             if isinstance(val, str) and val.startswith('='):
                 row_errors.append(f'{col}: Contains formula')
-                error_counters['formula'] += 1
+                row_issues.append((col, 'formula', val))
 
         # Compile message in comments
         if row_errors:
             sheet2.cell(row=row_num, column=comments_col_idx).value = ', '.join(row_errors)
-            for err in set(row_errors):
-                error_counters[err.split(':')[0].lower()] += 1
+        record_row(summary, row_issues)
 
     # Report error percentages on summary sheet
-    summary_sheet = wb.create_sheet('Validation_Summary')
-    summary_sheet.append(['Error Type', 'Count', 'Percentage'])
-    total = total_cells_checked if total_cells_checked > 0 else 1
-    for error, count in error_counters.items():
-        pct = round((count / total) * 100, 2)
-        summary_sheet.append([error, count, pct])
+    write_summary_sheet(wb.create_sheet('Validation_Summary'), summary)
 
     wb.save(output_path)
 
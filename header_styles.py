@@ -0,0 +1,262 @@
+import os
+import re
+import colorsys
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+# Reads the header row fills straight from the xlsx package (styles table +
+# first <row> of the sheet xml) so green-column detection never materializes
+# openpyxl cell styles and works next to read_only / streaming workbooks.
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+DRAWING_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+
+DEFAULT_HIGHLIGHT_COLORS = ('00B050',)
+DEFAULT_HIGHLIGHT_INDEXED = (10,)
+
+# Excel stores theme colors as dk1, lt1, dk2, lt2, accent1-6, hlink, folHlink
+# but cell colors index them with the light/dark pairs swapped.
+THEME_ORDER = ('lt1', 'dk1', 'lt2', 'dk2', 'accent1', 'accent2', 'accent3',
+               'accent4', 'accent5', 'accent6', 'hlink', 'folHlink')
+
+DEFAULT_INDEXED_PALETTE = (
+    '000000', 'FFFFFF', 'FF0000', '00FF00', '0000FF', 'FFFF00', 'FF00FF', '00FFFF',
+    '000000', 'FFFFFF', 'FF0000', '00FF00', '0000FF', 'FFFF00', 'FF00FF', '00FFFF',
+    '800000', '008000', '000080', '808000', '800080', '008080', 'C0C0C0', '808080',
+    '9999FF', '993366', 'FFFFCC', 'CCFFFF', '660066', 'FF8080', '0066CC', 'CCCCFF',
+    '000080', 'FF00FF', 'FFFF00', '00FFFF', '800080', '800000', '008080', '0000FF',
+    '00CCFF', 'CCFFFF', 'CCFFCC', 'FFFF99', '99CCFF', 'FF99CC', 'CC99FF', 'FFCC99',
+    '3366FF', '33CCCC', '99CC00', 'FFCC00', 'FF9900', 'FF6600', '666699', '969696',
+    '003366', '339966', '003300', '333300', '993300', '993366', '333399', '333333',
+)
+
+_probe_cache = {}
+
+
+def col_letter_to_index(ref):
+    idx = 0
+    for ch in ref:
+        if 'A' <= ch <= 'Z':
+            idx = idx * 26 + ord(ch) - 64
+        else:
+            break
+    return idx
+
+
+def sheet_xml_paths(zf):
+    """Map sheet name -> xml part path inside the package, in workbook order."""
+    rels = {}
+    with zf.open('xl/_rels/workbook.xml.rels') as fh:
+        for rel in ET.parse(fh).getroot().iter(PKG_REL_NS + 'Relationship'):
+            target = rel.get('Target')
+            if target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join('xl', target))
+            rels[rel.get('Id')] = target
+    paths = {}
+    with zf.open('xl/workbook.xml') as fh:
+        for sheet in ET.parse(fh).getroot().iter(MAIN_NS + 'sheet'):
+            paths[sheet.get('name')] = rels.get(sheet.get(REL_NS + 'id'))
+    return paths
+
+
+def read_first_row(zf, sheet_path):
+    """Return [(col_idx, style_idx, cell_type, raw_value)] for row 1 only."""
+    cells = []
+    with zf.open(sheet_path) as fh:
+        for event, elem in ET.iterparse(fh, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == MAIN_NS + 'sheetData':
+                    continue
+                if elem.tag == MAIN_NS + 'row' and elem.get('r') not in (None, '1'):
+                    break
+                continue
+            if elem.tag == MAIN_NS + 'c':
+                ref = elem.get('r')
+                col_idx = col_letter_to_index(ref) if ref else len(cells) + 1
+                v = elem.find(MAIN_NS + 'v')
+                raw = v.text if v is not None else None
+                if elem.get('t') == 'inlineStr':
+                    raw = ''.join(t.text or '' for t in elem.iter(MAIN_NS + 't'))
+                cells.append((col_idx, int(elem.get('s', 0)), elem.get('t'), raw))
+            elif elem.tag == MAIN_NS + 'row':
+                break
+    return cells
+
+
+def read_shared_strings(zf, wanted):
+    """Resolve only the shared string indices in `wanted`, stopping early."""
+    found = {}
+    if not wanted or 'xl/sharedStrings.xml' not in zf.namelist():
+        return found
+    last = max(wanted)
+    idx = 0
+    with zf.open('xl/sharedStrings.xml') as fh:
+        for event, elem in ET.iterparse(fh):
+            if elem.tag != MAIN_NS + 'si':
+                continue
+            if idx in wanted:
+                found[idx] = ''.join(t.text or '' for t in elem.iter(MAIN_NS + 't'))
+            elem.clear()
+            if idx >= last:
+                break
+            idx += 1
+    return found
+
+
+def load_styles(zf):
+    """Return (xf_fill_ids, fills, indexed_palette) from xl/styles.xml."""
+    fills = []
+    xf_fill_ids = []
+    palette = list(DEFAULT_INDEXED_PALETTE)
+    if 'xl/styles.xml' not in zf.namelist():
+        return xf_fill_ids, fills, palette
+    with zf.open('xl/styles.xml') as fh:
+        root = ET.parse(fh).getroot()
+    fills_el = root.find(MAIN_NS + 'fills')
+    if fills_el is not None:
+        for fill in fills_el.findall(MAIN_NS + 'fill'):
+            pattern = fill.find(MAIN_NS + 'patternFill')
+            fg = pattern.find(MAIN_NS + 'fgColor') if pattern is not None else None
+            fills.append(dict(fg.attrib) if fg is not None else None)
+    xfs_el = root.find(MAIN_NS + 'cellXfs')
+    if xfs_el is not None:
+        xf_fill_ids = [int(xf.get('fillId', 0)) for xf in xfs_el.findall(MAIN_NS + 'xf')]
+    custom = root.find(MAIN_NS + 'colors/' + MAIN_NS + 'indexedColors')
+    if custom is not None:
+        for i, rgb in enumerate(custom.findall(MAIN_NS + 'rgbColor')):
+            if i < len(palette) and rgb.get('rgb'):
+                palette[i] = rgb.get('rgb')[-6:].upper()
+    return xf_fill_ids, fills, palette
+
+
+def load_theme_colors(zf):
+    names = [n for n in zf.namelist() if re.fullmatch(r'xl/theme/theme\d*\.xml', n)]
+    if not names:
+        return []
+    with zf.open(sorted(names)[0]) as fh:
+        root = ET.parse(fh).getroot()
+    scheme = root.find('.//' + DRAWING_NS + 'clrScheme')
+    if scheme is None:
+        return []
+    by_name = {}
+    for entry in scheme:
+        name = entry.tag.replace(DRAWING_NS, '')
+        for color in entry:
+            by_name[name] = (color.get('lastClr') or color.get('val') or '').upper()
+    return [by_name.get(name) for name in THEME_ORDER]
+
+
+def apply_tint(hex_color, tint):
+    if not tint:
+        return hex_color
+    r, g, b = (int(hex_color[i:i + 2], 16) / 255.0 for i in (0, 2, 4))
+    h, l, s = colorsys.rgb_to_hls(r, g, b)
+    if tint < 0:
+        l = l * (1 + tint)
+    else:
+        l = l * (1 - tint) + tint
+    r, g, b = colorsys.hls_to_rgb(h, l, s)
+    return ''.join(f'{round(v * 255):02X}' for v in (r, g, b))
+
+
+def resolve_color(attrs, theme_colors, palette):
+    """Turn an fgColor attribute dict into a 6-digit RGB hex (or None)."""
+    if not attrs:
+        return None
+    if attrs.get('rgb'):
+        hex_color = attrs['rgb'][-6:].upper()
+    elif attrs.get('theme') is not None:
+        idx = int(attrs['theme'])
+        if idx >= len(theme_colors) or not theme_colors[idx]:
+            return None
+        hex_color = theme_colors[idx]
+    elif attrs.get('indexed') is not None:
+        idx = int(attrs['indexed'])
+        if idx >= len(palette):
+            return None
+        hex_color = palette[idx]
+    else:
+        return None
+    return apply_tint(hex_color, float(attrs.get('tint', 0) or 0))
+
+
+def _normalize_colors(colors):
+    return frozenset(c[-6:].upper() for c in colors)
+
+
+def probe_headers(file_path, sheet_names=None, colors=DEFAULT_HIGHLIGHT_COLORS,
+                  indexed=DEFAULT_HIGHLIGHT_INDEXED):
+    """{sheet: [(col_idx, header, is_highlighted)]} for the header rows of several sheets.
+
+    The package is opened once; only workbook.xml, styles.xml, the theme, the first
+    row of each sheet and the shared strings they reference are read. `sheet_names`
+    defaults to every sheet, in workbook order.
+    """
+    colors = _normalize_colors(colors)
+    indexed = frozenset(indexed)
+    with zipfile.ZipFile(file_path) as zf:
+        paths = sheet_xml_paths(zf)
+        if sheet_names is None:
+            sheet_names = list(paths)
+        for sheet_name in sheet_names:
+            if sheet_name not in paths:
+                raise KeyError(f'Worksheet {sheet_name} does not exist.')
+        first_rows = {sheet_name: read_first_row(zf, paths[sheet_name]) for sheet_name in sheet_names}
+        xf_fill_ids, fills, palette = load_styles(zf)
+        theme_colors = None
+        shared = read_shared_strings(zf, {int(raw) for cells in first_rows.values()
+                                          for _, _, t, raw in cells if t == 's' and raw is not None})
+
+        fill_is_green = {}
+        results = {}
+        for sheet_name, cells in first_rows.items():
+            result = results[sheet_name] = []
+            for col_idx, style_idx, cell_type, raw in cells:
+                fill_id = xf_fill_ids[style_idx] if style_idx < len(xf_fill_ids) else 0
+                if fill_id not in fill_is_green:
+                    attrs = fills[fill_id] if fill_id < len(fills) else None
+                    green = False
+                    if attrs:
+                        if attrs.get('indexed') is not None and int(attrs['indexed']) in indexed:
+                            green = True
+                        else:
+                            if attrs.get('theme') is not None and theme_colors is None:
+                                theme_colors = load_theme_colors(zf)
+                            green = resolve_color(attrs, theme_colors or [], palette) in colors
+                    fill_is_green[fill_id] = green
+                if cell_type == 's':
+                    header = shared.get(int(raw)) if raw is not None else None
+                elif cell_type in (None, 'n') and raw is not None:
+                    header = float(raw) if '.' in raw or 'E' in raw else int(raw)
+                else:
+                    header = raw
+                result.append((col_idx, header, fill_is_green[fill_id]))
+    return results
+
+
+def probe_header(file_path, sheet_name='Data', colors=DEFAULT_HIGHLIGHT_COLORS,
+                 indexed=DEFAULT_HIGHLIGHT_INDEXED):
+    """Return [(col_idx, header, is_highlighted)] for the header row of a sheet (see probe_headers)."""
+    key = None
+    if isinstance(file_path, (str, os.PathLike)):
+        st = os.stat(file_path)
+        key = (os.fspath(file_path), st.st_mtime_ns, st.st_size, sheet_name, _normalize_colors(colors),
+               frozenset(indexed))
+        if key in _probe_cache:
+            return _probe_cache[key]
+    result = probe_headers(file_path, [sheet_name], colors, indexed)[sheet_name]
+    if key is not None:
+        _probe_cache[key] = result
+    return result
+
+
+def find_highlighted_columns(file_path, sheet_name='Data', colors=DEFAULT_HIGHLIGHT_COLORS,
+                             indexed=DEFAULT_HIGHLIGHT_INDEXED, max_col=None):
+    """Return the 1-based column indices whose header cell carries a highlight fill."""
+    return [col_idx for col_idx, _, green in probe_header(file_path, sheet_name, colors, indexed)
+            if green and (max_col is None or col_idx <= max_col)]
@@ -0,0 +1,60 @@
+from openpyxl.formatting.formatting import ConditionalFormatting
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import MultiCellRange
+
+# Bad cells are highlighted with conditional formatting instead of a fill per cell:
+# the flagged rows of every column are kept as runs of consecutive rows while the
+# sheet streams out, and written at the end as one always-true rule per column over
+# those runs. All rules carry the same differential style, which the workbook stores
+# once, so highlighting 100k cells adds a few range lists and no cell styles.
+
+ERROR_FILL = PatternFill(bgColor='FFFFC7CE')
+
+
+class RangeList(MultiCellRange):
+    """A sqref kept as its rendered text; openpyxl would parse, sort and re-render
+    one CellRange per run, which costs more than the whole highlight pass."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    __hash__ = MultiCellRange.__hash__
+
+
+def new_highlights():
+    """{0-based column: [[first_row, last_row], ...]} in ascending row order."""
+    return {}
+
+
+def highlight_row(highlights, row_num, col_idxs):
+    for col in col_idxs:
+        runs = highlights.setdefault(col, [])
+        if runs and runs[-1][1] >= row_num - 1:
+            runs[-1][1] = row_num
+        else:
+            runs.append([row_num, row_num])
+
+
+def highlight_ranges(highlights):
+    """[(column letter, 'B2:B5 B9 ...'), ...] for the highlighted cells."""
+    ranges = []
+    for col in sorted(highlights):
+        letter = get_column_letter(col + 1)
+        ranges.append((letter, ' '.join(f'{letter}{first}' if first == last else f'{letter}{first}:{letter}{last}'
+                                        for first, last in highlights[col])))
+    return ranges
+
+
+def write_highlights(ws_out, highlights, fill=ERROR_FILL):
+    """Add the conditional-formatting rules; works on write_only sheets until they are saved."""
+    for _, sqref in highlight_ranges(highlights):
+        ws_out.conditional_formatting.add(ConditionalFormatting(RangeList(sqref)),
+                                          FormulaRule(formula=['TRUE'], fill=fill))
@@ -0,0 +1,84 @@
+import os
+import pickle
+import tempfile
+from multiprocessing import Pool
+
+import openpyxl
+
+from engine import (prepare_validation, iter_row_results, output_columns, render_rows, new_row_cache, data_rows,
+                    iter_batches, BATCH_ROWS)
+from summary import new_summary, plain_summary
+from highlights import new_highlights
+
+# Several Data sheets validated at once: the parent builds the reference from one
+# pass over Sheet1 and ships it to every worker, each worker validates whole sheets
+# (openpyxl parsing is CPU bound, so processes rather than threads) and spools the
+# finished output rows to a temporary pickle file. The parent copies the spools into
+# the write_only output in workbook order while the other sheets are still running.
+# With a columnar cache each worker reads its sheet from that sheet's own cache file.
+
+_worker = {}
+
+
+def _worker_init(file_path, rules, highlight_colors, reference_sheet, reference, spool_dir, dedup, cache):
+    _worker.update(file_path=file_path, rules=rules, highlight_colors=highlight_colors,
+                   reference_sheet=reference_sheet, reference=reference, spool_dir=spool_dir, dedup=dedup,
+                   cache=cache)
+
+
+def _validate_sheet(sheet):
+    """Worker: validate one Data sheet; returns (sheet, spool path, summary counters, highlights,
+    row cache counters or None)."""
+    file_path = _worker['file_path']
+    wb = openpyxl.load_workbook(file_path, read_only=True)
+    fd, spool_path = tempfile.mkstemp(prefix='sheet_', suffix='.pickle', dir=_worker['spool_dir'])
+    try:
+        prepared = prepare_validation(wb, file_path, _worker['rules'], _worker['highlight_colors'], sheet,
+                                      _worker['reference_sheet'], reference=_worker['reference'])
+        headers = prepared['headers']
+        comments_idx, updates_idx, _ = output_columns(headers)
+        col_index = {h: i for i, h in enumerate(headers) if h is not None}
+        summary = new_summary([col for col, _, _ in prepared['plan']])
+        rows = data_rows(wb, file_path, sheet, _worker['cache'])
+        next(rows, None)
+        highlights = new_highlights()
+        row_cache = new_row_cache() if _worker['dedup'] else None
+        output = render_rows(iter_row_results(rows, prepared, row_cache=row_cache), summary, col_index, comments_idx, updates_idx,
+                             highlights)
+        with os.fdopen(fd, 'wb') as spool:
+            for batch in iter_batches(output, BATCH_ROWS):
+                pickle.dump(batch, spool, pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        os.remove(spool_path)
+        raise
+    finally:
+        wb.close()
+    if row_cache is not None:
+        # Only the counters go back to the parent
+        row_cache = dict(row_cache, results={})
+    return sheet, spool_path, plain_summary(summary), highlights, row_cache
+
+
+def iter_spooled(spool_path):
+    """Rows written by a worker, removing the spool file once read."""
+    try:
+        with open(spool_path, 'rb') as spool:
+            while True:
+                try:
+                    batch = pickle.load(spool)
+                except EOFError:
+                    return
+                yield from batch
+    finally:
+        os.remove(spool_path)
+
+
+def open_sheet_pool(workers, file_path, rules, highlight_colors, reference_sheet, reference, spool_dir=None,
+                    dedup=True, cache=None):
+    return Pool(workers, _worker_init, (file_path, rules, highlight_colors, reference_sheet, reference, spool_dir,
+                                        dedup, cache))
+
+
+def iter_sheet_results(pool, sheets):
+    """(sheet, spool path, summary, highlights, row cache) per sheet, in the order of `sheets`, as workers finish them."""
+    return pool.imap(_validate_sheet, sheets)
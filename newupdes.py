@@ -1,7 +1,11 @@
 import openpyxl
 import re
 import time
-from collections import defaultdict
+from unit_index import (build_unit_index, parse_quantity, unit_dimension, range_in_unit, quantity_in_range,
+                        nearest_size, format_magnitude)
+from tokenizer import build_case_map, check_tokens
+from summary import new_summary, record_row, write_summary_sheet
+from header_styles import find_highlighted_columns, DEFAULT_HIGHLIGHT_COLORS
 
 def get_actual_data_limits(ws):
     max_row = ws.max_row
@@ -35,44 +39,7 @@ def clean_commas_and_empty(val):
     changed = val_cleaned != val_orig
     return val_cleaned, changed
 
-def standardize_case(val, allowed_values):
-    if not isinstance(val, str):
-        return val, False
-    clean_val = val.strip()
-    if clean_val in allowed_values:
-        return clean_val, clean_val != val
-    matches = [v for v in allowed_values if v.lower() == clean_val.lower()]
-    if not matches:
-        return val, False
-    for m in matches:
-        if m.isupper():
-            return m, m != val
-    return matches[0], matches[0] != val
-
-def extract_extensions(values):
-    exts = {}
-    pattern = re.compile(r'(\d+(?:\.\d+)?)\s*(\w+)', re.I)
-    nums_per_ext = defaultdict(list)
-    for v in values:
-        m = pattern.fullmatch(v)
-        if m:
-            num = float(m.group(1))
-            ext = m.group(2).lower()
-            nums_per_ext[ext].append(num)
-    for ext, nums in nums_per_ext.items():
-        exts[ext] = (min(nums), max(nums))
-    return exts
-
-def parse_number_and_extension(val):
-    pattern = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(\w*)\s*$', re.I)
-    m = pattern.match(val)
-    if m:
-        number = m.group(1)
-        extension = m.group(2)
-        return float(number), extension.lower()
-    return None, None
-
-def run_validation_all(file_path, output_path):
+def run_validation_all(file_path, output_path, highlight_colors=DEFAULT_HIGHLIGHT_COLORS):
     wb = openpyxl.load_workbook(file_path)
     sheet1 = wb['Sheet1']
     sheet2 = wb['Data']
@@ -83,20 +50,14 @@ def run_validation_all(file_path, output_path):
     headers_sheet1 = [cell.value for cell in sheet1[1][:max_col1]]
     headers_sheet2 = [cell.value for cell in sheet2[1][:max_col2]]
 
-    green_hex = '00B050'
-    green_col_indices = []
-    for idx, cell in enumerate(sheet2[1][:max_col2], start=1):
-        fill_color = cell.fill.start_color
-        if fill_color.type == 'rgb' and fill_color.rgb and fill_color.rgb[-6:].upper() == green_hex:
-            green_col_indices.append(idx)
-        elif fill_color.type == 'indexed':
-            if fill_color.indexed == 10:
-                green_col_indices.append(idx)
-    green_headers = [sheet2.cell(row=1, column=i).value for i in green_col_indices]
+    green_col_indices = find_highlighted_columns(file_path, 'Data', highlight_colors, max_col=max_col2)
+    green_headers = [headers_sheet2[i - 1] for i in green_col_indices]
 
     common_columns = list(set(green_headers).intersection(headers_sheet1))
 
     allowed_values = {}
+    case_maps = {}
+    token_caches = {}
     numeric_extension_info = {}
     idx_map_sheet1 = {}
     for col in common_columns:
@@ -113,10 +74,12 @@ def run_validation_all(file_path, output_path):
                 vals.add(str_val)
                 vals_for_ext.append(str_val)
         allowed_values[col] = vals
+        case_maps[col] = build_case_map(vals)
+        token_caches[col] = {}
 
-        exts = extract_extensions(vals_for_ext)
-        if exts:
-            numeric_extension_info[col] = exts
+        unit_idx = build_unit_index(vals_for_ext)
+        if unit_idx:
+            numeric_extension_info[col] = unit_idx
 
     # Add Comments and Updates columns if missing
     if 'Comments' not in headers_sheet2:
@@ -131,11 +94,11 @@ def run_validation_all(file_path, output_path):
     else:
         updates_col_idx = headers_sheet2.index('Updates Here') + 1
 
-    error_counters = defaultdict(int)
-    total_cells_checked = 0
+    summary = new_summary(common_columns)
 
     for row_num, row in enumerate(sheet2.iter_rows(min_row=2, max_row=max_row2, max_col=max_col2), start=2):
         row_errors = []
+        row_issues = []
         row_updates = []
         for col in common_columns:
             col_idx_data = headers_sheet2.index(col)
@@ -158,44 +121,47 @@ def run_validation_all(file_path, output_path):
                     val = val_new
                     cell.value = val
 
-            total_cells_checked += 1
-
-            # Case correction for individual items in multi-value cells
+            # Case correction for individual items in multi-value cells (one tokenizer pass, cached per column)
             if isinstance(val, str) and col in allowed_values:
-                parts = [p.strip() for p in val.split(',')]
-                corrected_parts = []
-                changed_case = False
-                for part in parts:
-                    corrected_part, changed = standardize_case(part, allowed_values[col])
-                    corrected_parts.append(corrected_part)
-                    if changed:
-                        changed_case = True
-                corrected_val = ','.join(corrected_parts)
-                if changed_case:
+                tokens, corrected, _, _ = check_tokens(val, allowed_values[col], case_maps[col], token_caches[col])
+                if corrected != tokens:
+                    corrected_val = ','.join(corrected)
                     cell.value = corrected_val
                     val = corrected_val
                     row_updates.append(f'{col}: Case corrected on values')
 
             # Numeric + extension special logic
             if col in numeric_extension_info:
-                num_val, ext_val = parse_number_and_extension(str(val) if val is not None else '')
-                exts_allowed = numeric_extension_info[col]
-                if num_val is not None:
-                    if ext_val == '' and len(exts_allowed) == 1:
-                        ext_val = next(iter(exts_allowed))
+                parsed = parse_quantity(str(val) if val is not None else '')
+                unit_idx = numeric_extension_info[col]
+                if parsed is not None:
+                    num_val, ext_val, dim, base_val = parsed
+                    if ext_val == '' and len(unit_idx['units']) == 1:
+                        ext_val = next(iter(unit_idx['units']))
                         val_new = f"{int(num_val) if num_val.is_integer() else num_val} {ext_val}"
                         cell.value = val_new
                         val = val_new
+                        dim, factor = unit_dimension(ext_val)
+                        base_val = num_val * factor
                         row_updates.append(f'{col}: Added missing extension "{ext_val}"')
-                    elif ext_val != '' and ext_val not in exts_allowed:
+                    elif ext_val != '' and dim not in unit_idx['ranges']:
                         row_errors.append(f'{col}: Extension "{ext_val}" not standard but accepted')
-                    if ext_val in exts_allowed:
-                        min_n, max_n = exts_allowed[ext_val]
-                        if num_val < min_n or num_val > max_n:
-                            row_errors.append(f'{col}: Numeric value {num_val} exceeds allowed range [{min_n}, {max_n}]')
+                        row_issues.append((col, 'unit_nonstandard', val))
+                    # Range is compared in base units so "10000 g" is checked against "10 kg" bounds
+                    if ext_val != '' and dim in unit_idx['ranges'] and not quantity_in_range(unit_idx, base_val, dim):
+                        min_n, max_n = range_in_unit(unit_idx, ext_val)
+                        row_errors.append(f'{col}: Numeric value {num_val} exceeds allowed range [{min_n}, {max_n}]')
+                        row_issues.append((col, 'unit_range', val))
+                    elif ext_val != '' and dim in unit_idx['sizes']:
+                        allowed_size, closest = nearest_size(unit_idx, dim, base_val)
+                        if not allowed_size:
+                            closest = format_magnitude(closest / unit_dimension(ext_val)[1])
+                            row_errors.append(f'{col}: Numeric value {num_val} not an allowed size, closest is {closest} {ext_val}')
+                            row_issues.append((col, 'unit_size', val))
                 else:
                     if val not in allowed_values[col]:
                         row_errors.append(f'{col}: Value "{val}" not allowed')
+                        row_issues.append((col, 'invalid_value', val))
             else:
                 # Numeric only values: check range and provide warning, but don't validate presence in sheet1
                 if val is not None:
@@ -205,34 +171,34 @@ def run_validation_all(file_path, output_path):
                             min_n, max_n = numeric_extension_info[col][""]
                             if num_val < min_n or num_val > max_n:
                                 row_errors.append(f'{col}: Numeric value {num_val} exceeds allowed range [{min_n}, {max_n}]')
+                                row_issues.append((col, 'unit_range', val))
                         else:
                             row_errors.append(f'{col}: Numeric value without extension found')
+                            row_issues.append((col, 'unit_extension', val))
                     except:
                         if isinstance(val, str):
-                            values = [v.strip() for v in val.split(',')]
-                            values = [v for v in values if v != '']
-                            if len(values) != len(set(values)):
+                            _, _, has_dups, invalid = check_tokens(val, allowed_values[col], case_maps[col], token_caches[col])
+                            if has_dups:
                                 row_errors.append(f'{col}: Duplicated values in cell')
-                                error_counters['duplicates'] += 1
-                            for v in values:
-                                if v not in allowed_values[col]:
-                                    row_errors.append(f'{col}: Value "{v}" not allowed')
-                                    error_counters['invalid_value'] += 1
+                                row_issues.append((col, 'duplicates', val))
+                            for v in invalid:
+                                row_errors.append(f'{col}: Value "{v}" not allowed')
+                                row_issues.append((col, 'invalid_value', v))
                         else:
                             if str(val) not in allowed_values[col]:
                                 row_errors.append(f'{col}: Value "{val}" not allowed')
-                                error_counters['invalid_value'] += 1
+                                row_issues.append((col, 'invalid_value', val))
 
             # Numeric .0 and decimal places check
             if isinstance(val, str) and re.fullmatch(r'\d+(\.\d+)?', val):
                 if val.endswith('.0'):
                     row_errors.append(f'{col}: Numeric value ends with .0')
-                    error_counters['numeric_format'] += 1
+                    row_issues.append((col, 'numeric_format', val))
                 if '.' in val:
                     dec = val.split('.')[1]
                     if len(dec) > 2:
                         row_errors.append(f'{col}: Numeric value has more than two decimals')
-                        error_counters['numeric_format'] += 1
+                        row_issues.append((col, 'numeric_format', val))
 
             # Trim special characters
             if isinstance(val, str):
@@ -246,7 +212,7 @@ def run_validation_all(file_path, output_path):
             # Detect formulas
             if isinstance(val, str) and val.startswith('='):
                 row_errors.append(f'{col}: Contains formula')
-                error_counters['formula'] += 1
+                row_issues.append((col, 'formula', val))
 
         # Write Updates and Comments columns
         if row_updates:
@@ -255,15 +221,9 @@ def run_validation_all(file_path, output_path):
         if row_errors:
             prev_comments = sheet2.cell(row=row_num, column=comments_col_idx).value or ""
             sheet2.cell(row=row_num, column=comments_col_idx).value = (prev_comments + ', ' if prev_comments else '') + ', '.join(row_errors)
-            for err in set(row_errors):
-                error_counters[err.split(':')[0].lower()] += 1
+        record_row(summary, row_issues)
 
-    summary_sheet = wb.create_sheet('Validation_Summary')
-    summary_sheet.append(['Error Type', 'Count', 'Percentage'])
-    total = total_cells_checked if total_cells_checked > 0 else 1
-    for error, count in error_counters.items():
-        pct = round((count / total) * 100, 2)
-        summary_sheet.append([error, count, pct])
+    write_summary_sheet(wb.create_sheet('Validation_Summary'), summary)
 
     wb.save(output_path)
 
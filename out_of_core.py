@@ -0,0 +1,437 @@
+import os
+import re
+import pickle
+import sqlite3
+import tempfile
+import time
+
+import openpyxl
+
+from engine import prepare_validation, output_columns, write_header, render_rows, iter_batches, BATCH_ROWS
+from header_styles import DEFAULT_HIGHLIGHT_COLORS
+from rules import (rules_for_column, price_limits, fix_quotes, clean_commas, NUMERIC_TEXT_RE,
+                   EDGE_SPECIAL_RE, SPECIAL_CHARS)
+from tokenizer import tokenize_cell
+from prices import parse_price
+from unit_index import parse_quantity, unit_dimension, format_magnitude
+from dependencies import build_dependencies, check_dependencies
+from uniqueness import digest, normalize_for_fingerprint
+from summary import new_summary, total_cells, total_errors, write_summary_sheet
+from highlights import new_highlights, write_highlights
+from shared_strings import share_columns, save_workbook
+from sheet_copy import copy_sheet
+
+# Out-of-core mode: Data rows are bulk-loaded into a temporary SQLite database
+# (cleaned values, one row per multi-value token, parsed quantities and prices),
+# the set-based rules run as SQL (allowed-value anti-joins, range checks, in-cell
+# and cross-row duplicate groupings), and the rows are streamed back out of SQLite
+# in row order together with their issues. Only the current batch is held in memory.
+
+SIZE_TOLERANCE = 1e-9
+
+SCHEMA = """
+CREATE TABLE tokens (rownum INTEGER, col INTEGER, pos INTEGER, token TEXT, token_lower TEXT);
+CREATE TABLE quantities (rownum INTEGER, col INTEGER, num REAL, ext TEXT, dim TEXT, base REAL, value);
+CREATE TABLE prices (rownum INTEGER, col INTEGER, num REAL, value);
+CREATE TABLE issues (rownum INTEGER, col INTEGER, kind TEXT, rule TEXT, message TEXT, value);
+CREATE TABLE fixes (rownum INTEGER, col INTEGER, value);
+CREATE TABLE fingerprints (rownum INTEGER PRIMARY KEY, fp BLOB);
+CREATE TABLE trimmed (rownum INTEGER, col INTEGER, PRIMARY KEY (rownum, col)) WITHOUT ROWID;
+CREATE TABLE allowed (col INTEGER, value TEXT, value_lower TEXT, PRIMARY KEY (col, value)) WITHOUT ROWID;
+CREATE TABLE unit_ranges (col INTEGER, dim TEXT, lo REAL, hi REAL, PRIMARY KEY (col, dim)) WITHOUT ROWID;
+CREATE TABLE sizes (col INTEGER, dim TEXT, base REAL);
+CREATE TABLE price_bounds (col INTEGER PRIMARY KEY, lo, hi);
+"""
+
+# Order issues the same way as the streaming pipeline does within a column
+RULE_ORDER = {'cleaned': 0, 'unit_extension': 1, 'unit_nonstandard': 2, 'unit_range': 3, 'unit_size': 4,
+              'case': 5, 'duplicates': 6, 'invalid_value': 7, 'price_range': 8, 'pattern': 9, 'numeric_format': 10,
+              'formula': 11, 'special_chars': 12}
+CROSS_ROW_RULES = ('duplicate_key', 'near_duplicate')
+
+
+def _encode(val):
+    # SQLite keeps str/int/float/None natively; anything else (dates, bools) is pickled losslessly
+    if val is None or type(val) in (str, int, float):
+        return val
+    return pickle.dumps(val)
+
+
+def _decode(val):
+    return pickle.loads(val) if isinstance(val, bytes) else val
+
+
+def _column_rules(prepared):
+    config = prepared['config']
+    reference = prepared['reference']
+    if reference.get('store_columns'):
+        raise ValueError('out_of_core mode validates against the local reference sheet only')
+    columns = []
+    for col, idx, _ in prepared['plan']:
+        columns.append((col, idx, rules_for_column(config, col, reference)))
+    return columns
+
+
+def _load_reference(db, prepared, columns):
+    reference = prepared['reference']
+    for col, idx, rules in columns:
+        if rules['allowed'] and col in reference['allowed']:
+            db.executemany('INSERT OR IGNORE INTO allowed VALUES (?, ?, ?)',
+                           ((idx, v, v.lower()) for v in reference['allowed'][col]))
+        unit_idx = reference['units'].get(col) if rules['unit_range'] else None
+        if unit_idx:
+            db.executemany('INSERT INTO unit_ranges VALUES (?, ?, ?, ?)',
+                           ((idx, dim, lo, hi) for dim, (lo, hi) in unit_idx['ranges'].items()))
+            db.executemany('INSERT INTO sizes VALUES (?, ?, ?)',
+                           ((idx, dim, float(b)) for dim, arr in unit_idx['sizes'].items() for b in arr))
+        if rules['price_range']:
+            lo, hi = price_limits(rules['price_range'], reference['values'].get(col),
+                                  reference.get('sketches', {}).get(col))
+            if lo is not None or hi is not None:
+                db.execute('INSERT INTO price_bounds VALUES (?, ?, ?)', (idx, lo, hi))
+    db.execute('CREATE INDEX sizes_idx ON sizes (col, dim, base)')
+
+
+def _load_cell(col_idx, rules, unit_idx, has_prices, val, rownum, out):
+    """Row-local work done while bulk loading: cleaning, parsing and per-cell format rules,
+    in the order compile_column runs them (the special-char trim comes last)."""
+    issues, fixes, tokens, quantities, prices, trimmed = out
+    original = val
+    if isinstance(val, str) and rules['clean']:
+        cleaned = clean_commas(fix_quotes(val))
+        if cleaned != val:
+            issues.append((rownum, col_idx, 'update', 'cleaned', 'Removed quotes and fixed delimiters', val))
+            val = cleaned
+    parsed = parse_quantity(str(val)) if unit_idx and val is not None else None
+    if parsed is not None:
+        checked = _encode(val)
+        num, ext, dim, base = parsed
+        if ext == '' and len(unit_idx['units']) == 1:
+            ext = next(iter(unit_idx['units']))
+            val = f'{format_magnitude(num)} {ext}'
+            dim, factor = unit_dimension(ext)
+            base = num * factor
+            issues.append((rownum, col_idx, 'update', 'unit_extension', f'Added missing extension "{ext}"', checked))
+        elif ext != '' and dim not in unit_idx['ranges']:
+            issues.append((rownum, col_idx, 'error', 'unit_nonstandard', f'Extension "{ext}" not standard but accepted',
+                           checked))
+        if ext != '':
+            quantities.append((rownum, col_idx, num, ext, dim, base, checked))
+    # As in _check_allowed only text that parses as a quantity skips the allowed values;
+    # a bare number cell (int 10 in a kg/g column) is still looked up
+    if rules['allowed'] and val is not None and (parsed is None or not isinstance(val, str)):
+        if isinstance(val, str):
+            for pos, token in enumerate(tokenize_cell(val)):
+                tokens.append((rownum, col_idx, pos, token, token.lower()))
+        else:
+            # Numbers and booleans are matched exactly; a NULL token_lower keeps them out of case correction
+            tokens.append((rownum, col_idx, 0, str(val), None))
+    if has_prices and val is not None:
+        prices.append((rownum, col_idx, parse_price(val), _encode(val)))
+    if rules['pattern'] and val is not None and not rules['_pattern'].fullmatch(str(val)):
+        issues.append((rownum, col_idx, 'error', 'pattern', 'Pattern mismatch', _encode(val)))
+    if rules['decimals'] is not None and isinstance(val, str) and NUMERIC_TEXT_RE.fullmatch(val):
+        if val.endswith('.0'):
+            issues.append((rownum, col_idx, 'error', 'numeric_format', 'Numeric value ends with .0', val))
+        if '.' in val and len(val.split('.')[1]) > rules['decimals']:
+            issues.append((rownum, col_idx, 'error', 'numeric_format',
+                           f'Numeric value has more than {rules["decimals"]} decimals', val))
+    if rules['no_formula'] and isinstance(val, str) and val.startswith('='):
+        issues.append((rownum, col_idx, 'error', 'formula', 'Contains formula', val))
+    if rules['clean'] and isinstance(val, str) and EDGE_SPECIAL_RE.search(val):
+        stripped = val.strip(SPECIAL_CHARS)
+        if stripped != val:
+            issues.append((rownum, col_idx, 'update', 'special_chars', 'Trimmed special chars', val))
+            # A case correction made later in SQL replaces this fix and is trimmed again there
+            trimmed.append((rownum, col_idx))
+            val = stripped
+    if val is not original:
+        fixes.append((rownum, col_idx, _encode(val)))
+
+
+def _bulk_load(db, rows, width, columns, prepared, fingerprint_positions=None):
+    reference = prepared['reference']
+    cols = ', '.join(f'c{i}' for i in range(width))
+    # `extra` keeps the cells past the last header, which streaming mode writes back too
+    db.execute(f'CREATE TABLE data (rownum INTEGER PRIMARY KEY, {cols}, extra BLOB)')
+    insert = f'INSERT INTO data VALUES (?, {", ".join("?" * width)}, ?)'
+    plans = []
+    for col, idx, rules in columns:
+        rules = dict(rules)
+        rules['_pattern'] = re.compile(rules['pattern']) if rules['pattern'] else None
+        unit_idx = reference['units'].get(col) if rules['unit_range'] else None
+        plans.append((idx, rules, unit_idx, bool(rules['price_range'])))
+    rownum = 1
+    for batch in iter_batches(rows, BATCH_ROWS):
+        data_rows = []
+        fingerprints = []
+        out = ([], [], [], [], [], [])
+        for row in batch:
+            rownum += 1
+            values = list(row)
+            extra = values[width:]
+            del values[width:]
+            values.extend([None] * (width - len(values)))
+            fixes_before = len(out[1])
+            for idx, rules, unit_idx, has_prices in plans:
+                _load_cell(idx, rules, unit_idx, has_prices, values[idx], rownum, out)
+            data_rows.append([rownum] + [_encode(v) for v in values]
+                             + [pickle.dumps(extra) if any(v is not None for v in extra) else None])
+            if fingerprint_positions is not None:
+                # Case fixes happen later in SQL but do not change a lowercased fingerprint
+                fixed = list(values)
+                for _, idx, val in out[1][fixes_before:]:
+                    fixed[idx] = _decode(val)
+                parts = [normalize_for_fingerprint(fixed[i]) for i in fingerprint_positions]
+                if any(parts):
+                    fingerprints.append((rownum, digest(parts)))
+        issues, fixes, tokens, quantities, prices, trimmed = out
+        db.executemany(insert, data_rows)
+        db.executemany('INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?)', issues)
+        db.executemany('INSERT INTO fixes VALUES (?, ?, ?)', fixes)
+        db.executemany('INSERT INTO tokens VALUES (?, ?, ?, ?, ?)', tokens)
+        db.executemany('INSERT INTO quantities VALUES (?, ?, ?, ?, ?, ?, ?)', quantities)
+        db.executemany('INSERT INTO prices VALUES (?, ?, ?, ?)', prices)
+        db.executemany('INSERT INTO fingerprints VALUES (?, ?)', fingerprints)
+        db.executemany('INSERT INTO trimmed VALUES (?, ?)', trimmed)
+    return rownum - 1
+
+
+def _create_indexes(db, columns, key_positions):
+    db.execute('CREATE INDEX tokens_idx ON tokens (col, token_lower)')
+    db.execute('CREATE INDEX tokens_row ON tokens (rownum, col, pos)')
+    db.execute('CREATE INDEX fixes_row ON fixes (rownum, col)')
+    for _, idx, _ in columns:
+        db.execute(f'CREATE INDEX data_c{idx} ON data (c{idx})')
+    for positions in key_positions:
+        if len(positions) > 1:
+            db.execute(f'CREATE INDEX data_key_{"_".join(map(str, positions))} ON data '
+                       f'({", ".join(f"c{i}" for i in positions)})')
+
+
+def _range_message(num, lo, hi, ext):
+    factor = unit_dimension(ext)[1]
+    return f'Numeric value {num} exceeds allowed range [{lo / factor}, {hi / factor}]'
+
+
+def _size_message(num, nearest, ext):
+    closest = format_magnitude(nearest / unit_dimension(ext)[1])
+    return f'Numeric value {num} not an allowed size, closest is {closest} {ext}'
+
+
+def _run_set_rules(db, key_specs, near_duplicates=False):
+    """The set-based rules, each as one SQL statement over the loaded tables."""
+    # Numbers in messages are formatted by Python, as in the streaming checks: SQLite
+    # renders reals with 15 significant digits and would turn a bound of 10 into 10.0
+    db.create_function('python_str', 1, str, deterministic=True)
+    db.create_function('range_message', 4, _range_message, deterministic=True)
+    db.create_function('size_message', 3, _size_message, deterministic=True)
+    db.create_function('trim_special', 1, lambda v: v.strip(SPECIAL_CHARS), deterministic=True)
+    # Case correction: token has no exact match but a case-insensitive one (uppercase preferred)
+    db.execute("""
+        CREATE TABLE corrected AS
+        SELECT t.rownum, t.col, t.pos, t.token,
+               CASE WHEN EXISTS (SELECT 1 FROM allowed a WHERE a.col = t.col AND a.value = t.token) THEN t.token
+                    ELSE coalesce((SELECT a.value FROM allowed a WHERE a.col = t.col AND a.value_lower = t.token_lower
+                                   ORDER BY a.value = upper(a.value) DESC, a.value LIMIT 1), t.token)
+               END AS fixed
+        FROM tokens t""")
+    db.execute('CREATE INDEX corrected_row ON corrected (rownum, col, pos)')
+    db.execute("""
+        INSERT INTO issues (rownum, col, kind, rule, message)
+        SELECT DISTINCT rownum, col, 'update', 'case', 'Case corrected on values'
+        FROM corrected WHERE fixed <> token""")
+    db.execute("""
+        CREATE TABLE case_fixed AS
+        SELECT rownum, col, group_concat(fixed, ',') AS value FROM
+            (SELECT rownum, col, fixed FROM corrected
+             WHERE (rownum, col) IN (SELECT rownum, col FROM corrected WHERE fixed <> token)
+             ORDER BY rownum, col, pos)
+        GROUP BY rownum, col""")
+    db.execute('CREATE UNIQUE INDEX case_fixed_row ON case_fixed (rownum, col)')
+    db.execute("""
+        INSERT INTO fixes
+        SELECT c.rownum, c.col, CASE WHEN t.rownum IS NULL THEN c.value ELSE trim_special(c.value) END
+        FROM case_fixed c LEFT JOIN trimmed t ON t.rownum = c.rownum AND t.col = c.col""")
+    # The rules after the allowed values see the case-corrected cell in streaming mode
+    db.execute("""
+        UPDATE issues SET value = (SELECT c.value FROM case_fixed c
+                                   WHERE c.rownum = issues.rownum AND c.col = issues.col)
+        WHERE rule IN ('pattern', 'numeric_format', 'formula')
+          AND (rownum, col) IN (SELECT rownum, col FROM case_fixed)""")
+    # In-cell duplicates
+    db.execute("""
+        INSERT INTO issues
+        SELECT rownum, col, 'error', 'duplicates', 'Duplicated values in cell', min(fixed)
+        FROM (SELECT rownum, col, fixed FROM corrected GROUP BY rownum, col, fixed HAVING count(*) > 1)
+        GROUP BY rownum, col""")
+    # Allowed values: anti-join against the reference
+    db.execute("""
+        INSERT INTO issues
+        SELECT c.rownum, c.col, 'error', 'invalid_value', 'Value "' || c.fixed || '" not allowed', c.fixed
+        FROM corrected c
+        WHERE c.col IN (SELECT col FROM allowed)
+          AND NOT EXISTS (SELECT 1 FROM allowed a WHERE a.col = c.col AND a.value = c.fixed)""")
+    # Unit ranges (in base units), then allowed sizes with the nearest suggestion
+    db.execute(f"""
+        INSERT INTO issues
+        SELECT q.rownum, q.col, 'error', 'unit_range',
+               range_message(q.num, r.lo, r.hi, q.ext), q.value
+        FROM quantities q JOIN unit_ranges r ON r.col = q.col AND r.dim = q.dim
+        WHERE q.base < r.lo - {SIZE_TOLERANCE} * max(abs(r.lo), 1.0)
+           OR q.base > r.hi + {SIZE_TOLERANCE} * max(abs(r.hi), 1.0)""")
+    # Nearest neighbours come from the (col, dim, base) index: max below and min above
+    db.execute(f"""
+        INSERT INTO issues
+        SELECT rownum, col, 'error', 'unit_size',
+               size_message(num, CASE WHEN below IS NULL THEN above WHEN above IS NULL THEN below
+                                      WHEN base - below <= above - base THEN below ELSE above END, ext), value
+        FROM (SELECT q.*,
+                     (SELECT max(s.base) FROM sizes s WHERE s.col = q.col AND s.dim = q.dim AND s.base <= q.base) AS below,
+                     (SELECT min(s.base) FROM sizes s WHERE s.col = q.col AND s.dim = q.dim AND s.base >= q.base) AS above
+              FROM quantities q JOIN unit_ranges r ON r.col = q.col AND r.dim = q.dim
+              WHERE q.base BETWEEN r.lo - {SIZE_TOLERANCE} * max(abs(r.lo), 1.0)
+                               AND r.hi + {SIZE_TOLERANCE} * max(abs(r.hi), 1.0))
+        WHERE coalesce(base - below, 1e308) > {SIZE_TOLERANCE} * max(abs(base), 1.0)
+          AND coalesce(above - base, 1e308) > {SIZE_TOLERANCE} * max(abs(base), 1.0)""")
+    # Price range
+    db.execute("""
+        INSERT INTO issues
+        SELECT p.rownum, p.col, 'error', 'price_range',
+               CASE WHEN p.num IS NULL THEN 'Price not a number'
+                    WHEN b.lo IS NOT NULL AND p.num < b.lo THEN 'Below min price ' || python_str(b.lo)
+                    ELSE 'Above max price ' || python_str(b.hi) END,
+               coalesce(c.value, p.value)
+        FROM prices p JOIN price_bounds b ON b.col = p.col
+        LEFT JOIN case_fixed c ON c.rownum = p.rownum AND c.col = p.col
+        WHERE p.num IS NULL OR (b.lo IS NOT NULL AND p.num < b.lo) OR (b.hi IS NOT NULL AND p.num > b.hi)""")
+    # Cross-row duplicate keys: every row after the first of its group
+    for label, positions in key_specs:
+        keys = [f'coalesce((SELECT value FROM fixes f WHERE f.rownum = d.rownum AND f.col = {i} '
+                f'ORDER BY f.rowid DESC LIMIT 1), d.c{i})'
+                for i in positions]
+        not_empty = ' OR '.join(f"coalesce(d.c{i}, '') <> ''" for i in positions)
+        # A single-column key reports its value, as uniqueness.check_uniqueness does
+        db.execute(f"""
+            INSERT INTO issues
+            SELECT rownum, {positions[0]}, 'error', 'duplicate_key', 'Duplicate of row ' || first_row,
+                   {'key_value' if len(positions) == 1 else 'NULL'}
+            FROM (SELECT d.rownum, min(d.rownum) OVER (PARTITION BY {', '.join(keys)}) AS first_row,
+                         {keys[0]} AS key_value
+                  FROM data d WHERE {not_empty})
+            WHERE rownum <> first_row""")
+    if near_duplicates:
+        db.execute("""
+            INSERT INTO issues (rownum, col, kind, rule, message)
+            SELECT rownum, -1, 'error', 'near_duplicate', 'Near-duplicate of row ' || first_row
+            FROM (SELECT rownum, min(rownum) OVER (PARTITION BY fp) AS first_row FROM fingerprints)
+            WHERE rownum <> first_row""")
+    db.execute('CREATE INDEX issues_row ON issues (rownum)')
+
+
+def _stream_rows(db, width, headers, key_labels):
+    """Yield (values, errors, updates) in row order, merging fixes and issues per row."""
+    issues = db.execute('SELECT rownum, col, kind, rule, message, value FROM issues ORDER BY rownum, col')
+    fixes = db.execute('SELECT rownum, col, value FROM fixes ORDER BY rownum, rowid')
+    next_issue = next(issues, None)
+    next_fix = next(fixes, None)
+    for row in db.execute('SELECT * FROM data ORDER BY rownum'):
+        rownum = row[0]
+        values = [_decode(v) for v in row[1:width + 1]]
+        if row[width + 1] is not None:
+            values.extend(pickle.loads(row[width + 1]))
+        while next_fix is not None and next_fix[0] == rownum:
+            values[next_fix[1]] = _decode(next_fix[2])
+            next_fix = next(fixes, None)
+        row_issues = []
+        while next_issue is not None and next_issue[0] == rownum:
+            row_issues.append(next_issue)
+            next_issue = next(issues, None)
+        row_issues.sort(key=lambda i: (i[3] in CROSS_ROW_RULES, i[3] == 'near_duplicate', i[1], RULE_ORDER.get(i[3], 99)))
+        errors = []
+        updates = []
+        for _, col_idx, kind, rule, message, value in row_issues:
+            if rule == 'near_duplicate':
+                col = 'Row'
+            elif rule == 'duplicate_key':
+                col = key_labels.get(col_idx, headers[col_idx])
+            else:
+                col = headers[col_idx]
+            (updates if kind == 'update' else errors).append((col, rule, message, _decode(value)))
+        yield rownum, values, errors, updates
+
+
+def _with_dependencies(results, width, dependencies):
+    """Pad the streamed rows and add the dependent-column issues ahead of the cross-row ones."""
+    for rownum, values, errors, updates in results:
+        values.extend([None] * (width - len(values)))
+        if dependencies:
+            row_errors = []
+            check_dependencies(dependencies, values, row_errors)
+            cross_row = next((i for i, e in enumerate(errors) if e[1] in CROSS_ROW_RULES), len(errors))
+            errors[cross_row:cross_row] = row_errors
+        yield rownum, values, errors, updates
+
+
+def run_out_of_core(file_path, output_path, rules=None, highlight_colors=DEFAULT_HIGHLIGHT_COLORS,
+                    data_sheet='Data', reference_sheet='Sheet1', temp_dir=None, highlight_errors=True):
+    start_time = time.time()
+    src = db = db_path = None
+    try:
+        src = openpyxl.load_workbook(file_path, read_only=True)
+        prepared = prepare_validation(src, file_path, rules, highlight_colors, data_sheet, reference_sheet)
+        headers = prepared['headers']
+        columns = _column_rules(prepared)
+        comments_idx, updates_idx, width = output_columns(headers)
+        config = prepared['config']
+        key_specs = [(' + '.join(spec), [headers.index(c) for c in spec])
+                     for spec in config['unique'] if all(c in headers for c in spec)]
+
+        fd, db_path = tempfile.mkstemp(prefix='validate_', suffix='.sqlite', dir=temp_dir)
+        os.close(fd)
+        db = sqlite3.connect(db_path)
+        db.execute('PRAGMA journal_mode=OFF')
+        db.execute('PRAGMA synchronous=OFF')
+        db.execute('PRAGMA temp_store=FILE')
+        db.executescript(SCHEMA)
+        _load_reference(db, prepared, columns)
+        rows = src[data_sheet].iter_rows(values_only=True)
+        next(rows, None)
+        fingerprint_positions = None
+        if config['near_duplicates']:
+            fingerprint_positions = [i for i, h in enumerate(headers)
+                                     if h is not None and h not in ('Comments', 'Updates Here')]
+        rows_checked = _bulk_load(db, rows, len(headers), columns, prepared, fingerprint_positions)
+        _create_indexes(db, columns, [positions for _, positions in key_specs])
+        _run_set_rules(db, key_specs, config['near_duplicates'])
+        db.commit()
+
+        out = openpyxl.Workbook(write_only=True)
+        summary = new_summary([col for col, _, _ in columns])
+        col_index = {h: i for i, h in enumerate(headers) if h is not None}
+        key_labels = {positions[0]: label for label, positions in key_specs}
+        for name in src.sheetnames:
+            ws_out = out.create_sheet(name)
+            if name != data_sheet:
+                copy_sheet(file_path, src[name], ws_out)
+                continue
+            share_columns(ws_out, (comments_idx, updates_idx))
+            ws_out.append(write_header(ws_out, headers, prepared['green'], comments_idx, updates_idx, width))
+            highlights = new_highlights() if highlight_errors else None
+            results = _with_dependencies(_stream_rows(db, len(headers), headers, key_labels), width,
+                                         build_dependencies(headers, prepared['reference']))
+            for values in render_rows(results, summary, col_index, comments_idx, updates_idx, highlights):
+                ws_out.append(values)
+            if highlights:
+                write_highlights(ws_out, highlights)
+        write_summary_sheet(out.create_sheet('Validation_Summary'), summary)
+        save_workbook(out, output_path)
+    finally:
+        if db is not None:
+            db.close()
+        if db_path is not None:
+            os.remove(db_path)
+        if src is not None:
+            src.close()
+    return {'rows': rows_checked, 'cells': total_cells(summary), 'errors': total_errors(summary),
+            'seconds': round(time.time() - start_time, 3)}
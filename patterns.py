@@ -0,0 +1,49 @@
+import re
+from functools import lru_cache
+
+# Character-class signatures: letters -> A, digits -> 9, whitespace -> ' ', other
+# characters kept as-is, runs collapsed. "5.5 kW" and "12.75 HP" both give "9.9 A",
+# "AB-12" gives "A-9". A column's allowed signatures are learned from Sheet1 and
+# Data values are validated by a set lookup per comma-separated token.
+
+_ASCII_CLASSES = {}
+for _c in range(128):
+    _ch = chr(_c)
+    if _ch.isalpha():
+        _ASCII_CLASSES[_c] = 'A'
+    elif _ch.isdigit():
+        _ASCII_CLASSES[_c] = '9'
+    elif _ch.isspace():
+        _ASCII_CLASSES[_c] = ' '
+RUNS_RE = re.compile(r'(.)\1+')
+
+
+@lru_cache(maxsize=65536)
+def value_signature(text):
+    if text.isascii():
+        classes = text.translate(_ASCII_CLASSES)
+    else:
+        classes = ''.join('A' if ch.isalpha() else '9' if ch.isdigit() else ' ' if ch.isspace() else ch
+                          for ch in text)
+    return RUNS_RE.sub(r'\1', classes)
+
+
+def token_signatures(val):
+    """Signatures of each comma-separated token of a cell value."""
+    text = val.strip() if isinstance(val, str) else str(val)
+    return [value_signature(p.strip()) for p in text.split(',') if p.strip()]
+
+
+def learn_signatures(values):
+    """Set of signatures seen in the reference values of one column."""
+    signatures = set()
+    for v in values:
+        if v is not None:
+            signatures.update(token_signatures(v))
+    return frozenset(signatures)
+
+
+def matches_signatures(val, signatures):
+    if val is None or not signatures:
+        return True
+    return all(sig in signatures for sig in token_signatures(val))
@@ -0,0 +1,141 @@
+import threading
+from queue import Queue, Empty, Full
+from time import perf_counter
+
+from engine import iter_batches, BATCH_ROWS
+
+# Overlapped read -> validate -> write: a reader thread pulls (decompresses and parses)
+# Data rows, the calling thread validates them and a writer thread serializes the
+# output rows. The stages hand over batches through bounded queues, so a slow stage
+# blocks the one feeding it (backpressure) instead of buffering the whole sheet.
+# Each stage records how long it worked and how long it waited on its queues; the
+# stage with the highest utilization is the one that bounds throughput.
+
+QUEUE_DEPTH = 8
+POLL_SECONDS = 0.1
+STAGES = ('read', 'validate', 'write')
+
+_DONE = object()
+
+
+def new_stage():
+    return {'busy': 0.0, 'waiting': 0.0, 'rows': 0}
+
+
+def _put(q, item, stage, stop):
+    """Blocking put that gives up once another stage failed; returns False then."""
+    started = perf_counter()
+    try:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=POLL_SECONDS)
+                return True
+            except Full:
+                continue
+        return False
+    finally:
+        stage['waiting'] += perf_counter() - started
+
+
+def _get(q, stage, stop):
+    started = perf_counter()
+    try:
+        while True:
+            try:
+                return q.get(timeout=POLL_SECONDS)
+            except Empty:
+                if stop.is_set():
+                    return _DONE
+    finally:
+        stage['waiting'] += perf_counter() - started
+
+
+def _read_stage(rows, read_q, stage, stop, failures, batch_rows):
+    started = perf_counter()
+    try:
+        for batch in iter_batches(rows, batch_rows):
+            stage['rows'] += len(batch)
+            if not _put(read_q, batch, stage, stop):
+                return
+        _put(read_q, _DONE, stage, stop)
+    except BaseException as e:
+        failures.append(e)
+        stop.set()
+    finally:
+        stage['busy'] = perf_counter() - started - stage['waiting']
+
+
+def _write_stage(write_q, write, stage, stop, failures):
+    started = perf_counter()
+    try:
+        while True:
+            batch = _get(write_q, stage, stop)
+            if batch is _DONE:
+                return
+            for values in batch:
+                write(values)
+            stage['rows'] += len(batch)
+    except BaseException as e:
+        failures.append(e)
+        stop.set()
+    finally:
+        stage['busy'] = perf_counter() - started - stage['waiting']
+
+
+def _queued_rows(read_q, stage, stop):
+    while True:
+        batch = _get(read_q, stage, stop)
+        if batch is _DONE:
+            return
+        yield from batch
+
+
+def run_pipeline(rows, validate, write, depth=QUEUE_DEPTH, batch_rows=BATCH_ROWS):
+    """Feed `rows` through `validate` (rows -> output rows) into `write` on overlapping threads.
+
+    Returns {'seconds': wall time, 'bottleneck': stage, 'stages': {stage: timings}} where
+    each stage has its busy/waiting seconds, rows handled and utilization %.
+    """
+    read_q = Queue(depth)
+    write_q = Queue(depth)
+    stop = threading.Event()
+    failures = []
+    stages = {name: new_stage() for name in STAGES}
+    validating = stages['validate']
+    started = perf_counter()
+    reader = threading.Thread(target=_read_stage, args=(rows, read_q, stages['read'], stop, failures, batch_rows),
+                              name='pipeline-read', daemon=True)
+    writer = threading.Thread(target=_write_stage, args=(write_q, write, stages['write'], stop, failures),
+                              name='pipeline-write', daemon=True)
+    reader.start()
+    writer.start()
+    try:
+        for batch in iter_batches(validate(_queued_rows(read_q, validating, stop)), batch_rows):
+            validating['rows'] += len(batch)
+            if not _put(write_q, batch, validating, stop):
+                break
+        _put(write_q, _DONE, validating, stop)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        validating['busy'] = perf_counter() - started - validating['waiting']
+        reader.join()
+        writer.join()
+    if failures:
+        raise failures[0]
+    seconds = perf_counter() - started
+    for stage in stages.values():
+        stage['utilization'] = round(100 * stage['busy'] / seconds, 1) if seconds > 0 else 0.0
+    return {'seconds': round(seconds, 3), 'bottleneck': max(stages, key=lambda name: stages[name]['busy']),
+            'stages': stages}
+
+
+def format_stages(timings):
+    """One line per stage, e.g. for the CLI."""
+    lines = []
+    for name, stage in timings['stages'].items():
+        mark = '  <- bottleneck' if name == timings['bottleneck'] else ''
+        lines.append(f'{name:<9} {stage["utilization"]:5.1f}% busy  {stage["busy"]:7.2f}s work '
+                     f'{stage["waiting"]:7.2f}s waiting  {stage["rows"]} rows{mark}')
+    return lines
@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from quantiles import new_sketch, sketch_add, sketch_fences
+
+# Price/currency parsing without exceptions: a compiled regex accepts an optional
+# sign and currency symbol or ISO code around a number with thousands separators
+# (',', '.', space, apostrophe) and a '.' or locale ',' decimal mark. Anything the
+# regex accepts converts with float() safely; anything else is simply None/NaN.
+#   "$1,234.50" -> 1234.5   "1.234,50 EUR" -> 1234.5   "12,5" -> 12.5   "1,200" -> 1200.0
+
+CURRENCY = r'(?:[$€£¥₹₩₽¢]|[A-Z]{3}|R\$|US\$|Rs\.?)'
+# Every \s* follows a token that has to be present and the number starts (after any
+# leading '.', ',' or "'") and ends on a digit, so no two parts can claim the same
+# spaces and bad input fails fast instead of backtracking for seconds.
+PRICE_RE = re.compile(r'(?P<sign>[-+])?\s*(?:' + CURRENCY + r'\s*)?(?:(?P<sign2>-)\s*)?'
+                      r"(?P<num>[.,']*\d(?:[\d.,'\u00a0\u202f ]*\d)?)(?P<exp>[eE][-+]?\d+)?(?:\s*" + CURRENCY + r')?')
+DIGITS_RE = re.compile(r'\d*(?:\.\d+)?')
+GROUP_SEPARATORS = str.maketrans('', '', "'\u00a0\u202f ")
+
+
+def _normalize_number(num):
+    """Resolve thousands vs decimal separators; returns a float()-safe string or None."""
+    num = num.translate(GROUP_SEPARATORS)
+    last_comma = num.rfind(',')
+    last_dot = num.rfind('.')
+    if last_comma >= 0 and last_dot >= 0:
+        # Both present: the last one is the decimal mark
+        if last_comma > last_dot:
+            num = num.replace('.', '').replace(',', '.')
+        else:
+            num = num.replace(',', '')
+    elif last_comma >= 0:
+        # A single comma followed by 1-2 digits is a decimal comma; otherwise thousands
+        if num.count(',') == 1 and len(num) - last_comma - 1 in (1, 2):
+            num = num.replace(',', '.')
+        else:
+            num = num.replace(',', '')
+    elif num.count('.') > 1:
+        num = num.replace('.', '')
+    if not num or DIGITS_RE.fullmatch(num) is None:
+        return None
+    return num
+
+
+@lru_cache(maxsize=65536)
+def _parse_text(text):
+    m = PRICE_RE.fullmatch(text.strip())
+    if m is None:
+        return None
+    num = _normalize_number(m.group('num'))
+    if num is None:
+        return None
+    value = float(num + (m.group('exp') or ''))
+    return -value if '-' in (m.group('sign'), m.group('sign2')) else value
+
+
+def parse_price(val):
+    """Float value of a price cell or None when it is not a number."""
+    if val is None or isinstance(val, bool):
+        return None
+    if isinstance(val, (int, float)):
+        return float(val)
+    return _parse_text(str(val))
+
+
+def parse_prices(values):
+    """Parse a whole column at once; returns a float array with NaN for non-numbers."""
+    return np.fromiter((np.nan if p is None else p for p in map(parse_price, values)), dtype=float)
+
+
+def price_range(values):
+    """(min, max) of the parseable prices in `values`, or (None, None)."""
+    prices = parse_prices(values)
+    prices = prices[~np.isnan(prices)]
+    if not prices.size:
+        return None, None
+    return float(prices.min()), float(prices.max())
+
+
+
+def price_fences(values, iqr=None, quantiles=None):
+    """Outlier fences of a price column from one streaming pass (see quantiles.py)."""
+    sketch = new_sketch()
+    for val in values:
+        price = parse_price(val)
+        if price is not None:
+            sketch_add(sketch, price)
+    return sketch_fences(sketch, iqr, quantiles)
@@ -0,0 +1,83 @@
+import math
+
+# Bounded-memory quantile sketch (KLL): values enter level 0; when the levels hold
+# more than their capacities, the lowest full level is sorted and every other item
+# is promoted to the next level with double weight. Memory stays around 3k items
+# whatever the column length, and quantile estimates have rank error ~1/k.
+
+DEFAULT_K = 200
+DEFAULT_IQR = 1.5
+
+
+def new_sketch(k=DEFAULT_K):
+    return {'k': k, 'levels': [[]], 'n': 0, 'min': math.inf, 'max': -math.inf, 'coin': 0}
+
+
+def _capacity(sketch, level):
+    depth = len(sketch['levels']) - level - 1
+    return max(2, int(math.ceil(sketch['k'] * (2 / 3) ** depth)))
+
+
+def _compress(sketch):
+    levels = sketch['levels']
+    for h, items in enumerate(levels):
+        if len(items) >= _capacity(sketch, h):
+            if h + 1 == len(levels):
+                levels.append([])
+            items.sort()
+            # Alternate the kept half so repeated compactions stay unbiased
+            sketch['coin'] ^= 1
+            levels[h + 1].extend(items[sketch['coin']::2])
+            levels[h] = []
+            return
+
+
+def sketch_add(sketch, x):
+    sketch['levels'][0].append(x)
+    sketch['n'] += 1
+    if x < sketch['min']:
+        sketch['min'] = x
+    if x > sketch['max']:
+        sketch['max'] = x
+    if sum(len(items) for items in sketch['levels']) >= sum(_capacity(sketch, h) for h in range(len(sketch['levels']))):
+        _compress(sketch)
+
+
+def sketch_quantiles(sketch, qs):
+    """Estimated values at ranks `qs` (0..1); exact min/max at 0 and 1."""
+    if not sketch['n']:
+        return [None] * len(qs)
+    weighted = sorted((x, 1 << h) for h, items in enumerate(sketch['levels']) for x in items)
+    total = sum(w for _, w in weighted)
+    results = []
+    for q in qs:
+        if q <= 0:
+            results.append(sketch['min'])
+            continue
+        if q >= 1:
+            results.append(sketch['max'])
+            continue
+        target = q * total
+        cumulative = 0
+        value = weighted[-1][0]
+        for x, w in weighted:
+            cumulative += w
+            if cumulative >= target:
+                value = x
+                break
+        results.append(value)
+    return results
+
+
+def sketch_fences(sketch, iqr=None, quantiles=None):
+    """(low, high) fences: Tukey fences q1 - iqr*IQR / q3 + iqr*IQR, or explicit quantiles.
+
+    Fences are never wider than the observed min/max, so they only tighten a raw range check.
+    """
+    if not sketch['n']:
+        return None, None
+    if quantiles is not None:
+        return tuple(sketch_quantiles(sketch, quantiles))
+    q1, q3 = sketch_quantiles(sketch, (0.25, 0.75))
+    k = DEFAULT_IQR if iqr is None else iqr
+    return max(sketch['min'], q1 - k * (q3 - q1)), min(sketch['max'], q3 + k * (q3 - q1))
@@ -0,0 +1,147 @@
+import os
+import glob
+import sqlite3
+
+from tokenizer import tokenize_cell
+
+# Shared external reference: a directory of master workbooks (or a ready SQLite
+# file) indexed once into SQLite with one lookup table keyed by (column, value)
+# plus a lowercase index for case correction. Category workbooks are then
+# validated with batched IN (...) lookups instead of re-indexing their own Sheet1.
+
+INDEX_NAME = '.reference_index.sqlite'
+LOOKUP_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS allowed (
+    col TEXT NOT NULL,
+    value TEXT NOT NULL,
+    value_lower TEXT NOT NULL,
+    whole INTEGER NOT NULL,
+    PRIMARY KEY (col, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS allowed_lower ON allowed (col, value_lower);
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+"""
+
+
+def _master_files(directory):
+    return sorted(p for p in glob.glob(os.path.join(directory, '*.xlsx'))
+                  if not os.path.basename(p).startswith('~$'))
+
+
+def _file_signatures(paths):
+    signatures = []
+    for p in paths:
+        st = os.stat(p)
+        signatures.append((os.path.abspath(p), st.st_mtime_ns, st.st_size))
+    return signatures
+
+
+def _master_rows(path, sheet_name):
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True)
+    ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.worksheets[0]
+    rows = ws.iter_rows(values_only=True)
+    headers = list(next(rows, ()))
+    for row in rows:
+        for i, val in enumerate(row):
+            if val is None or i >= len(headers) or headers[i] is None:
+                continue
+            str_val = str(val).strip()
+            # The cell itself is a whole value; only the parts of a comma list are not
+            yield headers[i], str_val, str_val.lower(), 1
+            if ',' in str_val:
+                for sub in str_val.split(','):
+                    sub = sub.strip()
+                    if sub:
+                        yield headers[i], sub, sub.lower(), 0
+    wb.close()
+
+
+def index_master_directory(directory, index_path=None, sheet_name='Sheet1'):
+    """(Re)build the SQLite index for a directory of master workbooks when any file changed."""
+    index_path = index_path or os.path.join(directory, INDEX_NAME)
+    db = sqlite3.connect(index_path)
+    db.executescript(SCHEMA)
+    signatures = _file_signatures(_master_files(directory))
+    stored = sorted(db.execute('SELECT path, mtime_ns, size FROM sources'))
+    if stored != sorted(signatures):
+        with db:
+            db.execute('DELETE FROM allowed')
+            db.execute('DELETE FROM sources')
+            for path, _, _ in signatures:
+                # A value seen as a whole cell anywhere keeps whole=1
+                db.executemany('INSERT INTO allowed VALUES (?, ?, ?, ?) '
+                               'ON CONFLICT (col, value) DO UPDATE SET whole = max(whole, excluded.whole)',
+                               _master_rows(path, sheet_name))
+            db.executemany('INSERT INTO sources VALUES (?, ?, ?)', signatures)
+    return db
+
+
+def open_reference_store(source, index_path=None, sheet_name='Sheet1'):
+    """Open a reference store from a master-workbook directory or an existing SQLite file."""
+    if os.path.isdir(source):
+        db = index_master_directory(source, index_path, sheet_name)
+        signature = tuple(db.execute('SELECT path, mtime_ns, size FROM sources ORDER BY path'))
+    elif os.path.isfile(source):
+        db = sqlite3.connect(source)
+        db.executescript(SCHEMA)
+        st = os.stat(source)
+        signature = (os.path.abspath(source), st.st_mtime_ns, st.st_size)
+    else:
+        raise FileNotFoundError(f'Reference store not found: {source}')
+    columns = {row[0] for row in db.execute('SELECT DISTINCT col FROM allowed')}
+    return {'db': db, 'columns': columns, 'signature': signature}
+
+
+def close_reference_store(store):
+    store['db'].close()
+
+
+def new_store_column(col):
+    """Per-column lookup state filled by prefetch: plain set/dict so check_tokens can use them."""
+    return {'col': col, 'allowed': set(), 'case_map': {}, 'known_lower': set()}
+
+
+def prefetch(store, store_col, tokens):
+    """Resolve membership and preferred case for `tokens` with batched IN (...) queries."""
+    known = store_col['known_lower']
+    wanted = {t.lower() for t in tokens} - known
+    if not wanted:
+        return
+    wanted = list(wanted)
+    db = store['db']
+    allowed = store_col['allowed']
+    case_map = store_col['case_map']
+    for start in range(0, len(wanted), LOOKUP_CHUNK):
+        chunk = wanted[start:start + LOOKUP_CHUNK]
+        marks = ','.join('?' * len(chunk))
+        for value, value_lower in db.execute(
+                f'SELECT value, value_lower FROM allowed WHERE col = ? AND value_lower IN ({marks})',
+                [store_col['col']] + chunk):
+            allowed.add(value)
+            current = case_map.get(value_lower)
+            if current is None or (value.isupper() and not current.isupper()):
+                case_map[value_lower] = value
+    known.update(wanted)
+
+
+def prefetch_cells(store, store_col, cells, clean=None):
+    """Collect the distinct tokens of a batch of raw cells and prefetch them in one go."""
+    tokens = set()
+    for val in cells:
+        if val is None:
+            continue
+        if isinstance(val, str):
+            tokens.update(tokenize_cell(val))
+            if clean is not None:
+                tokens.update(tokenize_cell(clean(val)))
+        else:
+            tokens.add(str(val))
+    prefetch(store, store_col, tokens)
+
+
+def store_whole_values(store, col):
+    """Whole-cell values of a column (used to build unit ranges and price bounds)."""
+    return [row[0] for row in store['db'].execute('SELECT value FROM allowed WHERE col = ? AND whole = 1', (col,))]
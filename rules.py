@@ -0,0 +1,364 @@
+import os
+import re
+import json
+
+from tokenizer import build_case_map, check_tokens, tokenize_cell
+from uniqueness import DEFAULT_SPILL_THRESHOLD
+from prices import parse_price, price_range
+from quantiles import sketch_fences
+from unit_index import (parse_quantity, unit_dimension, range_in_unit, quantity_in_range,
+                        nearest_size, format_magnitude)
+
+# Declarative rule config, e.g. (JSON or YAML):
+#
+#   defaults:
+#     decimals: 2
+#   columns:
+#     Price:  {allowed: false, price_range: true}
+#     Weight: {unit_range: true}
+#     Code:   {pattern: '[A-Z]{2}-\d{2}'}
+#
+# Rules per column:
+#   clean        strip quotes, fix delimiters, trim special chars (updates)
+#   allowed      value (or each comma-separated value) must appear in Sheet1
+#   pattern      regex the whole value must fully match
+#   price_range  true -> [min, max] of the Sheet1 prices, or an explicit [min, max], or
+#                outlier fences from a quantile sketch of Sheet1: {iqr: 1.5} (Tukey fences)
+#                or {quantiles: [0.01, 0.99]}; one bad reference price no longer widens the range
+#   unit_range   true -> normalized range and allowed sizes from Sheet1 "10 KG" style values
+#   decimals     max decimals for numeric text (also flags a trailing ".0"), null to skip
+#   no_formula   flag cells starting with "="
+#
+# Top-level cross-row settings:
+#   unique           key columns whose values must not repeat across rows,
+#                    e.g. [SKU, [Brand, Part Number]]
+#   near_duplicates  flag rows identical to an earlier row after normalizing case/punctuation
+#   spill_threshold  keys kept in memory per index before spilling to a temp SQLite file
+#   depends_on       dependent column -> key column(s); the value must occur together with
+#                    the row's key values in some Sheet1 row (see dependencies.py), e.g.
+#                    {Voltage: [Motor Type], Weight: [Motor Type, Voltage]}
+
+RULE_KEYS = ('clean', 'allowed', 'pattern', 'price_range', 'unit_range', 'decimals', 'no_formula')
+
+# Defaults follow the behavior of the standalone scripts: prices are range checked
+# instead of matched, numeric-with-unit columns are range checked when Sheet1 has units.
+DEFAULT_RULES = {
+    'clean': True,
+    'allowed': True,
+    'pattern': None,
+    'price_range': None,
+    'unit_range': None,
+    'decimals': 2,
+    'no_formula': True,
+}
+
+SPECIAL_CHARS = ' !@#$%^&*()_+-=[]{};:\'",.<>?/|\\'
+NUMERIC_TEXT_RE = re.compile(r'\d+(\.\d+)?')
+EDGE_SPECIAL_RE = re.compile(r'^[^A-Za-z0-9]+|[^A-Za-z0-9]+$')
+
+
+def fix_quotes(val):
+    val = val.strip()
+    while (val.startswith('"') and val.endswith('"')) or (val.startswith("'") and val.endswith("'")):
+        val = val[1:-1].strip()
+    return val
+
+
+def clean_commas(val):
+    val = val.strip()
+    val = re.sub(r'^[,]+\s*', '', val)
+    val = re.sub(r'\s*[,]+$', '', val)
+    val = re.sub(r'[;|/]', ',', val)
+    val = re.sub(r'\s*,\s*', ',', val)
+    return val
+
+
+def load_rules(path):
+    """Read a rule config from a .json/.yaml/.yml file and validate it."""
+    with open(path, encoding='utf-8') as fh:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('PyYAML is required for YAML rule files (pip install pyyaml)')
+            config = yaml.safe_load(fh) or {}
+        else:
+            config = json.load(fh)
+    return validate_rules(config)
+
+
+def _validate_fences(where, setting):
+    if len(setting) != 1 or not set(setting) <= {'iqr', 'quantiles'}:
+        raise ValueError(f'{where}.price_range: expected {{iqr: k}} or {{quantiles: [lo, hi]}}')
+    if 'iqr' in setting:
+        k = setting['iqr']
+        if not isinstance(k, (int, float)) or isinstance(k, bool) or k < 0:
+            raise ValueError(f'{where}.price_range.iqr: expected a non-negative number')
+    else:
+        qs = setting['quantiles']
+        if (not isinstance(qs, (list, tuple)) or len(qs) != 2
+                or not all(isinstance(q, (int, float)) and 0 <= q <= 1 for q in qs) or qs[0] >= qs[1]):
+            raise ValueError(f'{where}.price_range.quantiles: expected [lo, hi] with 0 <= lo < hi <= 1')
+
+
+def _validate_column_rules(where, rules):
+    if not isinstance(rules, dict):
+        raise ValueError(f'{where}: expected a mapping of rule -> setting')
+    for key, setting in rules.items():
+        if key not in RULE_KEYS:
+            raise ValueError(f'{where}: unknown rule "{key}" (expected one of {", ".join(RULE_KEYS)})')
+        if key in ('clean', 'allowed', 'no_formula', 'unit_range') and setting is not None and not isinstance(setting, bool):
+            raise ValueError(f'{where}.{key}: expected true/false')
+        if key == 'pattern' and setting is not None:
+            if not isinstance(setting, str):
+                raise ValueError(f'{where}.pattern: expected a regex string')
+            try:
+                re.compile(setting)
+            except re.error as e:
+                raise ValueError(f'{where}.pattern: invalid regex ({e})')
+        if key == 'price_range' and isinstance(setting, dict):
+            _validate_fences(where, setting)
+        elif key == 'price_range' and setting is not None and not isinstance(setting, bool):
+            if (not isinstance(setting, (list, tuple)) or len(setting) != 2
+                    or not all(isinstance(x, (int, float)) for x in setting) or setting[0] > setting[1]):
+                raise ValueError(f'{where}.price_range: expected true/false, [min, max], {{iqr: k}} or {{quantiles: [lo, hi]}}')
+        if key == 'decimals' and setting is not None and (not isinstance(setting, int) or isinstance(setting, bool) or setting < 0):
+            raise ValueError(f'{where}.decimals: expected a non-negative integer')
+
+
+def validate_rules(config):
+    """Check a loaded rule config and return it with defaults filled in."""
+    if not isinstance(config, dict):
+        raise ValueError('Rule config must be a mapping with "defaults" and/or "columns"')
+    unknown = set(config) - {'defaults', 'columns', 'unique', 'near_duplicates', 'spill_threshold', 'depends_on'}
+    if unknown:
+        raise ValueError(f'Unknown top-level keys in rule config: {", ".join(sorted(unknown))}')
+    defaults = config.get('defaults') or {}
+    columns = config.get('columns') or {}
+    _validate_column_rules('defaults', defaults)
+    if not isinstance(columns, dict):
+        raise ValueError('columns: expected a mapping of column name -> rules')
+    for col, rules in columns.items():
+        _validate_column_rules(f'columns.{col}', rules)
+    unique = config.get('unique') or []
+    if not isinstance(unique, list):
+        raise ValueError('unique: expected a list of column names or column lists')
+    unique = [[spec] if isinstance(spec, str) else spec for spec in unique]
+    if not all(isinstance(spec, list) and spec and all(isinstance(c, str) for c in spec) for spec in unique):
+        raise ValueError('unique: expected a list of column names or column lists')
+    if not isinstance(config.get('near_duplicates', False), bool):
+        raise ValueError('near_duplicates: expected true/false')
+    spill_threshold = config.get('spill_threshold', DEFAULT_SPILL_THRESHOLD)
+    if not isinstance(spill_threshold, int) or isinstance(spill_threshold, bool) or spill_threshold < 1:
+        raise ValueError('spill_threshold: expected a positive integer')
+    depends_on = config.get('depends_on') or {}
+    if not isinstance(depends_on, dict):
+        raise ValueError('depends_on: expected a mapping of column -> key column(s)')
+    depends_on = {col: [keys] if isinstance(keys, str) else keys for col, keys in depends_on.items()}
+    for col, keys in depends_on.items():
+        if not isinstance(keys, list) or not keys or not all(isinstance(k, str) for k in keys):
+            raise ValueError(f'depends_on.{col}: expected a column name or a list of column names')
+        if col in keys:
+            raise ValueError(f'depends_on.{col}: a column cannot depend on itself')
+    return {'defaults': dict(DEFAULT_RULES, **defaults), 'columns': {col: dict(rules) for col, rules in columns.items()},
+            'unique': unique, 'near_duplicates': config.get('near_duplicates', False),
+            'spill_threshold': spill_threshold, 'depends_on': depends_on}
+
+
+def rules_for_column(config, col, reference):
+    """Resolve the effective rules of one column, turning auto (None) settings into decisions."""
+    rules = dict(config['defaults'])
+    rules.update(config['columns'].get(col, {}))
+    if rules['price_range'] is None:
+        rules['price_range'] = str(col).lower() == 'price'
+        if rules['price_range'] and 'allowed' not in config['columns'].get(col, {}):
+            rules['allowed'] = False
+    if rules['unit_range'] is None:
+        rules['unit_range'] = col in reference['units']
+    return rules
+
+
+def _check_clean(col):
+    def check(val, errors, updates):
+        if isinstance(val, str):
+            new_val = clean_commas(fix_quotes(val))
+            if new_val != val:
+                updates.append(('cleaned', 'Removed quotes and fixed delimiters', val))
+                val = new_val
+        return val
+    return check
+
+
+def _check_allowed(col, allowed, skip_quantities, case_map=None, resolve=None):
+    # `resolve(tokens)` lets an external reference store fill `allowed`/`case_map`
+    # for tokens it has not looked up yet (see reference_store.prefetch).
+    if case_map is None:
+        case_map = build_case_map(allowed)
+    cache = {}
+
+    def check(val, errors, updates):
+        if val is None:
+            return val
+        if isinstance(val, str):
+            if skip_quantities and parse_quantity(val) is not None:
+                return val
+            if resolve is not None and val not in cache:
+                resolve(tokenize_cell(val))
+            tokens, corrected, has_dups, invalid = check_tokens(val, allowed, case_map, cache)
+            if corrected != tokens:
+                updates.append(('case', 'Case corrected on values', val))
+                val = ','.join(corrected)
+            if has_dups:
+                errors.append(('duplicates', 'Duplicated values in cell',
+                               min(t for t in set(corrected) if corrected.count(t) > 1)))
+            for v in invalid:
+                errors.append(('invalid_value', f'Value "{v}" not allowed', v))
+        else:
+            if resolve is not None:
+                resolve((str(val),))
+            if str(val) not in allowed:
+                errors.append(('invalid_value', f'Value "{val}" not allowed', val))
+        return val
+    return check
+
+
+def _check_unit_range(col, unit_idx):
+    def check(val, errors, updates):
+        parsed = parse_quantity(str(val)) if val is not None else None
+        if parsed is None:
+            return val
+        original = val
+        num_val, ext_val, dim, base_val = parsed
+        if ext_val == '' and len(unit_idx['units']) == 1:
+            ext_val = next(iter(unit_idx['units']))
+            val = f"{format_magnitude(num_val)} {ext_val}"
+            dim, factor = unit_dimension(ext_val)
+            base_val = num_val * factor
+            updates.append(('unit_extension', f'Added missing extension "{ext_val}"', original))
+        elif ext_val != '' and dim not in unit_idx['ranges']:
+            errors.append(('unit_nonstandard', f'Extension "{ext_val}" not standard but accepted', original))
+        if ext_val == '' or dim not in unit_idx['ranges']:
+            return val
+        if not quantity_in_range(unit_idx, base_val, dim):
+            min_n, max_n = range_in_unit(unit_idx, ext_val)
+            errors.append(('unit_range', f'Numeric value {num_val} exceeds allowed range [{min_n}, {max_n}]', original))
+        else:
+            allowed_size, closest = nearest_size(unit_idx, dim, base_val)
+            if not allowed_size:
+                closest = format_magnitude(closest / unit_dimension(ext_val)[1])
+                errors.append(('unit_size', f'Numeric value {num_val} not an allowed size, closest is {closest} {ext_val}',
+                               original))
+        return val
+    return check
+
+
+def price_limits(setting, values, sketch=None):
+    """(min, max) for a price_range setting: Sheet1 range, explicit bounds or sketch fences."""
+    if setting is True:
+        return price_range(values or [])
+    if isinstance(setting, dict):
+        if sketch is None:
+            return None, None
+        lo, hi = sketch_fences(sketch, setting.get('iqr'), setting.get('quantiles'))
+        return (None if lo is None else round(lo, 2)), (None if hi is None else round(hi, 2))
+    return tuple(setting)
+
+
+def _check_price_range(col, min_price, max_price):
+    def check(val, errors, updates):
+        if val is None:
+            return val
+        num_val = parse_price(val)
+        if num_val is None:
+            errors.append(('price_range', 'Price not a number', val))
+        elif min_price is not None and num_val < min_price:
+            errors.append(('price_range', f'Below min price {min_price}', val))
+        elif max_price is not None and num_val > max_price:
+            errors.append(('price_range', f'Above max price {max_price}', val))
+        return val
+    return check
+
+
+def _check_pattern(col, pattern):
+    regex = re.compile(pattern)
+
+    def check(val, errors, updates):
+        if val is not None and not regex.fullmatch(str(val)):
+            errors.append(('pattern', 'Pattern mismatch', val))
+        return val
+    return check
+
+
+def _check_decimals(col, max_decimals):
+    def check(val, errors, updates):
+        if isinstance(val, str) and NUMERIC_TEXT_RE.fullmatch(val):
+            if val.endswith('.0'):
+                errors.append(('numeric_format', 'Numeric value ends with .0', val))
+            if '.' in val and len(val.split('.')[1]) > max_decimals:
+                errors.append(('numeric_format', f'Numeric value has more than {max_decimals} decimals', val))
+        return val
+    return check
+
+
+def _check_trim_special(col):
+    def check(val, errors, updates):
+        if isinstance(val, str) and EDGE_SPECIAL_RE.search(val):
+            cleaned = val.strip(SPECIAL_CHARS)
+            if cleaned != val:
+                updates.append(('special_chars', 'Trimmed special chars', val))
+                val = cleaned
+        return val
+    return check
+
+
+def _check_formula(col):
+    def check(val, errors, updates):
+        if isinstance(val, str) and val.startswith('='):
+            errors.append(('formula', 'Contains formula', val))
+        return val
+    return check
+
+
+def compile_column(col, rules, reference):
+    """Build the ordered list of checks for one column; disabled rules cost nothing per cell."""
+    checks = []
+    values = reference['values'].get(col)
+    if rules['clean']:
+        checks.append(_check_clean(col))
+    unit_idx = reference['units'].get(col) if rules['unit_range'] else None
+    if unit_idx:
+        checks.append(_check_unit_range(col, unit_idx))
+    if rules['allowed'] and values is not None:
+        checks.append(_check_allowed(col, reference['allowed'][col], unit_idx is not None,
+                                     reference.get('case_maps', {}).get(col), reference.get('resolvers', {}).get(col)))
+    if rules['price_range']:
+        min_price, max_price = price_limits(rules['price_range'], values, reference.get('sketches', {}).get(col))
+        if min_price is not None or max_price is not None:
+            checks.append(_check_price_range(col, min_price, max_price))
+    if rules['pattern']:
+        checks.append(_check_pattern(col, rules['pattern']))
+    if rules['decimals'] is not None:
+        checks.append(_check_decimals(col, rules['decimals']))
+    # Formulas are detected before the special-char trim would strip the leading "="
+    if rules['no_formula']:
+        checks.append(_check_formula(col))
+    if rules['clean']:
+        checks.append(_check_trim_special(col))
+    return checks
+
+
+def compile_rules(config, reference, columns):
+    """Compile {column: [checks]} for the validated columns, dropping columns with no checks."""
+    pipelines = {}
+    for col in columns:
+        checks = compile_column(col, rules_for_column(config, col, reference), reference)
+        if checks:
+            pipelines[col] = checks
+    return pipelines
+
+
+def rules_signature(rules_path):
+    if rules_path is None:
+        return None
+    st = os.stat(rules_path)
+    return (os.path.abspath(rules_path), st.st_mtime_ns, st.st_size)
@@ -0,0 +1,145 @@
+import math
+import time
+import random
+from collections import defaultdict
+
+import openpyxl
+
+from engine import prepare_validation, prefetch_batch, validate_row, BATCH_ROWS
+from header_styles import DEFAULT_HIGHLIGHT_COLORS
+from dependencies import build_dependencies, check_dependencies
+from reference_store import open_reference_store, close_reference_store
+
+# Quick-check mode: Data rows are streamed once and a stratified random sample is
+# kept with one reservoir per block of consecutive rows (so every part of the sheet
+# is represented). Only the sampled rows are validated; per-rule counts are scaled
+# back to the whole sheet and reported with Wilson confidence intervals.
+
+DEFAULT_STRATA = 10
+Z_95 = 1.959964
+
+
+def reservoir_add(reservoir, seen, item, size, rng):
+    """Algorithm R: keep a uniform sample of `size` items; `seen` counts items before this one."""
+    if len(reservoir) < size:
+        reservoir.append(item)
+    else:
+        j = rng.randrange(seen + 1)
+        if j < size:
+            reservoir[j] = item
+
+
+def stratified_sample(rows, sample_size, total_rows=None, strata=DEFAULT_STRATA, seed=None):
+    """Return ([(stratum_rows, [(row_num, row), ...]), ...], rows_seen) from one pass over `rows`.
+
+    With `total_rows` unknown the whole sheet is a single stratum.
+    """
+    rng = random.Random(seed)
+    if not total_rows:
+        strata = 1
+    strata = max(1, min(strata, sample_size, total_rows or sample_size))
+    stratum_len = math.ceil(total_rows / strata) if total_rows else None
+    per_stratum = math.ceil(sample_size / strata)
+    reservoirs = [[] for _ in range(strata)]
+    counts = [0] * strata
+    row_num = 1
+    for row in rows:
+        row_num += 1
+        h = min((row_num - 2) // stratum_len, strata - 1) if stratum_len else 0
+        reservoir_add(reservoirs[h], counts[h], (row_num, row), per_stratum, rng)
+        counts[h] += 1
+    return list(zip(counts, reservoirs)), row_num - 1
+
+
+def wilson_interval(p, n, z=Z_95):
+    """Wilson score interval for a proportion `p` observed over `n` trials."""
+    if n <= 0:
+        return 0.0, 1.0
+    p = min(1.0, max(0.0, p))
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def estimate_counts(strata_counts, cells_per_row):
+    """Scale per-stratum rule counts to the population.
+
+    `strata_counts` is [(stratum_rows, sampled_rows, {rule: count}), ...]; returns
+    {rule: (estimated_count, percentage, ci_low_pct, ci_high_pct)} with percentages of cells.
+    """
+    population = sum(n_rows for n_rows, _, _ in strata_counts)
+    sampled = sum(n for _, n, _ in strata_counts)
+    cells = population * cells_per_row
+    sampled_cells = sampled * cells_per_row
+    rules = {rule for _, _, counts in strata_counts for rule in counts}
+    estimates = {}
+    for rule in rules:
+        estimate = sum(n_rows / n * counts.get(rule, 0) for n_rows, n, counts in strata_counts if n)
+        p = estimate / cells if cells else 0.0
+        low, high = wilson_interval(p, sampled_cells)
+        estimates[rule] = (round(estimate), round(p * 100, 2), round(low * 100, 2), round(high * 100, 2))
+    return estimates
+
+
+def write_sampled_summary(ws_out, estimates, sampled, population):
+    ws_out.append(['Error Type', 'Estimated Count', 'Percentage', 'CI Low %', 'CI High %'])
+    for rule, (count, pct, low, high) in sorted(estimates.items(), key=lambda e: -e[1][0]):
+        ws_out.append([rule, count, pct, low, high])
+    ws_out.append([])
+    ws_out.append(['Sample size', sampled, f'of {population} rows', '95% Wilson interval', ''])
+
+
+def run_sampled(file_path, output_path, sample_size, rules=None, highlight_colors=DEFAULT_HIGHLIGHT_COLORS,
+                data_sheet='Data', reference_sheet='Sheet1', reference_store=None,
+                strata=DEFAULT_STRATA, seed=None):
+    """Validate a stratified sample of `sample_size` Data rows and write estimated rates.
+
+    Cross-row rules (duplicate keys, near-duplicates) need every row and are skipped.
+    """
+    start_time = time.time()
+    store = open_reference_store(reference_store) if isinstance(reference_store, str) else reference_store
+    src = None
+    try:
+        src = openpyxl.load_workbook(file_path, read_only=True)
+        prepared = prepare_validation(src, file_path, rules, highlight_colors, data_sheet, reference_sheet, store)
+        plan = prepared['plan']
+        width = len(prepared['headers'])
+        dependencies = build_dependencies(prepared['headers'], prepared['reference'])
+
+        ws = src[data_sheet]
+        total_rows = ws.max_row - 1 if ws.max_row else None
+        rows = ws.iter_rows(min_row=2, values_only=True)
+        strata_samples, rows_seen = stratified_sample(rows, sample_size, total_rows, strata, seed)
+
+        strata_counts = []
+        sampled = 0
+        for stratum_rows, sample in strata_samples:
+            counts = defaultdict(int)
+            if store is not None:
+                for start in range(0, len(sample), BATCH_ROWS):
+                    prefetch_batch(store, prepared, [row for _, row in sample[start:start + BATCH_ROWS]])
+            for _, row in sample:
+                values = list(row)
+                if len(values) < width:
+                    values.extend([None] * (width - len(values)))
+                errors, _ = validate_row(values, plan)
+                check_dependencies(dependencies, values, errors)
+                # Rates are per cell: a cell with several bad tokens counts once per rule
+                for _, rule in {(col, rule) for col, rule, _, _ in errors}:
+                    counts[rule] += 1
+            sampled += len(sample)
+            strata_counts.append((stratum_rows, len(sample), counts))
+    finally:
+        if src is not None:
+            src.close()
+        if isinstance(reference_store, str) and store is not None:
+            close_reference_store(store)
+
+    estimates = estimate_counts(strata_counts, len(plan))
+    out = openpyxl.Workbook(write_only=True)
+    write_sampled_summary(out.create_sheet('Validation_Summary'), estimates, sampled, rows_seen)
+    out.save(output_path)
+    return {'rows': rows_seen, 'sampled': sampled, 'cells': sampled * len(plan),
+            'errors': sum(e[0] for e in estimates.values()), 'estimates': estimates,
+            'seconds': round(time.time() - start_time, 3)}
@@ -0,0 +1,140 @@
+from multiprocessing import Pool, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import openpyxl
+
+from columnar_cache import pack_cells, decode_cell
+from engine import prepare_validation, iter_batches, validate_row, output_columns
+from dependencies import build_dependencies, check_dependencies
+from uniqueness import build_uniqueness, check_uniqueness, close_uniqueness
+
+# Multi-process validation without pickling cell values: each chunk of Data rows is
+# laid out per validated column in a shared-memory block (int64 offsets, one type
+# tag byte per cell, UTF-8 blob). Workers attach to the blocks, validate their slice
+# of rows with the same compiled checks and write one uint32 issue bitmask per cell
+# into a shared result array. The parent only re-runs the checks for flagged cells
+# to render the exact Comments/Updates text, so clean cells cost nothing in the parent.
+
+CHUNK_ROWS = 50000
+RULE_BITS = ('cleaned', 'case', 'duplicates', 'invalid_value', 'unit_extension', 'unit_nonstandard',
+             'unit_range', 'unit_size', 'price_range', 'pattern', 'numeric_format', 'formula',
+             'special_chars')
+RULE_MASKS = {rule: 1 << i for i, rule in enumerate(RULE_BITS)}
+OTHER_BIT = 1 << 30
+CHANGED_BIT = 1 << 31
+
+_worker = {}
+
+
+def pack_column(cells):
+    """Lay out one column as a shared-memory block: offsets[n + 1] (int64), tags[n], blob."""
+    n = len(cells)
+    offsets, tags, blob = pack_cells(cells)
+    head = 8 * (n + 1)
+    shm = SharedMemory(create=True, size=max(1, head + n + len(blob)))
+    shm.buf[:head] = offsets.tobytes()
+    shm.buf[head:head + n] = tags
+    shm.buf[head + n:head + n + len(blob)] = blob
+    return shm
+
+
+def _worker_init(file_path, rules, highlight_colors, data_sheet, reference_sheet):
+    wb = openpyxl.load_workbook(file_path, read_only=True)
+    prepared = prepare_validation(wb, file_path, rules, highlight_colors, data_sheet, reference_sheet)
+    wb.close()
+    _worker['checks'] = {col: checks for col, _, checks in prepared['plan']}
+
+
+def issue_mask(errors, updates, changed):
+    mask = CHANGED_BIT if changed else 0
+    for rule, _, _ in errors:
+        mask |= RULE_MASKS.get(rule, OTHER_BIT)
+    for rule, _, _ in updates:
+        mask |= RULE_MASKS.get(rule, OTHER_BIT)
+    return mask
+
+
+def _validate_slice(task):
+    """Worker: validate rows [start, stop) of one column block and write bitmasks."""
+    col, col_pos, block_name, result_name, n, start, stop = task
+    checks = _worker['checks'][col]
+    block = SharedMemory(name=block_name)
+    result = SharedMemory(name=result_name)
+    head = 8 * (n + 1)
+    offsets = block.buf[:head].cast('q')
+    masks = result.buf.cast('I')
+    try:
+        for i in range(start, stop):
+            val = decode_cell(block.buf[head + i], block.buf[head + n + offsets[i]:head + n + offsets[i + 1]])
+            original = val
+            errors = []
+            updates = []
+            for check in checks:
+                val = check(val, errors, updates)
+            masks[col_pos * n + i] = issue_mask(errors, updates, val != original)
+    finally:
+        offsets.release()
+        masks.release()
+        block.close()
+        result.close()
+    return stop - start
+
+
+def _slices(n, parts):
+    step = max(1, -(-n // parts))
+    return [(s, min(n, s + step)) for s in range(0, n, step)]
+
+
+def iter_shared_results(rows, prepared, pool, workers, chunk_rows=CHUNK_ROWS):
+    """Like engine.iter_row_results, with the per-cell checks farmed out to `pool`."""
+    headers = prepared['headers']
+    plan = prepared['plan']
+    width = output_columns(headers)[2]
+    config = prepared['config']
+    uniqueness = build_uniqueness(headers, config['unique'], config['near_duplicates'],
+                                  ('Comments', 'Updates Here'), config['spill_threshold'])
+    dependencies = build_dependencies(headers, prepared['reference'])
+    row_num = 1
+    try:
+        for chunk in iter_batches(rows, chunk_rows):
+            n = len(chunk)
+            blocks = [pack_column([row[idx] if idx < len(row) else None for row in chunk]) for _, idx, _ in plan]
+            result = SharedMemory(create=True, size=max(4, 4 * n * len(plan)))
+            try:
+                result.buf[:4 * n * len(plan)] = bytes(4 * n * len(plan))
+                tasks = [(col, pos, blocks[pos].name, result.name, n, start, stop)
+                         for pos, (col, _, _) in enumerate(plan) for start, stop in _slices(n, workers)]
+                for _ in pool.imap_unordered(_validate_slice, tasks):
+                    pass
+                masks = result.buf.cast('I')
+                flagged = [[pos for pos in range(len(plan)) if masks[pos * n + i]] for i in range(n)]
+                masks.release()
+            finally:
+                result.close()
+                result.unlink()
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+
+            for i, row in enumerate(chunk):
+                row_num += 1
+                values = list(row)
+                if len(values) < width:
+                    values.extend([None] * (width - len(values)))
+                if flagged[i]:
+                    # Re-render the exact messages and fixes only for flagged cells
+                    errors, updates = validate_row(values, [plan[pos] for pos in flagged[i]])
+                else:
+                    errors, updates = [], []
+                check_dependencies(dependencies, values, errors)
+                check_uniqueness(uniqueness, values, row_num, errors)
+                yield row_num, values, errors, updates
+    finally:
+        close_uniqueness(uniqueness)
+
+
+def open_pool(workers, file_path, rules, highlight_colors, data_sheet, reference_sheet):
+    # Workers must share the parent's resource tracker, or each one would try to
+    # clean up the blocks it attached to when it exits
+    resource_tracker.ensure_running()
+    return Pool(workers, _worker_init, (file_path, rules, highlight_colors, data_sheet, reference_sheet))
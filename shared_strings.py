@@ -0,0 +1,95 @@
+import datetime
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from openpyxl.cell._writer import write_cell
+from openpyxl.comments.comment_sheet import CommentRecord
+from openpyxl.packaging.relationship import Relationship, RelationshipList
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.xml.constants import ARC_SHARED_STRINGS, ARC_WORKBOOK_RELS, SHARED_STRINGS, SHEET_MAIN_NS
+from openpyxl.xml.functions import Element, SubElement, fromstring, tostring, whitespace, xmlfile
+
+# Comments / Updates texts go to the shared strings table: openpyxl writes every
+# string inline (t="inlineStr"), so an issue text repeated on 100k rows is stored
+# 100k times. The validated sheets get a writer that stores each distinct text of
+# those columns once in workbook.shared_strings and writes the cell as an index
+# (t="s"); save_workbook then adds xl/sharedStrings.xml with its content type and
+# workbook relationship, which openpyxl itself never writes. Other cells are
+# written by openpyxl as before.
+
+
+class _SharedStringsWriter(WorksheetWriter):
+
+    def __init__(self, ws, columns):
+        super().__init__(ws)
+        self.columns = {col + 1 for col in columns}
+        self.strings = ws.parent.shared_strings
+
+    def write_row(self, xf, row, row_idx):
+        attrs = {'r': f'{row_idx}'}
+        attrs.update(self.ws.row_dimensions.get(row_idx, {}))
+        with xf.element('row', attrs):
+            for cell in row:
+                if cell._comment is not None:
+                    self.ws._comments.append(CommentRecord.from_cell(cell))
+                if cell._value is None and not cell.has_style and not cell._comment:
+                    continue
+                if cell.data_type == 's' and cell.column in self.columns and not cell.has_style:
+                    el = Element('c', {'r': cell.coordinate, 't': 's'})
+                    SubElement(el, 'v').text = f'{self.strings.add(cell._value)}'
+                    xf.write(el)
+                else:
+                    write_cell(xf, self.ws, cell, cell.has_style)
+
+
+def share_columns(ws, columns):
+    """Write the text cells of the 0-based `columns` of a write_only sheet as shared strings.
+
+    Must be called before anything is appended to the sheet.
+    """
+    ws._writer = _SharedStringsWriter(ws, columns)
+    ws._writer.write_top()
+
+
+class _SharedStringsArchive(ZipFile):
+    """Adds the shared strings part next to the workbook relationships openpyxl writes."""
+
+    def __init__(self, filename, strings):
+        super().__init__(filename, 'w', ZIP_DEFLATED, allowZip64=True)
+        self.strings = strings
+
+    def writestr(self, name, data, *args, **kwargs):
+        if name == ARC_WORKBOOK_RELS:
+            self._write_strings()
+            rels = RelationshipList.from_tree(fromstring(data))
+            rels.append(Relationship(type='sharedStrings', Target='sharedStrings.xml'))
+            data = tostring(rels.to_tree())
+        super().writestr(name, data, *args, **kwargs)
+
+    def _write_strings(self):
+        with self.open(ARC_SHARED_STRINGS, 'w') as part, xmlfile(part) as xf:
+            with xf.element('sst', xmlns=SHEET_MAIN_NS, uniqueCount=f'{len(self.strings)}'):
+                for text in self.strings:
+                    si = Element('si')
+                    t = SubElement(si, 't')
+                    t.text = text
+                    whitespace(t)
+                    xf.write(si)
+
+
+class _SharedStringsPart:
+    path = '/' + ARC_SHARED_STRINGS
+    mime_type = SHARED_STRINGS
+
+
+def save_workbook(wb, filename):
+    """wb.save(filename), plus the shared strings table when share_columns put texts in it."""
+    if not wb.shared_strings:
+        wb.save(filename)
+        return
+    if not wb.worksheets:
+        wb.create_sheet()
+    wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    writer = ExcelWriter(wb, _SharedStringsArchive(filename, wb.shared_strings))
+    writer.manifest.append(_SharedStringsPart())
+    writer.save()
@@ -0,0 +1,67 @@
+import zipfile
+import xml.etree.ElementTree as ET
+from copy import copy
+
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.dimensions import ColumnDimension
+
+from header_styles import MAIN_NS, sheet_xml_paths
+
+# Sheets that are not validated (Sheet1, notes, ...) are copied into the write_only
+# output with their cell styles and column widths. Each distinct source style is
+# rebuilt in the output workbook once; every cell using it then gets a copy of that
+# style array, so the per-cell cost is one WriteOnlyCell. Read-only worksheets do
+# not expose column widths, so they come from the <cols> element of the sheet part.
+
+
+def read_column_widths(file_path, sheet_name):
+    """[(first column, last column, width, hidden), ...] from the sheet's <cols> element."""
+    cols = []
+    with zipfile.ZipFile(file_path) as zf:
+        path = sheet_xml_paths(zf).get(sheet_name)
+        if path is None:
+            return cols
+        with zf.open(path) as fh:
+            for _, elem in ET.iterparse(fh, events=('start',)):
+                if elem.tag == MAIN_NS + 'col':
+                    width = elem.get('width')
+                    cols.append((int(elem.get('min')), int(elem.get('max')), float(width) if width else None,
+                                 elem.get('hidden') in ('1', 'true')))
+                elif elem.tag == MAIN_NS + 'sheetData':
+                    break
+    return cols
+
+
+def _output_style(cell, ws_out):
+    template = WriteOnlyCell(ws_out)
+    template.font = copy(cell.font)
+    template.fill = copy(cell.fill)
+    template.border = copy(cell.border)
+    template.alignment = copy(cell.alignment)
+    template.protection = copy(cell.protection)
+    template.number_format = cell.number_format
+    return template._style
+
+
+def copy_sheet(file_path, ws, ws_out):
+    """Append the rows of read-only `ws` to write_only `ws_out`, keeping cell styles and column widths."""
+    for first, last, width, hidden in read_column_widths(file_path, ws.title):
+        ws_out.column_dimensions[get_column_letter(first)] = ColumnDimension(
+            ws_out, index=get_column_letter(first), min=first, max=last, width=width, hidden=hidden)
+    styles = {}
+    for row in ws.iter_rows():
+        values = []
+        for cell in row:
+            # Gaps in a row are EmptyCell placeholders, which carry no style
+            style_id = getattr(cell, '_style_id', 0)
+            if not style_id:
+                values.append(cell.value)
+                continue
+            style = styles.get(style_id)
+            if style is None:
+                style = styles[style_id] = _output_style(cell, ws_out)
+            out = WriteOnlyCell(ws_out, value=cell.value)
+            out._style = copy(style)
+            values.append(out)
+        ws_out.append(values)
@@ -0,0 +1,196 @@
+from collections import defaultdict
+
+# Validation_Summary counters: every issue is counted once under its (rule, column)
+# key as it is found, so rule-, column- and row-level rates come from the same
+# counters without re-parsing comment strings. The most frequent offending values
+# per column are tracked with a bounded Space-Saving sketch.
+
+SKETCH_CAPACITY = 64
+TOP_VALUES = 10
+MAX_VALUE_LENGTH = 100
+
+
+def new_sketch(capacity=SKETCH_CAPACITY):
+    return {'capacity': capacity, 'counts': {}, 'overcount': {}}
+
+
+def sketch_add(sketch, item):
+    """Space-Saving update: a new item evicts the current minimum and inherits its count."""
+    counts = sketch['counts']
+    if item in counts:
+        counts[item] += 1
+    elif len(counts) < sketch['capacity']:
+        counts[item] = 1
+        sketch['overcount'][item] = 0
+    else:
+        victim = min(counts, key=counts.get)
+        floor = counts.pop(victim)
+        del sketch['overcount'][victim]
+        counts[item] = floor + 1
+        sketch['overcount'][item] = floor
+
+
+def sketch_top(sketch, n=TOP_VALUES):
+    """[(item, count, max_overcount), ...] for the `n` heaviest items."""
+    top = sorted(sketch['counts'].items(), key=lambda kv: -kv[1])[:n]
+    return [(item, count, sketch['overcount'][item]) for item, count in top]
+
+
+def sketch_merge(sketch, other):
+    """Fold another Space-Saving sketch in; items missing from a full sketch may have been
+    evicted there, so they inherit its minimum as extra overcount."""
+    counts = sketch['counts']
+    floor = min(counts.values()) if len(counts) >= sketch['capacity'] else 0
+    other_floor = min(other['counts'].values()) if len(other['counts']) >= other['capacity'] else 0
+    for item in counts:
+        if item not in other['counts']:
+            counts[item] += other_floor
+            sketch['overcount'][item] += other_floor
+    for item, count in other['counts'].items():
+        if item in counts:
+            counts[item] += count
+            sketch['overcount'][item] += other['overcount'][item]
+        else:
+            counts[item] = count + floor
+            sketch['overcount'][item] = other['overcount'][item] + floor
+    for item in sorted(counts, key=counts.get)[:max(0, len(counts) - sketch['capacity'])]:
+        del counts[item]
+        del sketch['overcount'][item]
+
+
+def new_summary(columns, capacity=SKETCH_CAPACITY):
+    """Counters for a run validating `columns` (one checked cell per column per row)."""
+    return {'columns': list(columns), 'rows': 0, 'error_rows': 0,
+            'issues': defaultdict(int), 'error_cells': defaultdict(int),
+            'values': defaultdict(lambda: new_sketch(capacity))}
+
+
+def record_row(summary, issues):
+    """Count one validated row; `issues` is a list of (column, rule, offending value)."""
+    summary['rows'] += 1
+    if not issues:
+        return
+    summary['error_rows'] += 1
+    counters = summary['issues']
+    sketches = summary['values']
+    seen_cols = set()
+    seen_values = set()
+    for col, rule, value in issues:
+        counters[rule, col] += 1
+        seen_cols.add(col)
+        if value is not None:
+            # A value failing several rules is counted once per row
+            item = str(value)[:MAX_VALUE_LENGTH]
+            if (col, item) not in seen_values:
+                seen_values.add((col, item))
+                sketch_add(sketches[col], item)
+    for col in seen_cols:
+        summary['error_cells'][col] += 1
+
+
+def merge_summary(summary, other):
+    """Add the counters of another run (e.g. another Data sheet) into `summary`."""
+    summary['cells'] = total_cells(summary) + total_cells(other)
+    summary['columns'].extend(col for col in other['columns'] if col not in summary['columns'])
+    summary['rows'] += other['rows']
+    summary['error_rows'] += other['error_rows']
+    for key, count in other['issues'].items():
+        summary['issues'][key] += count
+    for col, count in other['error_cells'].items():
+        summary['error_cells'][col] += count
+    for col, sketch in other['values'].items():
+        sketch_merge(summary['values'][col], sketch)
+
+
+def plain_summary(summary):
+    """The counters without defaultdict factories, so they can be pickled."""
+    return dict(summary, issues=dict(summary['issues']), error_cells=dict(summary['error_cells']),
+                values=dict(summary['values']))
+
+
+def total_cells(summary):
+    # Merged runs may have validated different columns per sheet
+    if 'cells' in summary:
+        return summary['cells']
+    return summary['rows'] * len(summary['columns'])
+
+
+def total_errors(summary):
+    return sum(summary['issues'].values())
+
+
+def _pct(count, total):
+    return round((count / (total if total > 0 else 1)) * 100, 2)
+
+
+def rule_rates(summary):
+    """[(rule, count, % of checked cells), ...]."""
+    by_rule = defaultdict(int)
+    for (rule, _), count in summary['issues'].items():
+        by_rule[rule] += count
+    cells = total_cells(summary)
+    return [(rule, count, _pct(count, cells)) for rule, count in by_rule.items()]
+
+
+def column_rates(summary):
+    """[(column, issue count, cells with errors, % of rows), ...]; Row/key labels included."""
+    by_col = defaultdict(int)
+    for (_, col), count in summary['issues'].items():
+        by_col[col] += count
+    rows = summary['rows']
+    return [(col, count, summary['error_cells'][col], _pct(summary['error_cells'][col], rows))
+            for col, count in by_col.items()]
+
+
+def summary_dict(summary, top_n=TOP_VALUES):
+    """Plain-data view of the counters (used by JSON reports)."""
+    return {
+        'rows': summary['rows'],
+        'cells': total_cells(summary),
+        'errors': total_errors(summary),
+        'error_rows': summary['error_rows'],
+        'error_row_pct': _pct(summary['error_rows'], summary['rows']),
+        'rules': [{'rule': r, 'count': c, 'percentage': p} for r, c, p in rule_rates(summary)],
+        'columns': [{'column': col, 'count': c, 'error_cells': e, 'percentage': p}
+                    for col, c, e, p in column_rates(summary)],
+        'rule_columns': [{'rule': r, 'column': col, 'count': c} for (r, col), c in summary['issues'].items()],
+        'top_values': {col: [{'value': v, 'count': c, 'max_overcount': o} for v, c, o in sketch_top(sketch, top_n)]
+                       for col, sketch in summary['values'].items()},
+    }
+
+
+def write_summary_sheet(ws_out, summary, top_n=TOP_VALUES):
+    """Rule, column, rule x column, row and top-value sections of Validation_Summary."""
+    ws_out.append(['Error Type', 'Count', 'Percentage'])
+    for rule, count, pct in rule_rates(summary):
+        ws_out.append([rule, count, pct])
+
+    ws_out.append([])
+    ws_out.append(['Column', 'Errors', 'Cells With Errors', 'Error Rate %'])
+    for col, count, cells, pct in column_rates(summary):
+        ws_out.append([col, count, cells, pct])
+
+    ws_out.append([])
+    ws_out.append(['Rule', 'Column', 'Count'])
+    for (rule, col), count in summary['issues'].items():
+        ws_out.append([rule, col, count])
+
+    ws_out.append([])
+    ws_out.append(['Rows Checked', 'Rows With Errors', 'Error Rate %'])
+    ws_out.append([summary['rows'], summary['error_rows'], _pct(summary['error_rows'], summary['rows'])])
+
+    if summary['values']:
+        ws_out.append([])
+        ws_out.append(['Column', 'Top Offending Value', 'Count', 'Max Overcount'])
+        for col, sketch in summary['values'].items():
+            for value, count, overcount in sketch_top(sketch, top_n):
+                ws_out.append([col, value, count, overcount])
+
+
+def write_sheet_summaries(ws_out, summary, sheet_summaries, top_n=TOP_VALUES):
+    """Validation_Summary for several Data sheets: the combined counters, then one section per sheet."""
+    write_summary_sheet(ws_out, summary, top_n)
+    for name, sheet_summary in sheet_summaries.items():
+        ws_out.append([])
+        ws_out.append([f'Sheet: {name}'])
+        write_summary_sheet(ws_out, sheet_summary, top_n)
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import openpyxl
+import pytest
+from openpyxl.styles import PatternFill
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GREEN = PatternFill('solid', start_color='FF00B050')
+
+REFERENCE_ROWS = [
+    ('Color', 'Weight', 'Price', 'Voltage', 'Motor Type', 'SKU', 'Code'),
+    ('Black', '10 kg', '$10.00', '230V', 'AC', 'A1', 'AB-12'),
+    ('Red', '20 kg', '$15.50', '460V', 'DC', 'A2', 'CD-34'),
+    ('Blue', '50 kg', '1,200', '460V', 'AC', 'A3', 'EF-56'),
+    ('BLUE', '100 kg', '$20', '12V', 'DC', 'A4', 'GH-78'),
+    ('Green,Black', '5000 g', '$22', '24V', 'DC', 'A5', 'IJ-90'),
+]
+
+DATA_ROWS = [
+    ('A1', 'Black,Red', '10 kg', '$12', '230V', 'AC', 'AB-12', 'x'),
+    ('A1', 'black,Black', '37 kg', '$1000', '230V', 'AC', 'A-1', 'y'),
+    ('A2', '"Red"', '10000 g', 'abc', '12V', 'DC', 'ZZ-99', None),
+    ('A3', 'Purple', '5', '1.234,50', '460V', 'AC', 'CD-34', None),
+    ('A4', 'Blue;Red', '12.345', '=SUM(A1)', '460V', 'DC', 'EF-56', None),
+    ('A5', 'Red!', '10 kg', '$12', '230V', 'AC', 'AB-12', 'z'),
+    ('A6', 'red', '20 kg', '$15', '24V', 'DC', '#GH-78', None),
+    ('A7', 'red, blue,', '50 kg', '$20', '460V', 'AC', 'EF-56', None),
+]
+
+
+def build_workbook(path, repeat=1, extra_sheet=False):
+    """Sheet1 reference plus a Data sheet (green headers) holding DATA_ROWS `repeat` times."""
+    wb = openpyxl.Workbook()
+    reference = wb.active
+    reference.title = 'Sheet1'
+    for row in REFERENCE_ROWS:
+        reference.append(list(row))
+    data = wb.create_sheet('Data')
+    data.append(['SKU', 'Color', 'Weight', 'Price', 'Voltage', 'Motor Type', 'Code', 'Notes'])
+    for c in range(1, 8):
+        data.cell(row=1, column=c).fill = GREEN
+    for _ in range(repeat):
+        for row in DATA_ROWS:
+            data.append(list(row))
+    if extra_sheet:
+        more = wb.create_sheet('Data_1')
+        more.append(['SKU', 'Color', 'Weight'])
+        for c in range(1, 4):
+            more.cell(row=1, column=c).fill = GREEN
+        more.append(['B1', 'Pink', '20 kg'])
+        more.append(['B2', 'red', '20 kg'])
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    return build_workbook(str(tmp_path / 'input.xlsx'))
+
+
+def read_values(path):
+    """{sheet: [row values, ...]} of a saved workbook."""
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return {name: [list(row) for row in wb[name].iter_rows(values_only=True)] for name in wb.sheetnames}
+    finally:
+        wb.close()
@@ -0,0 +1,69 @@
+import os
+import datetime
+
+import openpyxl
+import pytest
+
+import columnar_cache
+from columnar_cache import open_cache, close_cache, iter_cached_rows, encode_cell, decode_cell, pack_cells
+from conftest import read_values
+
+
+def test_cache_is_built_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar_cache, 'SPILL_ROWS', 3)
+    path = str(tmp_path / 'input.xlsx')
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws.append(['SKU', 'Color'])
+    for i in range(7):
+        ws.append([f'A{i}', 'Red' * i, 1.5 * i])
+    # A column that first appears in a later batch, and a short row after it
+    ws.append(['B1', None, None, 'late'])
+    ws.append(['B2'])
+    wb.save(path)
+    expected = read_values(path)['Data']
+    cache = open_cache(path, 'Data', str(tmp_path))
+    try:
+        assert [list(row) for row in iter_cached_rows(cache)] == expected
+        assert [row[3] for row in iter_cached_rows(cache, [3])] == [None] * 8 + ['late', None]
+    finally:
+        close_cache(cache)
+
+
+@pytest.mark.parametrize('val', [
+    None, '', 'Red', 'na\u00efve', 0, -12, 10 ** 20, 1.5, 0.1, True, False,
+    datetime.datetime(2024, 3, 1, 12, 30, 5, 250), datetime.date(2024, 3, 1), datetime.time(8, 15),
+    datetime.timedelta(days=2, hours=3, microseconds=7),
+])
+def test_cells_round_trip(val):
+    tag, raw = encode_cell(val)
+    decoded = decode_cell(tag, raw)
+    assert type(decoded) is type(val) and decoded == val
+
+
+def test_cells_are_never_pickled():
+    offsets, tags, blob = pack_cells([True, datetime.datetime(2024, 3, 1)])
+    assert blob == b'12024-03-01T00:00:00'
+    with pytest.raises(ValueError):
+        decode_cell(99, b'\x80\x04')
+
+
+def test_touched_workbook_updates_the_header(tmp_path, monkeypatch):
+    path = str(tmp_path / 'input.xlsx')
+    wb = openpyxl.Workbook()
+    wb.active.title = 'Data'
+    wb.active.append(['SKU'])
+    wb.save(path)
+    close_cache(open_cache(path, 'Data'))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    hashed = []
+    file_hash = columnar_cache.file_hash
+    monkeypatch.setattr(columnar_cache, 'file_hash', lambda p: hashed.append(p) or file_hash(p))
+    for _ in range(2):
+        cache = open_cache(path, 'Data')
+        assert list(iter_cached_rows(cache)) == [('SKU',)]
+        close_cache(cache)
+    # Hashed once to confirm the content, not rebuilt and not hashed again
+    assert hashed == [path]
@@ -0,0 +1,79 @@
+import gc
+from collections import OrderedDict
+
+import openpyxl
+import pytest
+from openpyxl.styles import PatternFill
+
+import engine
+from conftest import build_workbook
+
+
+def test_prepared_cache_is_bounded(monkeypatch, tmp_path):
+    monkeypatch.setattr(engine, 'MAX_PREPARED', 2)
+    monkeypatch.setattr(engine, '_prepared_cache', OrderedDict())
+    paths = [build_workbook(str(tmp_path / f'input{i}.xlsx')) for i in range(3)]
+    prepared = []
+    for path in paths + paths[:1]:
+        wb = openpyxl.load_workbook(path, read_only=True)
+        prepared.append(engine.prepare_validation(wb, path))
+        wb.close()
+    assert len(engine._prepared_cache) == 2
+    # The first file was evicted by the third and prepared again
+    assert prepared[3] is not prepared[0]
+    assert prepared[3] is list(engine._prepared_cache.values())[-1]
+
+
+
+# The unsaved write_only output complains when it is garbage collected
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnraisableExceptionWarning')
+def test_run_validation_all_cleans_up_on_failure(monkeypatch, tmp_path):
+    path = build_workbook(str(tmp_path / 'input.xlsx'), extra_sheet=True)
+    masters = tmp_path / 'masters'
+    masters.mkdir()
+    build_workbook(str(masters / 'master.xlsx'))
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    closed = []
+    close_reference_store = engine.close_reference_store
+    monkeypatch.setattr(engine, 'close_reference_store', lambda store: closed.append(close_reference_store(store)))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(engine, 'save_workbook', fail)
+    with pytest.raises(RuntimeError):
+        engine.run_validation_all(path, str(out_dir / 'out.xlsx'), reference_store=str(masters))
+    assert len(closed) == 1
+    with pytest.raises(RuntimeError):
+        engine.run_validation_all(path, str(out_dir / 'out.xlsx'), data_sheets=engine.DATA_SHEET_PATTERN, workers=2)
+    # No spool files left behind by the sheet workers
+    assert list(out_dir.iterdir()) == []
+    gc.collect()
+
+
+@pytest.mark.parametrize('cache', [None, True])
+def test_report_reads_dependency_key_columns(tmp_path, cache):
+    path = build_workbook(str(tmp_path / 'input.xlsx'))
+    wb = openpyxl.load_workbook(path)
+    ws = wb['Data']
+    # Motor Type is only a key column: no green header, so no checks of its own
+    ws.cell(row=1, column=6).fill = PatternFill()
+    ws.cell(row=2, column=6).value = 'DC'
+    wb.save(path)
+    rules = {'depends_on': {'Voltage': ['Motor Type']}}
+    report = engine.run_report(path, str(tmp_path / 'report.json'), rules=rules, cache=cache)
+    assert {'rule': 'dependency', 'column': 'Voltage', 'count': 1} in report['summary']['rule_columns']
+
+
+def test_top_values_are_the_failing_values(workbook):
+    report = engine.run_report(workbook, rules={'columns': {'Code': {'pattern': r'[A-Z]{2}-\d{2}'}}})
+    top = {col: {item['value']: item['count'] for item in items}
+           for col, items in report['summary']['top_values'].items()}
+    # The untrimmed token and cell, not the fixed ones
+    assert 'Red!' in top['Color'] and 'Red' not in top['Color']
+    assert '#GH-78' in top['Code']
+    # The duplicated token of 'black,Black'
+    assert top['Color']['Black'] == 1
+    # Failing the price check and the formula check is one offending value
+    assert top['Price']['=SUM(A1)'] == 1
@@ -0,0 +1,222 @@
+import zipfile
+from collections import OrderedDict
+
+import openpyxl
+import pytest
+from openpyxl.styles import PatternFill
+
+import engine
+from engine import run_validation_all, DATA_SHEET_PATTERN
+from out_of_core import run_out_of_core
+
+from conftest import build_workbook, read_values
+
+RULES = {'defaults': {'decimals': 2}, 'columns': {'Code': {'pattern': r'[A-Z]{2}-\d{2}'}, 'SKU': {'allowed': False}},
+         'unique': ['SKU']}
+
+
+def test_out_of_core_matches_streaming(workbook, tmp_path):
+    streamed = str(tmp_path / 'streamed.xlsx')
+    loaded = str(tmp_path / 'loaded.xlsx')
+    run_validation_all(workbook, streamed, rules=RULES)
+    run_out_of_core(workbook, loaded, rules=RULES)
+    assert read_values(loaded) == read_values(streamed)
+
+
+MODES = [
+    {'workers': 2},
+    {'pipeline': True},
+    {'cache': True},
+    {'dedup': False},
+    {'highlight_errors': False},
+    {'out_of_core': True},
+]
+
+# Non-text cells in a multi-unit column (Weight has kg and g), fractional range
+# and price bounds, case-insensitive and failing dependency pairs on a key
+# column that is not validated itself
+EDGE_RULES = {'defaults': {'decimals': 2},
+              'columns': {'Code': {'pattern': r'[A-Z]{2}-\d{2}'}, 'SKU': {'allowed': False},
+                          'Price': {'price_range': [1, 1000.25]}},
+              'unique': ['SKU'], 'depends_on': {'Voltage': 'Motor Type'}}
+EDGE_ROWS = [
+    ('B1', True, 10, 0.5, '230V', 'DC', 'AB-12', None),
+    ('B2', 'Red', True, '$1000.5', '12V', 'AC', 12, 'n'),
+    ('B3', 'Black', 20.5, '$15', '460v', 'DC', 'CD-34', 3.5),
+    ('B4', 'blue', '500 lb', '$12', '24V', 'DC', 'EF-56', None),
+    ('B5', 'Green', '30 lb', 20, '460V', 'ac', 'GH-78', None),
+    ('B6', 'Red,Red', '2.5 kg', '$22', None, 'DC', '#IJ-90', None),
+]
+
+
+def build_edge_workbook(path, repeat):
+    build_workbook(path, repeat)
+    wb = openpyxl.load_workbook(path)
+    wb['Data']['F1'].fill = PatternFill()
+    for _ in range(repeat):
+        for row in EDGE_ROWS:
+            wb['Data'].append(list(row))
+    wb.save(path)
+    return path
+
+
+@pytest.mark.parametrize('options', MODES, ids=lambda options: next(iter(options)))
+def test_modes_match_streaming(tmp_path, options):
+    # Enough rows for several batches
+    path = build_workbook(str(tmp_path / 'input.xlsx'), repeat=150)
+    streamed = str(tmp_path / 'streamed.xlsx')
+    other = str(tmp_path / 'other.xlsx')
+    run_validation_all(path, streamed, rules=RULES)
+    run_validation_all(path, other, rules=RULES, **options)
+    assert read_values(other) == read_values(streamed)
+
+
+@pytest.mark.parametrize('options', MODES + [{'cache': True, 'workers': 2}, {'cache': True, 'out_of_core': True}],
+                         ids=lambda options: '+'.join(options))
+def test_modes_match_streaming_on_edge_cases(tmp_path, options):
+    path = build_edge_workbook(str(tmp_path / 'input.xlsx'), repeat=100)
+    streamed = str(tmp_path / 'streamed.xlsx')
+    other = str(tmp_path / 'other.xlsx')
+    run_validation_all(path, streamed, rules=EDGE_RULES)
+    run_validation_all(path, other, rules=EDGE_RULES, **options)
+    assert read_values(other) == read_values(streamed)
+
+
+@pytest.mark.parametrize('options', [{'cache': True}, {'cache': True, 'dedup': False}],
+                         ids=lambda options: '+'.join(options))
+def test_report_matches_on_edge_cases(tmp_path, options):
+    # Reports read only the touched columns from the cache, dependency keys included
+    path = build_edge_workbook(str(tmp_path / 'input.xlsx'), repeat=100)
+    plain = engine.run_report(path, str(tmp_path / 'plain.json'), rules=EDGE_RULES)
+    other = engine.run_report(path, str(tmp_path / 'other.json'), rules=EDGE_RULES, **options)
+    assert other['summary'] == plain['summary']
+
+
+def test_out_of_core_checks_before_trimming(workbook, tmp_path):
+    output = str(tmp_path / 'loaded.xlsx')
+    run_out_of_core(workbook, output, rules=RULES)
+    rows = read_values(output)['Data']
+    header = rows[0]
+    by_sku = {row[0]: row for row in rows[1:]}
+    comments = header.index('Comments')
+    assert by_sku['A5'][1] == 'Red'
+    assert 'Value "Red!" not allowed' in by_sku['A5'][comments]
+    assert 'Contains formula' in by_sku['A4'][comments]
+
+
+def test_comments_are_shared_strings(workbook, tmp_path):
+    output = str(tmp_path / 'streamed.xlsx')
+    run_validation_all(workbook, output, rules=RULES)
+    with zipfile.ZipFile(output) as zf:
+        names = zf.namelist()
+        strings = zf.read('xl/sharedStrings.xml').decode()
+    assert 'xl/sharedStrings.xml' in names
+    assert 'Value "Purple" not allowed' in strings
+    rows = read_values(output)['Data']
+    assert rows[4][rows[0].index('Comments')].startswith('Color: Value "Purple" not allowed')
+
+
+def test_format_issues_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(engine, 'MAX_INTERNED_TEXTS', 2)
+    monkeypatch.setattr(engine, '_issue_texts', OrderedDict())
+    first = [('Color', 'invalid_value', 'Value "X" not allowed', 'X')]
+    second = [('Price', 'price_range', 'Price not a number', 'abc')]
+    third = [('Code', 'pattern', 'Pattern mismatch', 'A-1')]
+    engine.format_issues(first)
+    engine.format_issues(second)
+    engine.format_issues(first)
+    # The checked value is not part of the key
+    assert engine.format_issues([('Code', 'pattern', 'Pattern mismatch', 'B-2')]) == 'Code: Pattern mismatch'
+    assert list(engine._issue_texts) == [(('Color', 'Value "X" not allowed'),), (('Code', 'Pattern mismatch'),)]
+
+
+def test_multi_sheet_workers_read_the_cache(tmp_path):
+    path = build_workbook(str(tmp_path / 'input.xlsx'), extra_sheet=True)
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    plain = str(tmp_path / 'plain.xlsx')
+    cached = str(tmp_path / 'cached.xlsx')
+    run_validation_all(path, plain, rules=RULES, data_sheets=DATA_SHEET_PATTERN, workers=1)
+    run_validation_all(path, cached, rules=RULES, data_sheets=DATA_SHEET_PATTERN, workers=2, cache=str(cache_dir))
+    assert sorted(p.name for p in cache_dir.iterdir()) == ['.input.xlsx.Data.colcache', '.input.xlsx.Data_1.colcache']
+    assert read_values(cached) == read_values(plain)
+
+
+def test_out_of_core_checks_bare_numbers_in_multi_unit_columns(workbook, tmp_path):
+    wb = openpyxl.load_workbook(workbook)
+    wb['Data']['C2'] = 10
+    wb['Data']['C3'] = 20.5
+    wb.save(workbook)
+    streamed = str(tmp_path / 'streamed.xlsx')
+    loaded = str(tmp_path / 'loaded.xlsx')
+    run_validation_all(workbook, streamed, rules=RULES)
+    run_out_of_core(workbook, loaded, rules=RULES)
+    rows = read_values(loaded)['Data']
+    assert 'Weight: Value "10" not allowed' in rows[1][rows[0].index('Comments')]
+    assert read_values(loaded) == read_values(streamed)
+
+
+def test_out_of_core_leaves_non_text_cells_uncorrected(workbook, tmp_path):
+    wb = openpyxl.load_workbook(workbook)
+    wb['Sheet1']['A7'] = 'TRUE'
+    wb['Data']['B2'] = True
+    wb.save(workbook)
+    streamed = str(tmp_path / 'streamed.xlsx')
+    loaded = str(tmp_path / 'loaded.xlsx')
+    run_validation_all(workbook, streamed, rules=RULES)
+    run_out_of_core(workbook, loaded, rules=RULES)
+    rows = read_values(loaded)['Data']
+    assert rows[1][1] is True
+    assert 'Color: Value "True" not allowed' in rows[1][rows[0].index('Comments')]
+    assert read_values(loaded) == read_values(streamed)
+
+
+def test_out_of_core_formats_fractional_bounds_like_streaming(workbook, tmp_path):
+    wb = openpyxl.load_workbook(workbook)
+    wb['Data']['C2'] = '500 lb'
+    wb['Data']['C3'] = '30 lb'
+    wb['Data']['D2'] = '$0.5'
+    wb.save(workbook)
+    rules = dict(RULES, columns=dict(RULES['columns'], Price={'price_range': [1, 1000.25]}))
+    streamed = str(tmp_path / 'streamed.xlsx')
+    loaded = str(tmp_path / 'loaded.xlsx')
+    run_validation_all(workbook, streamed, rules=rules)
+    run_out_of_core(workbook, loaded, rules=rules)
+    rows = read_values(loaded)['Data']
+    comments = rows[1][rows[0].index('Comments')]
+    assert 'Below min price 1,' in comments + ','
+    assert 'exceeds allowed range [11.023113109243878, 220.46226218487757]' in comments
+    assert read_values(loaded) == read_values(streamed)
+
+
+def test_out_of_core_keeps_cells_past_the_last_header(workbook, tmp_path):
+    wb = openpyxl.load_workbook(workbook)
+    wb['Data']['K2'] = 'kept'
+    wb['Data']['L5'] = 7
+    wb.save(workbook)
+    streamed = str(tmp_path / 'streamed.xlsx')
+    loaded = str(tmp_path / 'loaded.xlsx')
+    run_validation_all(workbook, streamed, rules=RULES)
+    run_out_of_core(workbook, loaded, rules=RULES)
+    rows = read_values(loaded)['Data']
+    assert rows[1][10] == 'kept' and rows[4][11] == 7
+    assert read_values(loaded) == read_values(streamed)
+
+
+def test_out_of_core_closes_source_when_preparation_fails(workbook, tmp_path, monkeypatch):
+    import out_of_core
+    opened = []
+    load = openpyxl.load_workbook
+
+    def load_workbook(*args, **kwargs):
+        opened.append(load(*args, **kwargs))
+        return opened[-1]
+
+    def fail(*args, **kwargs):
+        raise ValueError('bad rules')
+
+    monkeypatch.setattr(out_of_core.openpyxl, 'load_workbook', load_workbook)
+    monkeypatch.setattr(out_of_core, 'prepare_validation', fail)
+    with pytest.raises(ValueError):
+        run_out_of_core(workbook, str(tmp_path / 'out.xlsx'), rules=RULES)
+    assert opened[0]._archive.fp is None
@@ -0,0 +1,62 @@
+import math
+import time
+
+import pytest
+
+from prices import parse_price, parse_prices, price_range, price_fences
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('$1,234.50', 1234.5),
+    ('1.234,50 EUR', 1234.5),
+    ('12,5', 12.5),
+    ('1,200', 1200.0),
+    ('- $ 12', -12.0),
+    ('$-3', -3.0),
+    ('USD 5', 5.0),
+    ('R$ 10', 10.0),
+    ('1 000', 1000.0),
+    ('1e3', 1000.0),
+    ('  12  ', 12.0),
+    ('.5', 0.5),
+])
+def test_parse_price_text(text, expected):
+    assert parse_price(text) == expected
+
+
+@pytest.mark.parametrize('val', ['abc', '', '$', '12 kg', '1.2.3,4,5,6x', None, True])
+def test_parse_price_rejects(val):
+    assert parse_price(val) is None
+
+
+def test_parse_price_numbers():
+    assert parse_price(12) == 12.0
+    assert parse_price(1.5) == 1.5
+
+
+@pytest.mark.parametrize('text', [
+    ' ' * 5000 + 'x',
+    '-' + ' ' * 5000 + 'x',
+    '$' + ' ' * 5000,
+    '1' + ' 1' * 5000 + 'x',
+    '1' + ',' * 5000 + 'x',
+])
+def test_parse_price_fails_fast_on_long_input(text):
+    # Overlapping \s* groups used to backtrack for seconds on a few hundred spaces
+    started = time.perf_counter()
+    assert parse_price(text) is None
+    assert time.perf_counter() - started < 0.5
+
+
+def test_parse_prices_and_range():
+    prices = parse_prices(['$10', 'n/a', '20', None])
+    assert prices[0] == 10.0 and prices[2] == 20.0
+    assert math.isnan(prices[1]) and math.isnan(prices[3])
+    assert price_range(['$10', 'n/a', '20']) == (10.0, 20.0)
+    assert price_range(['n/a']) == (None, None)
+
+
+def test_price_fences_ignore_outlier():
+    low, high = price_fences(['$10', '$12', '$15', '$11', '$14', '$9999'])
+    assert low == 10.0
+    assert high < 9999
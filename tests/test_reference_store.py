@@ -0,0 +1,26 @@
+import openpyxl
+
+import engine
+from reference_store import open_reference_store, close_reference_store, store_whole_values
+
+
+def test_comma_cells_are_whole_values(tmp_path):
+    masters = tmp_path / 'masters'
+    masters.mkdir()
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Sheet1'
+    for row in [('Price', 'Size'), ('1,200', '10 KG'), (None, '10 KG, 50 KG'), (None, '30 KG')]:
+        ws.append(row)
+    wb.save(str(masters / 'master.xlsx'))
+    store = open_reference_store(str(masters))
+    try:
+        assert store_whole_values(store, 'Price') == ['1,200']
+        assert sorted(store_whole_values(store, 'Size')) == ['10 KG', '10 KG, 50 KG', '30 KG']
+        reference = {'values': {}, 'allowed': {}, 'units': {}, 'sketches': {}}
+        engine.add_store_reference(reference, store, ['Price', 'Size'])
+        assert reference['sketches']['Price']['n'] == 1
+        # The comma list is not a size of its own: 50 KG stays outside the range
+        assert reference['units']['Size']['ranges'] == {'mass': (10000.0, 30000.0)}
+    finally:
+        close_reference_store(store)
@@ -0,0 +1,72 @@
+import openpyxl
+import pytest
+
+from engine import build_reference
+from rules import compile_column, rules_for_column, validate_rules, DEFAULT_RULES
+
+COLUMNS = ['Color', 'Weight', 'Price', 'Code']
+
+
+@pytest.fixture
+def reference(workbook):
+    wb = openpyxl.load_workbook(workbook, read_only=True)
+    try:
+        return build_reference(wb['Sheet1'], COLUMNS)
+    finally:
+        wb.close()
+
+
+def run_column(col, val, reference, columns=None):
+    config = validate_rules({'defaults': DEFAULT_RULES, 'columns': columns or {}})
+    errors = []
+    updates = []
+    for check in compile_column(col, rules_for_column(config, col, reference), reference):
+        val = check(val, errors, updates)
+    return val, [rule for rule, _, _ in errors], [rule for rule, _, _ in updates], errors
+
+
+@pytest.mark.parametrize('col, val, expected, errors, updates', [
+    ('Color', 'Black,Red', 'Black,Red', [], []),
+    ('Color', '"Red"', 'Red', [], ['cleaned']),
+    ('Color', 'black;Red', 'Black,Red', [], ['cleaned', 'case']),
+    ('Color', 'blue', 'BLUE', [], ['case']),
+    ('Color', 'Black,Black', 'Black,Black', ['duplicates'], []),
+    ('Color', 'Purple', 'Purple', ['invalid_value'], []),
+    ('Color', 'Red!', 'Red', ['invalid_value'], ['special_chars']),
+    ('Weight', '10000 g', '10000 g', [], []),
+    ('Weight', '37 kg', '37 kg', ['unit_size'], []),
+    ('Weight', '500 kg', '500 kg', ['unit_range'], []),
+    ('Price', '1000', '1000', [], []),
+    ('Price', '$5', '5', ['price_range'], ['special_chars']),
+    ('Price', 'abc', 'abc', ['price_range'], []),
+    ('Color', None, None, [], []),
+])
+def test_compile_column(reference, col, val, expected, errors, updates):
+    assert run_column(col, val, reference)[:3] == (expected, errors, updates)
+
+
+def test_invalid_value_reports_the_untrimmed_token(reference):
+    *_, errors = run_column('Color', 'Red!', reference)
+    assert errors == [('invalid_value', 'Value "Red!" not allowed', 'Red!')]
+
+
+def test_formula_is_flagged_before_the_trim(reference):
+    val, errors, updates, _ = run_column('Code', '=SUM(A1)', reference)
+    assert 'formula' in errors
+    assert updates == ['special_chars']
+    assert val == 'SUM(A1'
+
+
+def test_pattern_and_decimals(reference):
+    columns = {'Code': {'pattern': r'[A-Z]{2}-\d{2}', 'allowed': False}}
+    assert run_column('Code', 'AB-12', reference, columns)[1] == []
+    assert run_column('Code', 'A-1', reference, columns)[1] == ['pattern']
+    assert run_column('Code', '12.345', reference, columns)[1] == ['pattern', 'numeric_format']
+    assert run_column('Code', '3.0', reference, columns)[1] == ['pattern', 'numeric_format']
+
+
+def test_disabled_rules_compile_to_nothing(reference):
+    off = {'clean': False, 'allowed': False, 'pattern': None, 'price_range': False, 'unit_range': False,
+           'decimals': None, 'no_formula': False}
+    config = validate_rules({'defaults': off})
+    assert compile_column('Color', rules_for_column(config, 'Color', reference), reference) == []
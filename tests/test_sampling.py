@@ -0,0 +1,20 @@
+import openpyxl
+
+from sampling import run_sampled, wilson_interval
+
+
+def test_wilson_interval_clamps_the_proportion():
+    assert wilson_interval(1.5, 10) == wilson_interval(1.0, 10)
+    low, high = wilson_interval(-0.1, 10)
+    assert low == 0.0 and high < 1.0
+
+
+def test_multi_value_cells_count_once_per_rule(workbook, tmp_path):
+    wb = openpyxl.load_workbook(workbook)
+    ws = wb['Data']
+    for row in range(2, ws.max_row + 1):
+        ws.cell(row=row, column=2).value = ','.join('ABCDEFGHIJKL')
+    wb.save(workbook)
+    stats = run_sampled(workbook, str(tmp_path / 'sampled.xlsx'), 10, seed=1)
+    count, pct, low, high = stats['estimates']['invalid_value']
+    assert 0 <= low <= pct <= high <= 100
@@ -0,0 +1,30 @@
+import datetime
+
+import openpyxl
+import pytest
+from openpyxl.styles import PatternFill
+
+from engine import run_validation_all
+from out_of_core import run_out_of_core
+
+
+@pytest.mark.parametrize('run', [run_validation_all, run_out_of_core])
+def test_reference_sheet_keeps_styles_and_widths(workbook, tmp_path, run):
+    wb = openpyxl.load_workbook(workbook)
+    ws = wb['Sheet1']
+    ws['A1'].fill = PatternFill('solid', start_color='FFFF0000')
+    ws['H2'] = datetime.datetime(2024, 1, 5)
+    ws['H2'].number_format = 'yyyy-mm-dd'
+    ws.column_dimensions['A'].width = 30
+    ws.column_dimensions['B'].hidden = True
+    wb.save(workbook)
+
+    output = str(tmp_path / 'output.xlsx')
+    run(workbook, output)
+    out = openpyxl.load_workbook(output)['Sheet1']
+    assert out['A1'].fill.start_color.rgb == 'FFFF0000'
+    assert out['H2'].value == datetime.datetime(2024, 1, 5)
+    assert out['H2'].number_format == 'yyyy-mm-dd'
+    assert out.column_dimensions['A'].width == 30
+    assert out.column_dimensions['B'].hidden
+    assert out['B2'].value == '10 kg'
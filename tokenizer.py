@@ -0,0 +1,48 @@
+import sys
+from functools import lru_cache
+
+# Multi-value cells ("Black,Red") are split once and the resulting tokens are
+# interned, so duplicate detection, allowed-value lookups and case correction
+# all share the same string objects (and their cached hashes).
+
+TOKEN_CACHE_LIMIT = 100000
+
+
+@lru_cache(maxsize=65536)
+def tokenize_cell(val):
+    """Split a cell on commas into stripped, non-empty, interned tokens."""
+    tokens = []
+    for part in val.split(','):
+        part = part.strip()
+        if part:
+            tokens.append(sys.intern(part))
+    return tuple(tokens)
+
+
+def build_case_map(allowed_values):
+    """Map lowercase -> preferred allowed spelling (uppercase wins, like standardize_case)."""
+    case_map = {}
+    for v in allowed_values:
+        key = v.lower()
+        current = case_map.get(key)
+        if current is None or (v.isupper() and not current.isupper()):
+            case_map[key] = v
+    return case_map
+
+
+def check_tokens(val, allowed_values, case_map, cache):
+    """Validate a multi-value cell once per distinct raw string.
+
+    Returns (tokens, corrected_tokens, has_duplicates, invalid_tokens); `cache` is the
+    per-column dict so repeated combinations are looked up instead of re-checked.
+    """
+    result = cache.get(val)
+    if result is None:
+        tokens = tokenize_cell(val)
+        corrected = tuple(t if t in allowed_values else case_map.get(t.lower(), t) for t in tokens)
+        invalid = tuple(t for t in corrected if t not in allowed_values)
+        result = (tokens, corrected, len(corrected) != len(set(corrected)), invalid)
+        if len(cache) >= TOKEN_CACHE_LIMIT:
+            cache.clear()
+        cache[val] = result
+    return result
@@ -0,0 +1,109 @@
+import os
+import re
+import sqlite3
+import hashlib
+import tempfile
+
+# Cross-row uniqueness: key columns (SKU, part number...) and whole-row
+# fingerprints are hashed to 16-byte digests and remembered with the first row
+# they appeared in, so the second and later occurrences are flagged during the
+# same streaming pass. Past `spill_threshold` keys an index moves to a temporary
+# SQLite file so memory stays bounded on very large Data sheets.
+
+DEFAULT_SPILL_THRESHOLD = 2000000
+NORMALIZE_RE = re.compile(r'[^0-9a-z]+')
+
+
+def digest(parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(b'\x00' if part is None else str(part).encode('utf-8', 'surrogatepass'))
+        h.update(b'\x1f')
+    return h.digest()
+
+
+def normalize_for_fingerprint(val):
+    if val is None:
+        return ''
+    return NORMALIZE_RE.sub('', str(val).lower())
+
+
+def new_index(name, spill_threshold=DEFAULT_SPILL_THRESHOLD, spill_dir=None):
+    return {'name': name, 'seen': {}, 'db': None, 'path': None,
+            'threshold': spill_threshold, 'spill_dir': spill_dir}
+
+
+def _spill(index):
+    fd, path = tempfile.mkstemp(prefix='unique_', suffix='.sqlite', dir=index['spill_dir'])
+    os.close(fd)
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA journal_mode=OFF')
+    db.execute('PRAGMA synchronous=OFF')
+    db.execute('CREATE TABLE seen (k BLOB PRIMARY KEY, row INTEGER) WITHOUT ROWID')
+    db.executemany('INSERT INTO seen VALUES (?, ?)', index['seen'].items())
+    index['seen'] = {}
+    index['db'] = db
+    index['path'] = path
+
+
+def first_occurrence(index, key, row_num):
+    """Record `key` for `row_num`; return the earlier row number if the key was already seen."""
+    db = index['db']
+    if db is None:
+        first = index['seen'].setdefault(key, row_num)
+        if first != row_num:
+            return first
+        if len(index['seen']) > index['threshold']:
+            _spill(index)
+        return None
+    found = db.execute('SELECT row FROM seen WHERE k = ?', (key,)).fetchone()
+    if found:
+        return found[0]
+    db.execute('INSERT INTO seen VALUES (?, ?)', (key, row_num))
+    return None
+
+
+def close_index(index):
+    if index['db'] is not None:
+        index['db'].close()
+        os.remove(index['path'])
+        index['db'] = None
+
+
+def build_uniqueness(headers, key_specs, near_duplicates=False, exclude=(), spill_threshold=DEFAULT_SPILL_THRESHOLD):
+    """Prepare the indexes for `key_specs` (lists of column names) present in `headers`."""
+    checks = []
+    for spec in key_specs:
+        if all(col in headers for col in spec):
+            label = ' + '.join(spec)
+            checks.append((label, [headers.index(col) for col in spec], new_index(label, spill_threshold)))
+    fingerprint = None
+    if near_duplicates:
+        positions = [i for i, h in enumerate(headers) if h is not None and h not in exclude]
+        fingerprint = (positions, new_index('Row', spill_threshold))
+    return {'keys': checks, 'fingerprint': fingerprint}
+
+
+def check_uniqueness(state, values, row_num, errors):
+    """Append duplicate-key / near-duplicate-row issues for one row (values already cleaned)."""
+    for label, positions, index in state['keys']:
+        parts = [values[i] for i in positions]
+        if all(p is None or p == '' for p in parts):
+            continue
+        first = first_occurrence(index, digest(parts), row_num)
+        if first is not None:
+            errors.append((label, 'duplicate_key', f'Duplicate of row {first}', parts[0] if len(parts) == 1 else None))
+    if state['fingerprint'] is not None:
+        positions, index = state['fingerprint']
+        parts = [normalize_for_fingerprint(values[i]) for i in positions]
+        if any(parts):
+            first = first_occurrence(index, digest(parts), row_num)
+            if first is not None:
+                errors.append(('Row', 'near_duplicate', f'Near-duplicate of row {first}', None))
+
+
+def close_uniqueness(state):
+    for _, _, index in state['keys']:
+        close_index(index)
+    if state['fingerprint'] is not None:
+        close_index(state['fingerprint'][1])
@@ -0,0 +1,94 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+# Unit aliases -> (dimension, factor to the dimension's base unit).
+# Base units: mass=g, length=mm, volume=ml, power=w. Anything not listed here
+# is treated as its own dimension with factor 1, i.e. the old per-extension behavior.
+UNIT_TABLE = {
+    'mg': ('mass', 0.001), 'g': ('mass', 1.0), 'gm': ('mass', 1.0), 'gms': ('mass', 1.0),
+    'gram': ('mass', 1.0), 'grams': ('mass', 1.0), 'kg': ('mass', 1000.0), 'kgs': ('mass', 1000.0),
+    'kilogram': ('mass', 1000.0), 'kilograms': ('mass', 1000.0), 'lb': ('mass', 453.59237),
+    'lbs': ('mass', 453.59237), 'oz': ('mass', 28.349523125),
+    'mm': ('length', 1.0), 'cm': ('length', 10.0), 'm': ('length', 1000.0), 'km': ('length', 1000000.0),
+    'in': ('length', 25.4), 'inch': ('length', 25.4), 'inches': ('length', 25.4),
+    'ft': ('length', 304.8), 'feet': ('length', 304.8),
+    'ml': ('volume', 1.0), 'cl': ('volume', 10.0), 'l': ('volume', 1000.0), 'ltr': ('volume', 1000.0),
+    'litre': ('volume', 1000.0), 'liter': ('volume', 1000.0), 'litres': ('volume', 1000.0),
+    'liters': ('volume', 1000.0), 'gal': ('volume', 3785.411784),
+    'w': ('power', 1.0), 'watt': ('power', 1.0), 'watts': ('power', 1.0), 'kw': ('power', 1000.0),
+    'hp': ('power', 745.699872),
+}
+
+QUANTITY_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(\w*)\s*$')
+
+
+def unit_dimension(ext):
+    return UNIT_TABLE.get(ext, (ext, 1.0))
+
+
+@lru_cache(maxsize=65536)
+def parse_quantity(raw):
+    """Parse "10 KG" -> (10.0, 'kg', 'mass', 10000.0); None when not a number with unit."""
+    m = QUANTITY_RE.match(raw)
+    if not m:
+        return None
+    num = float(m.group(1))
+    ext = m.group(2).lower()
+    dim, factor = unit_dimension(ext)
+    return num, ext, dim, num * factor
+
+
+def build_unit_index(values):
+    """Collect normalized [min, max] and the sorted allowed magnitudes per dimension
+    from Sheet1 values like "10 KG"."""
+    magnitudes = {}
+    units = set()
+    for v in values:
+        parsed = parse_quantity(v)
+        if parsed is None or not parsed[1]:
+            continue
+        _, ext, dim, base = parsed
+        units.add(ext)
+        magnitudes.setdefault(dim, []).append(base)
+    if not magnitudes:
+        return None
+    sizes = {dim: np.unique(np.asarray(nums, dtype=np.float64)) for dim, nums in magnitudes.items()}
+    ranges = {dim: (float(arr[0]), float(arr[-1])) for dim, arr in sizes.items()}
+    return {'ranges': ranges, 'units': units, 'sizes': sizes}
+
+
+def range_in_unit(index, ext):
+    """Allowed [min, max] expressed in `ext`, or None when the dimension is unknown to Sheet1."""
+    dim, factor = unit_dimension(ext)
+    if dim not in index['ranges']:
+        return None
+    lo, hi = index['ranges'][dim]
+    return lo / factor, hi / factor
+
+
+def quantity_in_range(index, base, dim):
+    lo, hi = index['ranges'][dim]
+    # Tolerate float noise introduced by unit conversion
+    eps = 1e-9 * max(abs(lo), abs(hi), 1.0)
+    return lo - eps <= base <= hi + eps
+
+
+def nearest_size(index, dim, base):
+    """Binary search of `base` (base units) in the allowed sizes of `dim`: (is_allowed, nearest allowed magnitude)."""
+    allowed = index['sizes'][dim]
+    pos = int(np.searchsorted(allowed, base))
+    if pos == len(allowed):
+        nearest = allowed[-1]
+    elif pos == 0:
+        nearest = allowed[0]
+    else:
+        left, right = allowed[pos - 1], allowed[pos]
+        nearest = left if base - left <= right - base else right
+    nearest = float(nearest)
+    return abs(nearest - base) <= 1e-9 * max(abs(nearest), 1.0), nearest
+
+
+def format_magnitude(num):
+    return int(num) if float(num).is_integer() else round(num, 6)
@@ -1,6 +1,9 @@
 import openpyxl
 import re
-from collections import defaultdict
+from tokenizer import build_case_map, check_tokens
+from summary import new_summary, record_row, write_summary_sheet
+from prices import parse_price, price_range
+from header_styles import find_highlighted_columns, DEFAULT_HIGHLIGHT_COLORS
 
 def get_actual_data_limits(ws):
     max_row = ws.max_row
@@ -35,37 +38,12 @@ def clean_commas(val):
     val = re.sub(r'\s*,\s*', ',', val)
     return val
 
-def standardize_case(val, allowed_values):
-    if not isinstance(val, str):
-        return val
-    clean_val = val.strip()
-    if clean_val in allowed_values:
-        return clean_val
-    matches = [v for v in allowed_values if v.lower() == clean_val.lower()]
-    if not matches:
-        return val
-    for m in matches:
-        if m.isupper():
-            return m
-    return matches[0]
-
 def extract_price_range(sheet1, price_col_idx, max_row, max_col):
-    prices = []
-    for row in sheet1.iter_rows(min_row=2, max_row=max_row, max_col=max_col, values_only=True):
-        val = row[price_col_idx]
-        if val is None:
-            continue
-        s = str(val).strip().replace('$','').replace(',','')
-        try:
-            f = float(s)
-            prices.append(f)
-        except:
-            pass
-    if not prices:
-        return None, None
-    return min(prices), max(prices)
-
-def run_validation_all(file_path, output_path):
+    # Parse the whole column in one pass (no exceptions for non-numeric cells)
+    rows = sheet1.iter_rows(min_row=2, max_row=max_row, max_col=max_col, values_only=True)
+    return price_range(row[price_col_idx] for row in rows)
+
+def run_validation_all(file_path, output_path, highlight_colors=DEFAULT_HIGHLIGHT_COLORS):
     wb = openpyxl.load_workbook(file_path)
     sheet1 = wb['Sheet1']
     sheet2 = wb['Data']
@@ -76,21 +54,14 @@ def run_validation_all(file_path, output_path):
     headers_sheet1 = [cell.value for cell in sheet1[1][:max_col1]]
     headers_sheet2 = [cell.value for cell in sheet2[1][:max_col2]]
 
-    green_hex = '00B050'
-    green_col_indices = []
-    for idx, cell in enumerate(sheet2[1][:max_col2], start=1):
-        fill_color = cell.fill.start_color
-        if fill_color.type == 'rgb' and fill_color.rgb and fill_color.rgb[-6:].upper() == green_hex:
-            green_col_indices.append(idx)
-        elif fill_color.type == 'indexed':
-            if fill_color.indexed == 10:
-                green_col_indices.append(idx)
-
-    green_headers = [sheet2.cell(row=1, column=i).value for i in green_col_indices]
+    green_col_indices = find_highlighted_columns(file_path, 'Data', highlight_colors, max_col=max_col2)
+    green_headers = [headers_sheet2[i - 1] for i in green_col_indices]
 
     common_columns = list(set(green_headers).intersection(headers_sheet1))
 
     allowed_values = {}
+    case_maps = {}
+    token_caches = {}
     idx_map_sheet1 = {}
     for col in common_columns:
         idx1 = headers_sheet1.index(col)
@@ -105,6 +76,8 @@ def run_validation_all(file_path, output_path):
                     for subval in str_val.split(','):
                         vals.add(subval.strip())
         allowed_values[col] = vals
+        case_maps[col] = build_case_map(vals)
+        token_caches[col] = {}
 
     price_col_idx_sheet1 = None
     price_col_idx_data = None
@@ -122,11 +95,11 @@ def run_validation_all(file_path, output_path):
     else:
         comments_col_idx = headers_sheet2.index('Comments') + 1
 
-    error_counters = defaultdict(int)
-    total_cells_checked = 0
+    summary = new_summary(common_columns)
 
     for row_num, row in enumerate(sheet2.iter_rows(min_row=2, max_row=max_row2, max_col=max_col2), start=2):
         row_errors = []
+        row_issues = []
         for col in common_columns:
             col_idx_data = headers_sheet2.index(col)
             cell = row[col_idx_data]
@@ -142,53 +115,46 @@ def run_validation_all(file_path, output_path):
                 if val != old_val:
                     cell.value = val
 
-            total_cells_checked += 1
-
+            # Case correction, duplicates and allowed values from one tokenizer pass
             if isinstance(val, str) and col in allowed_values:
-                mapped_val = standardize_case(val, allowed_values[col])
-                if mapped_val != val:
+                tokens, corrected, has_dups, invalid = check_tokens(val, allowed_values[col], case_maps[col], token_caches[col])
+                if corrected != tokens:
+                    mapped_val = ','.join(corrected)
                     cell.value = mapped_val
                     val = mapped_val
                     row_errors.append(f'{col}: Case corrected')
-
-            if isinstance(val, str) and ',' in val:
-                parts = [p.strip() for p in val.split(',') if p.strip()]
-                if len(parts) != len(set(parts)):
+                if has_dups:
                     row_errors.append(f'{col}: Duplicates values in cell')
-                    error_counters['duplicates'] += 1
-
-            if isinstance(val, str) and col in allowed_values:
-                parts = [p.strip() for p in val.split(',') if p.strip()]
-                for p in parts:
-                    if p not in allowed_values[col]:
-                        row_errors.append(f'{col}: Value "{p}" not allowed')
-                        error_counters['invalid_value'] += 1
-            elif val is not None and col in allowed_values and val not in allowed_values[col]:
+                    row_issues.append((col, 'duplicates', val))
+                for p in invalid:
+                    row_errors.append(f'{col}: Value "{p}" not allowed')
+                    row_issues.append((col, 'invalid_value', p))
+            elif val is not None and col in allowed_values and str(val) not in allowed_values[col]:
                 row_errors.append(f'{col}: Value "{val}" not allowed')
-                error_counters['invalid_value'] += 1
+                row_issues.append((col, 'invalid_value', val))
 
             if price_col_idx_data is not None and col.lower() == 'price':
-                try:
-                    num_val = float(str(val).replace('$','').replace(',','').strip())
+                num_val = parse_price(val)
+                if num_val is None:
+                    row_errors.append(f'{col}: Price not a number')
+                    row_issues.append((col, 'price_range', val))
+                else:
                     if min_price is not None and num_val < min_price:
                         row_errors.append(f'{col}: Below min price {min_price}')
-                        error_counters['price_range'] += 1
+                        row_issues.append((col, 'price_range', val))
                     if max_price is not None and num_val > max_price:
                         row_errors.append(f'{col}: Above max price {max_price}')
-                        error_counters['price_range'] += 1
-                except:
-                    row_errors.append(f'{col}: Price not a number')
-                    error_counters['price_range'] += 1
+                        row_issues.append((col, 'price_range', val))
 
             if isinstance(val, str) and re.fullmatch(r'\d+(\.\d+)?', val):
                 if val.endswith('.0'):
                     row_errors.append(f'{col}: Numeric value ends with .0')
-                    error_counters['numeric_format'] += 1
+                    row_issues.append((col, 'numeric_format', val))
                 if '.' in val:
                     dec = val.split('.')[1]
                     if len(dec) > 2:
                         row_errors.append(f'{col}: Numeric value has more than two decimals')
-                        error_counters['numeric_format'] += 1
+                        row_issues.append((col, 'numeric_format', val))
 
             if isinstance(val, str):
                 if re.match(r'^[^A-Za-z0-9]+', val) or re.match(r'[^A-Za-z0-9]+$', val):
@@ -200,19 +166,13 @@ def run_validation_all(file_path, output_path):
 
             if isinstance(val, str) and val.startswith('='):
                 row_errors.append(f'{col}: Contains formula')
-                error_counters['formula'] += 1
+                row_issues.append((col, 'formula', val))
 
         if row_errors:
             sheet2.cell(row=row_num, column=comments_col_idx).value = ', '.join(row_errors)
-            for err in set(row_errors):
-                error_counters[err.split(':')[0].lower()] += 1
-
-    summary_sheet = wb.create_sheet('Validation_Summary')
-    summary_sheet.append(['Error Type', 'Count', 'Percentage'])
-    total = total_cells_checked if total_cells_checked > 0 else 1
-    for error, count in error_counters.items():
-        pct = round((count / total) * 100, 2)
-        summary_sheet.append([error, count, pct])
+        record_row(summary, row_issues)
+
+    write_summary_sheet(wb.create_sheet('Validation_Summary'), summary)
 
     wb.save(output_path)
 
@@ -0,0 +1,77 @@
+import os
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+from header_styles import (MAIN_NS, DEFAULT_HIGHLIGHT_COLORS, DEFAULT_HIGHLIGHT_INDEXED, sheet_xml_paths,
+                           col_letter_to_index, probe_headers)
+
+# Workbook inspection without loading cell data: sheet names come from workbook.xml,
+# sizes from the <dimension ref="A1:H5000"> element at the top of each sheet part,
+# and headers / green columns from the header row and styles (header_styles.py).
+# Only sheets without a dimension (e.g. written by streaming writers) or an explicit
+# exact=True are scanned, since that means decompressing the whole sheet.
+
+
+def _split_ref(ref):
+    """'C7' -> (7, 3)."""
+    letters = ''.join(ch for ch in ref if ch.isalpha())
+    return int(ref[len(letters):]), col_letter_to_index(letters.upper())
+
+
+def read_dimension(zf, sheet_path):
+    """(max_row, max_col) from the sheet's dimension element, or None when it has none."""
+    with zf.open(sheet_path) as fh:
+        for _, elem in ET.iterparse(fh, events=('start',)):
+            if elem.tag == MAIN_NS + 'dimension':
+                ref = elem.get('ref', '')
+                return _split_ref(ref.split(':')[-1]) if ref else None
+            if elem.tag == MAIN_NS + 'sheetData':
+                return None
+    return None
+
+
+def scan_used_range(zf, sheet_path):
+    """(max_row, max_col) of the cells that hold a value; reads the whole sheet part."""
+    max_row = max_col = 0
+    row_num = 0
+    with zf.open(sheet_path) as fh:
+        for event, elem in ET.iterparse(fh, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == MAIN_NS + 'row':
+                    row_num = int(elem.get('r', row_num + 1))
+                continue
+            if elem.tag == MAIN_NS + 'c':
+                if elem.find(MAIN_NS + 'v') is not None or elem.find(MAIN_NS + 'is') is not None:
+                    ref = elem.get('r')
+                    max_row = row_num
+                    if ref:
+                        max_col = max(max_col, _split_ref(ref)[1])
+            elif elem.tag == MAIN_NS + 'row':
+                elem.clear()
+    return max_row, max_col
+
+
+def inspect_workbook(file_path, colors=DEFAULT_HIGHLIGHT_COLORS, indexed=DEFAULT_HIGHLIGHT_INDEXED, exact=False):
+    """Sheet names, sizes, headers and highlighted (green) columns of an xlsx file.
+
+    Returns {'file', 'bytes', 'sheets': [{'name', 'rows', 'columns', 'data_rows', 'exact',
+    'headers', 'green'}], 'seconds'}. Sizes come from the stored dimension unless `exact`
+    (or the sheet has none), in which case trailing empty rows/columns are trimmed like
+    get_actual_data_limits.
+    """
+    started = time.perf_counter()
+    headers = probe_headers(file_path, None, colors, indexed)
+    sheets = []
+    with zipfile.ZipFile(file_path) as zf:
+        for name, path in sheet_xml_paths(zf).items():
+            size = None if exact else read_dimension(zf, path)
+            scanned = size is None
+            max_row, max_col = scan_used_range(zf, path) if scanned else size
+            cells = headers.get(name, [])
+            sheets.append({'name': name, 'rows': max_row, 'columns': max_col, 'data_rows': max(0, max_row - 1),
+                           'exact': scanned,
+                           'headers': [header for _, header, _ in cells],
+                           'green': [header for _, header, green in cells if green]})
+    return {'file': os.path.abspath(file_path), 'bytes': os.path.getsize(file_path), 'sheets': sheets,
+            'seconds': round(time.perf_counter() - started, 4)}